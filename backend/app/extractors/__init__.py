@@ -0,0 +1,29 @@
+"""Per-platform extractors, looked up by the link's domain.
+
+Importing the package registers the built-in extractors. A new platform is
+an ``Extractor`` subclass decorated with ``@extractor_registry.register``,
+in a module imported here.
+"""
+
+from app.extractors.base import Extractor, ExtractorRegistry, extractor_registry
+from app.extractors.pages import ArticleExtractor, InstagramExtractor
+from app.extractors.oembed import (
+    OEmbedExtractor,
+    RedditExtractor,
+    TikTokExtractor,
+    TwitterExtractor,
+    YouTubeExtractor,
+)
+
+__all__ = [
+    "Extractor",
+    "ExtractorRegistry",
+    "extractor_registry",
+    "ArticleExtractor",
+    "InstagramExtractor",
+    "OEmbedExtractor",
+    "RedditExtractor",
+    "TikTokExtractor",
+    "TwitterExtractor",
+    "YouTubeExtractor",
+]
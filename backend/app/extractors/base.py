@@ -0,0 +1,84 @@
+"""Extractor plugin interface and the host-suffix registry."""
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Tuple, Type, Union
+from app.utils.url_canonical import host_of
+
+_HASHTAG = re.compile(r"#(\w+)")
+
+
+class Extractor(ABC):
+    """Scrapes one platform's links into the fields a save needs.
+
+    Subclasses set ``platform`` (stored on the save) and ``hosts``, the
+    domain suffixes they handle, and implement ``extract``; a subclass
+    missing it fails when it is registered. Exceptions
+    other than ``NotModified`` are turned into an empty result by
+    ``URLExtractor``.
+    """
+
+    platform: str = "other"
+    hosts: Tuple[str, ...] = ()
+
+    @abstractmethod
+    async def extract(self, url: str, validators: Optional[Dict] = None) -> Dict:
+        """Scrape ``url``; ``validators`` make the page fetch conditional."""
+
+    def result(self, url: str, **fields) -> Dict:
+        """A result dict with every field present; hashtags default to the caption's."""
+        data = {
+            "platform": self.platform,
+            "original_url": url,
+            "caption": None,
+            "title": None,
+            "hashtags": None,
+            "thumbnail_url": None,
+        }
+        data.update(fields)
+        if data["hashtags"] is None:
+            data["hashtags"] = _HASHTAG.findall(data["caption"]) if data["caption"] else []
+        return data
+
+
+class ExtractorRegistry:
+    """Maps domain suffixes to extractors.
+
+    A URL resolves by looking up its host and then each parent domain
+    (``m.youtube.com``, ``youtube.com``, ``com``): a dict lookup per label,
+    and ``x.com`` never matches ``box.com``.
+    """
+
+    def __init__(self):
+        self._by_host: Dict[str, Extractor] = {}
+
+    def register(self, extractor: Union[Extractor, Type[Extractor]]):
+        """Add an extractor (or instantiate and add a class; usable as a decorator)."""
+        instance = extractor() if isinstance(extractor, type) else extractor
+        for host in instance.hosts:
+            self._by_host[host.lower()] = instance
+        return extractor
+
+    def for_host(self, host: str) -> Optional[Extractor]:
+        host = host.lower()
+        while host:
+            extractor = self._by_host.get(host)
+            if extractor is not None:
+                return extractor
+            host = host.partition(".")[2]
+        return None
+
+    def resolve(self, url: str) -> Optional[Extractor]:
+        return self.for_host(host_of(url))
+
+    def __iter__(self) -> Iterator[Extractor]:
+        seen: List[Extractor] = []
+        for extractor in self._by_host.values():
+            if extractor not in seen:
+                seen.append(extractor)
+        return iter(seen)
+
+    def platforms(self) -> List[str]:
+        return [extractor.platform for extractor in self]
+
+
+extractor_registry = ExtractorRegistry()
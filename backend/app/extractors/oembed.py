@@ -0,0 +1,123 @@
+"""Extractors backed by the platforms' public oEmbed endpoints.
+
+An oEmbed response is a few hundred bytes of JSON, against hundreds of KB
+of HTML for the post page. If the endpoint fails (private or deleted post,
+endpoint changes) the page's Open Graph tags are used instead.
+"""
+import html
+import logging
+import re
+from abc import abstractmethod
+from typing import Dict, Optional
+from urllib.parse import urlencode
+from app.extractors.base import Extractor, extractor_registry
+from app.utils.page_fetcher import fetch_head, fetch_json
+from app.utils.scrape_scheduler import HostThrottled
+
+logger = logging.getLogger(__name__)
+
+_TAG = re.compile(r"<[^>]+>")
+_PARAGRAPH = re.compile(r"<p[^>]*>(.*?)</p>", re.DOTALL | re.IGNORECASE)
+
+
+def _text(fragment: str) -> str:
+    return " ".join(html.unescape(_TAG.sub(" ", fragment)).split())
+
+
+class OEmbedExtractor(Extractor):
+    """Base for providers with an oEmbed endpoint; subclasses map the response."""
+
+    endpoint: str = ""
+    params: Dict[str, str] = {"format": "json"}
+
+    def oembed_url(self, url: str) -> str:
+        return f"{self.endpoint}?{urlencode({'url': url, **self.params})}"
+
+    @abstractmethod
+    def from_oembed(self, url: str, data: Dict) -> Dict:
+        """Map an oEmbed response to a ``result``."""
+
+    async def extract(self, url: str, validators: Optional[Dict] = None) -> Dict:
+        try:
+            data = await fetch_json(self.oembed_url(url), provider=self.platform)
+            return self.from_oembed(url, data)
+        except HostThrottled:
+            raise
+        except Exception as e:
+            logger.info(f"oEmbed failed for {url} ({e!r}); reading the page instead")
+        return await self.extract_page(url, validators)
+
+    async def extract_page(self, url: str, validators: Optional[Dict] = None) -> Dict:
+        """The Open Graph tags of the page itself."""
+        head = await fetch_head(url, validators=validators, provider=f"{self.platform}_page")
+        return self.result(
+            url,
+            title=head.meta.get("og:title"),
+            caption=head.meta.get("og:description"),
+            thumbnail_url=head.meta.get("og:image"),
+            validators=head.validators
+        )
+
+
+@extractor_registry.register
+class TwitterExtractor(OEmbedExtractor):
+    platform = "twitter"
+    hosts = ("twitter.com", "x.com")
+    endpoint = "https://publish.twitter.com/oembed"
+    params = {"omit_script": "true", "dnt": "true"}
+
+    def from_oembed(self, url: str, data: Dict) -> Dict:
+        paragraph = _PARAGRAPH.search(data.get("html") or "")
+        tweet_id_match = re.search(r"/status/(\d+)", url)
+        return self.result(
+            url,
+            tweet_id=tweet_id_match.group(1) if tweet_id_match else None,
+            caption=_text(paragraph.group(1)) if paragraph else None
+        )
+
+
+@extractor_registry.register
+class YouTubeExtractor(OEmbedExtractor):
+    platform = "youtube"
+    hosts = ("youtube.com", "youtu.be")
+    endpoint = "https://www.youtube.com/oembed"
+
+    def from_oembed(self, url: str, data: Dict) -> Dict:
+        author = data.get("author_name")
+        return self.result(
+            url,
+            title=data.get("title"),
+            caption=f"YouTube video by {author}" if author else None,
+            thumbnail_url=data.get("thumbnail_url")
+        )
+
+
+@extractor_registry.register
+class RedditExtractor(OEmbedExtractor):
+    platform = "reddit"
+    hosts = ("reddit.com", "redd.it")
+    endpoint = "https://www.reddit.com/oembed"
+
+    def from_oembed(self, url: str, data: Dict) -> Dict:
+        subreddit = re.search(r"/r/([^/?#]+)", url)
+        return self.result(
+            url,
+            title=data.get("title"),
+            caption=f"Reddit post in r/{subreddit.group(1)}" if subreddit else None
+        )
+
+
+@extractor_registry.register
+class TikTokExtractor(OEmbedExtractor):
+    platform = "tiktok"
+    hosts = ("tiktok.com",)
+    endpoint = "https://www.tiktok.com/oembed"
+    params = {}
+
+    def from_oembed(self, url: str, data: Dict) -> Dict:
+        # TikTok's oEmbed "title" is the video's caption, hashtags included.
+        return self.result(
+            url,
+            caption=data.get("title") or None,
+            thumbnail_url=data.get("thumbnail_url")
+        )
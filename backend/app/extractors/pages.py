@@ -0,0 +1,79 @@
+"""Extractors that read the page's own ``<head>``: Open Graph tags and JSON-LD."""
+import re
+from typing import Dict, List, Optional
+from app.extractors.base import Extractor, extractor_registry
+from app.utils.html_head_parser import HeadMetadataParser
+from app.utils.page_fetcher import fetch_head
+
+ARTICLE_TYPES = {"article", "blogposting", "newsarticle", "techarticle", "socialmediaposting"}
+
+
+def _json_ld_article(head: HeadMetadataParser) -> Dict:
+    for item in head.json_ld:
+        types = item.get("@type")
+        types = types if isinstance(types, list) else [types]
+        if any(str(t).lower() in ARTICLE_TYPES for t in types):
+            return item
+    return {}
+
+
+def _image_url(image) -> Optional[str]:
+    """JSON-LD ``image`` may be a URL, an ImageObject or a list of either."""
+    if isinstance(image, list):
+        image = image[0] if image else None
+    if isinstance(image, dict):
+        image = image.get("url")
+    return image if isinstance(image, str) else None
+
+
+def _keywords(keywords) -> List[str]:
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    if not isinstance(keywords, list):
+        return []
+    return [re.sub(r"\W+", "", str(k)).lower() for k in keywords if re.sub(r"\W+", "", str(k))]
+
+
+@extractor_registry.register
+class InstagramExtractor(Extractor):
+    """Open Graph tags of the post page (Instagram's oEmbed needs an app token)."""
+
+    platform = "instagram"
+    hosts = ("instagram.com", "instagr.am")
+
+    async def extract(self, url: str, validators: Optional[Dict] = None) -> Dict:
+        head = await fetch_head(url, validators=validators, provider=self.platform)
+        post_id_match = re.search(r"/(?:p|reel|tv)/([^/?]+)", url)
+        return self.result(
+            url,
+            post_id=post_id_match.group(1) if post_id_match else None,
+            caption=head.meta.get("og:description"),
+            thumbnail_url=head.meta.get("og:image"),
+            validators=head.validators
+        )
+
+
+@extractor_registry.register
+class ArticleExtractor(Extractor):
+    """Blog posts: JSON-LD Article data, else the ``<h1>`` and meta description.
+
+    With a JSON-LD headline in the head the body is never downloaded.
+    """
+
+    platform = "blog"
+    hosts = ("medium.com", "dev.to", "hashnode.com", "hashnode.dev", "linkedin.com")
+
+    async def extract(self, url: str, validators: Optional[Dict] = None) -> Dict:
+        head = await fetch_head(url, want_h1=True, validators=validators, provider=self.platform)
+        article = _json_ld_article(head)
+        caption = head.meta.get("description") or article.get("description")
+        data = self.result(
+            url,
+            title=article.get("headline") or head.h1 or head.title or None,
+            caption=caption,
+            thumbnail_url=head.meta.get("og:image") or _image_url(article.get("image")),
+            validators=head.validators
+        )
+        if not data["hashtags"]:
+            data["hashtags"] = _keywords(article.get("keywords"))
+        return data
@@ -1,4 +1,15 @@
 from .schemas import SavedContentSchema, CreateSavedContentSchema
-from .database import SavedContent
+from .database import SavedContent, ClassificationCache, ContentEmbedding, ContentSignature, ContentBand, UserFacet, ContentTag, ProcessedMessage
 
-__all__ = ["SavedContentSchema", "CreateSavedContentSchema", "SavedContent"]
+__all__ = [
+    "SavedContentSchema",
+    "CreateSavedContentSchema",
+    "SavedContent",
+    "ClassificationCache",
+    "ContentEmbedding",
+    "ContentSignature",
+    "ContentBand",
+    "UserFacet",
+    "ContentTag",
+    "ProcessedMessage",
+]
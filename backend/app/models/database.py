@@ -1,6 +1,6 @@
 """Database models for Social Saver Bot."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index, LargeBinary, ForeignKey, BigInteger
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -13,8 +13,9 @@ class SavedContent(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String(50), index=True, nullable=False)
-    platform = Column(String(50), nullable=False)  # instagram, twitter, blog
+    platform = Column(String(50), nullable=False)  # instagram, twitter, youtube, reddit, tiktok, blog
     original_url = Column(String(2048), nullable=False)
+    canonical_url = Column(String(2048), nullable=True)  # see app.utils.url_canonical
     caption = Column(Text, nullable=True)
     title = Column(String(1024), nullable=True)
     category = Column(String(100), nullable=True)  # Fitness, Coding, Food, Travel, etc.
@@ -22,6 +23,10 @@ class SavedContent(Base):
     hashtags = Column(String(1024), nullable=True)  # comma-separated
     thumbnail_url = Column(String(2048), nullable=True)
     is_archived = Column(Boolean, default=False)
+    status = Column(String(20), nullable=False, default="ready", server_default="ready")  # pending, importing, ready, failed, duplicate
+    needs_classification = Column(Boolean, default=False, index=True)  # AI was unavailable when saved
+    classified_by = Column(String(20), nullable=True)  # local, llm; NULL for fallbacks and older rows
+    duplicate_of = Column(Integer, ForeignKey("saved_content.id", ondelete="SET NULL"), nullable=True)  # earlier near-identical post
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -39,6 +44,126 @@ class SavedContent(Base):
             "hashtags": self.hashtags,
             "thumbnail_url": self.thumbnail_url,
             "is_archived": self.is_archived,
+            "status": self.status,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class ClassificationCache(Base):
+    """Memoised AI classification keyed by model, prompt version and input text."""
+    
+    __tablename__ = "classification_cache"
+    
+    key = Column(String(64), primary_key=True)  # sha256 of model + prompt version + text
+    model = Column(String(200), nullable=False)
+    prompt_version = Column(String(50), nullable=False)
+    category = Column(String(100), nullable=False)
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ProcessedMessage(Base):
+    """Claim on an inbound Twilio message, then the TwiML reply kept to answer retries."""
+    
+    __tablename__ = "processed_messages"
+    
+    message_sid = Column(String(64), primary_key=True)
+    user_id = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="done", server_default="done")  # processing, done
+    response = Column(Text, nullable=False)  # empty while processing
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ContentSignature(Base):
+    """MinHash signature of a saved blog post's text, for near-duplicate checks."""
+    
+    __tablename__ = "content_signatures"
+    
+    content_id = Column(Integer, ForeignKey("saved_content.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(String(50), index=True, nullable=False)
+    signature = Column(LargeBinary, nullable=False)  # numpy uint32 bytes
+
+
+class ContentBand(Base):
+    """One LSH band bucket of a ``ContentSignature``."""
+    
+    __tablename__ = "content_bands"
+    
+    content_id = Column(Integer, ForeignKey("saved_content.id", ondelete="CASCADE"), primary_key=True)
+    band = Column(Integer, primary_key=True)
+    user_id = Column(String(50), nullable=False)
+    bucket = Column(BigInteger, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_content_bands_lookup", "user_id", "band", "bucket"),
+    )
+
+
+class UserFacet(Base):
+    """Live (non-archived) item count per category and platform for one user."""
+    
+    __tablename__ = "user_facets"
+    
+    user_id = Column(String(50), primary_key=True)
+    facet_type = Column(String(20), primary_key=True)  # category, platform
+    value = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    last_saved_at = Column(DateTime, nullable=True)
+
+
+class ContentTag(Base):
+    """One normalised hashtag of a saved item (lowercase, without ``#``)."""
+    
+    __tablename__ = "content_tags"
+    
+    content_id = Column(Integer, ForeignKey("saved_content.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String(100), primary_key=True)
+    user_id = Column(String(50), nullable=False)
+    
+    __table_args__ = (
+        # Exact and prefix (range) lookups of a user's tags.
+        Index("ix_content_tags_user_tag", "user_id", "tag", "content_id"),
+    )
+
+
+class ContentEmbedding(Base):
+    """Float32 embedding of a saved item's title, caption and summary."""
+    
+    __tablename__ = "content_embeddings"
+    
+    content_id = Column(Integer, ForeignKey("saved_content.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(String(50), index=True, nullable=False)
+    model = Column(String(200), nullable=False)  # embedder name; rows from other embedders are rebuilt
+    vector = Column(LargeBinary, nullable=False)  # numpy float32 bytes
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class AppliedMigration(Base):
+    """A one-off data migration that has completed, so restarts skip it."""
+    
+    __tablename__ = "applied_migrations"
+    
+    name = Column(String(100), primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Serves the per-user feed in keyset order: (user_id, is_archived) equality,
+# then (created_at, id) descending as the cursor.
+Index(
+    "ix_saved_content_user_feed",
+    SavedContent.user_id,
+    SavedContent.is_archived,
+    SavedContent.created_at.desc(),
+    SavedContent.id.desc(),
+)
+
+# One row per saved link per user. Rows saved before canonicalisation existed
+# and later duplicates of them keep a NULL key, which the index allows.
+Index(
+    "ux_saved_content_user_canonical_url",
+    SavedContent.user_id,
+    SavedContent.canonical_url,
+    unique=True,
+)
@@ -7,7 +7,7 @@ from datetime import datetime
 class CreateSavedContentSchema(BaseModel):
     """Schema for creating saved content."""
     user_id: str
-    platform: str  # instagram, twitter, blog
+    platform: str  # instagram, twitter, youtube, reddit, tiktok, blog
     original_url: str
     caption: Optional[str] = None
     title: Optional[str] = None
@@ -21,6 +21,7 @@ class SavedContentSchema(CreateSavedContentSchema):
     """Schema for saved content response."""
     id: int
     is_archived: bool = False
+    status: str = "ready"
     created_at: datetime
     updated_at: datetime
 
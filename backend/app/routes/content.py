@@ -1,5 +1,7 @@
 """Content API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from database import get_db
 from app.models.schemas import (
@@ -8,69 +10,301 @@ from app.models.schemas import (
     SearchRequestSchema
 )
 from app.services.content_service import ContentService
-from typing import List
+from app.services.facet_service import FacetService, FACET_TYPES
+from app.services.tag_service import TagService
+from app.services.job_service import (
+    job_registry,
+    run_facet_rebuild_job,
+    run_import_job,
+    run_reclassify_job
+)
+from app.utils.facet_cache import facet_cache, GLOBAL_SCOPE
+from app.utils.import_parser import iter_import_urls
+from app.utils.url_extractor import URLExtractor
+from typing import Any, Callable, List, Optional
+import itertools
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/content", tags=["content"])
 
+# Handlers that use the sync DB session are plain ``def``: FastAPI runs them
+# in its threadpool, so their queries never block the event loop.
+
+# Search counts stop at this many matches and are reported as an estimate.
+SEARCH_COUNT_CAP = 1000
+
+# Links read from one import file; the rest of the file is ignored.
+IMPORT_MAX_LINKS = int(os.getenv("IMPORT_MAX_LINKS", 20000))
+
+
+def _cached(
+    request: Request,
+    response: Response,
+    scope: str,
+    name: str,
+    load: Callable[[], Any]
+):
+    """Serve a facet from ``facet_cache`` with an ETag.
+
+    A matching ``If-None-Match`` gets an empty 304; the DB is only queried
+    when the cached value was invalidated by a write.
+    """
+    cached = facet_cache.get(scope, name)
+    if cached is None:
+        version = facet_cache.version(scope)
+        cached = facet_cache.set(scope, name, load(), version)
+    value, etag = cached
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return value
+
 
 @router.get("/users", response_model=List[str])
-async def get_users(db: Session = Depends(get_db)):
+def get_users(request: Request, response: Response, db: Session = Depends(get_db)):
     """Get all user IDs that currently have saved content."""
     try:
-        return ContentService.get_users(db)
+        return _cached(
+            request, response, GLOBAL_SCOPE, "users",
+            lambda: ContentService.get_users(db)
+        )
     except Exception as e:
         logger.error(f"Error fetching users: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch users")
 
 
 @router.post("/", response_model=SavedContentSchema)
-async def create_content(
+def create_content(
     content: CreateSavedContentSchema,
     db: Session = Depends(get_db)
 ):
     """Create a new saved content entry."""
     try:
         return ContentService.create_content(db, content)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Content already saved")
     except Exception as e:
         logger.error(f"Error creating content: {e}")
         raise HTTPException(status_code=500, detail="Failed to create content")
 
 
 @router.get("/{user_id}/all", response_model=List[SavedContentSchema])
-async def get_user_content(
+def get_user_content(
     user_id: str,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Deprecated offset paging; use cursor"),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    tag: Optional[str] = Query(None, description="Exact hashtag, or a prefix ending in *"),
     db: Session = Depends(get_db)
 ):
-    """Get all saved content for a user."""
+    """Get saved content for a user, newest first.
+
+    The cursor for the next page is returned in the ``X-Next-Cursor`` header
+    and is absent on the last page.
+    """
     try:
-        return ContentService.get_user_content(db, user_id, skip, limit, False)
+        if skip and not cursor and not tag:
+            return ContentService.get_user_content(db, user_id, skip, limit, False)
+
+        items, next_cursor = ContentService.get_user_content_page(
+            db, user_id, limit, cursor, False, tag
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return items
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Error fetching user content: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch content")
 
 
 @router.get("/{user_id}/search", response_model=List[SavedContentSchema])
-async def search_content(
+def search_content(
     user_id: str,
+    response: Response,
     q: str = Query(..., min_length=1),
     category: str = Query(None),
     platform: str = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    stream: bool = Query(False, description="Stream every match as NDJSON"),
+    mode: str = Query("keyword", pattern="^(keyword|semantic|hybrid)$"),
+    tag: Optional[str] = Query(None, description="Exact hashtag, or a prefix ending in *"),
     db: Session = Depends(get_db)
 ):
-    """Search user's saved content."""
+    """Search user's saved content.
+
+    Returns one page of results ordered by relevance, with the next page's
+    cursor in ``X-Next-Cursor`` and, on the first page, a match count in
+    ``X-Total-Count`` (capped, flagged by ``X-Total-Count-Estimated``).
+    With ``stream=true`` every match is streamed as newline-delimited JSON.
+
+    ``mode=semantic`` ranks by embedding similarity and ``mode=hybrid`` fuses
+    the keyword and semantic rankings; both return a single page of ``limit``.
+    """
     try:
-        return ContentService.search_content(db, user_id, q, category, platform)
+        if mode == "semantic":
+            return ContentService.semantic_search(db, user_id, q, category, platform, limit, tag=tag)
+        if mode == "hybrid":
+            return ContentService.hybrid_search(db, user_id, q, category, platform, limit, tag=tag)
+
+        if stream:
+            rows = ContentService.stream_search_content(
+                db, user_id, q, category, platform, cursor, tag=tag
+            )
+            return StreamingResponse(
+                (SavedContentSchema.model_validate(row).model_dump_json() + "\n" for row in rows),
+                media_type="application/x-ndjson"
+            )
+
+        items, next_cursor, total = ContentService.search_content_page(
+            db, user_id, q, category, platform, limit, cursor, SEARCH_COUNT_CAP, tag
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        if total is not None:
+            response.headers["X-Total-Count"] = str(total)
+            response.headers["X-Total-Count-Estimated"] = str(total >= SEARCH_COUNT_CAP).lower()
+        return items
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Error searching content: {e}")
         raise HTTPException(status_code=500, detail="Failed to search content")
 
 
+@router.post("/{user_id}/reclassify", status_code=202)
+async def reclassify_content(
+    user_id: str,
+    background_tasks: BackgroundTasks,
+    category: Optional[str] = Query(None, description="Only re-classify items in this category")
+):
+    """Start a background job that re-runs AI classification on a user's content."""
+    job = job_registry.create("reclassify", user_id)
+    background_tasks.add_task(run_reclassify_job, job, category)
+    return job.to_dict()
+
+
+@router.post("/{user_id}/import", status_code=202)
+def import_content(
+    user_id: str,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="Exported saves as .csv, .json or .jsonl"),
+    db: Session = Depends(get_db)
+):
+    """Import links from an exported saves file and enrich them in the background.
+
+    Links are stored right away as ``importing`` entries; poll the returned
+    job for scraping and classification progress. The whole file is parsed
+    before anything is stored, so a malformed file imports nothing.
+    """
+    links = []
+    unsupported = 0
+    try:
+        urls = itertools.islice(iter_import_urls(file.file, file.filename or ""), IMPORT_MAX_LINKS)
+        for url in urls:
+            platform = URLExtractor.identify_platform(url)
+            if platform == "other":
+                unsupported += 1
+                continue
+            links.append((platform, url))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        content_ids, skipped = ContentService.import_links(db, user_id, links)
+    except Exception as e:
+        logger.error(f"Error importing content: {e}")
+        raise HTTPException(status_code=500, detail="Failed to import content")
+
+    job = job_registry.create("import", user_id)
+    job.skipped = skipped + unsupported
+    job.total = len(content_ids)
+    background_tasks.add_task(run_import_job, job, content_ids)
+    return job.to_dict()
+
+
+@router.get("/{user_id}/jobs/{job_id}")
+async def get_job(user_id: str, job_id: str):
+    """Get the progress of a background job."""
+    job = job_registry.get(job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/{user_id}/facets")
+def get_facets(
+    user_id: str,
+    request: Request,
+    response: Response,
+    facet_type: Optional[str] = Query(None, alias="type", pattern="^(category|platform)$"),
+    db: Session = Depends(get_db)
+):
+    """Item counts per category and platform, from the ``user_facets`` summary.
+
+    Returns ``{"category": [...], "platform": [...]}``, each entry holding
+    ``value``, ``count`` and ``last_saved_at``, largest first.
+    """
+    types = [facet_type] if facet_type else list(FACET_TYPES)
+
+    def load():
+        return {
+            name: [
+                {
+                    "value": f.value,
+                    "count": f.count,
+                    "last_saved_at": f.last_saved_at.isoformat() if f.last_saved_at else None
+                }
+                for f in FacetService.get_facets(db, user_id, name)
+            ]
+            for name in types
+        }
+
+    try:
+        return _cached(request, response, user_id, f"facets:{','.join(types)}", load)
+    except Exception as e:
+        logger.error(f"Error fetching facets: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch facets")
+
+
+@router.get("/{user_id}/tags")
+def get_top_tags(
+    user_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """A user's most used hashtags as ``[{"tag", "count"}]``, most used first."""
+    try:
+        return _cached(
+            request, response, user_id, f"tags:{limit}",
+            lambda: TagService.top_tags(db, user_id, limit)
+        )
+    except Exception as e:
+        logger.error(f"Error fetching tags: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch tags")
+
+
+@router.post("/{user_id}/facets/rebuild", status_code=202)
+async def rebuild_facets(user_id: str, background_tasks: BackgroundTasks):
+    """Start a job that recomputes the user's facet counts from their content."""
+    job = job_registry.create("facet_rebuild", user_id)
+    background_tasks.add_task(run_facet_rebuild_job, job)
+    return job.to_dict()
+
+
 @router.get("/{user_id}/{content_id}", response_model=SavedContentSchema)
-async def get_content(
+def get_content(
     user_id: str,
     content_id: int,
     db: Session = Depends(get_db)
@@ -89,7 +323,7 @@ async def get_content(
 
 
 @router.put("/{user_id}/{content_id}", response_model=SavedContentSchema)
-async def update_content(
+def update_content(
     user_id: str,
     content_id: int,
     updates: dict,
@@ -109,7 +343,7 @@ async def update_content(
 
 
 @router.delete("/{user_id}/{content_id}")
-async def delete_content(
+def delete_content(
     user_id: str,
     content_id: int,
     db: Session = Depends(get_db)
@@ -128,20 +362,36 @@ async def delete_content(
 
 
 @router.get("/{user_id}/filters/categories", response_model=List[str])
-async def get_categories(user_id: str, db: Session = Depends(get_db)):
+def get_categories(
+    user_id: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
     """Get all categories for a user."""
     try:
-        return ContentService.get_categories(db, user_id)
+        return _cached(
+            request, response, user_id, "categories",
+            lambda: ContentService.get_categories(db, user_id)
+        )
     except Exception as e:
         logger.error(f"Error fetching categories: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch categories")
 
 
 @router.get("/{user_id}/filters/platforms", response_model=List[str])
-async def get_platforms(user_id: str, db: Session = Depends(get_db)):
+def get_platforms(
+    user_id: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
     """Get all platforms for a user."""
     try:
-        return ContentService.get_platforms(db, user_id)
+        return _cached(
+            request, response, user_id, "platforms",
+            lambda: ContentService.get_platforms(db, user_id)
+        )
     except Exception as e:
         logger.error(f"Error fetching platforms: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch platforms")
@@ -1,9 +1,69 @@
 """Health and status endpoints."""
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.utils.extraction_cache import extraction_cache
+from app.utils.classification_cache import classification_cache
+from app.utils.facet_cache import facet_cache
+from app.utils.message_idempotency import message_idempotency
+from app.utils.local_classifier import local_classifier
+from app.utils.metrics import classifications, local_agreement, registry
+from app.utils.scrape_scheduler import scrape_scheduler
+from app.services.whatsapp_service import whatsapp_handler
 
 router = APIRouter(prefix="/api", tags=["status"])
 
 
+def _cache_metrics():
+    caches = {
+        "extraction": extraction_cache.stats(),
+        "classification": classification_cache.stats(),
+        "facets": facet_cache.stats(),
+    }
+    return [(
+        "socialsaver_cache_lookups_total",
+        "counter",
+        "Cache lookups by cache and result",
+        [
+            ({"cache": name, "result": result}, stats[key])
+            for name, stats in caches.items()
+            for result, key in (("hit", "hits"), ("miss", "misses"))
+        ]
+    )]
+
+
+def _circuit_metrics():
+    circuits = whatsapp_handler.ai_processor.circuit_stats()
+    return [
+        (
+            "socialsaver_hf_circuit_open",
+            "gauge",
+            "1 while a model's circuit is open or half-open",
+            [({"model": model}, int(stats["state"] != "closed")) for model, stats in circuits.items()]
+        ),
+        (
+            "socialsaver_hf_timeout_seconds",
+            "gauge",
+            "Current adaptive inference timeout per model",
+            [({"model": model}, stats["timeout_seconds"]) for model, stats in circuits.items()]
+        ),
+    ]
+
+
+def _scrape_metrics():
+    backing_off = scrape_scheduler.stats()["backing_off"]
+    return [(
+        "socialsaver_scrape_backoff_seconds",
+        "gauge",
+        "Seconds until a rate-limited host may be scraped again",
+        [({"host": host}, seconds) for host, seconds in backing_off.items()]
+    )]
+
+
+registry.add_collector(_cache_metrics)
+registry.add_collector(_circuit_metrics)
+registry.add_collector(_scrape_metrics)
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -22,3 +82,55 @@ async def root():
         "version": "1.0.0",
         "docs": "/docs"
     }
+
+
+@router.get("/stats/cache")
+async def cache_stats():
+    """Hit/miss counters for the shared caches."""
+    return {
+        "extraction": extraction_cache.stats(),
+        "classification": classification_cache.stats(),
+        "facets": facet_cache.stats(),
+        "webhook_replies": message_idempotency.stats()
+    }
+
+
+@router.get("/stats/scrape")
+async def scrape_stats():
+    """Hosts tracked by the scrape scheduler and those currently backing off."""
+    return scrape_scheduler.stats()
+
+
+@router.get("/stats/inference")
+async def inference_stats():
+    """Circuit state per model, and how much the local classifier answers."""
+    tiers = {tier: int(classifications.value(tier=tier)) for tier in ("local", "cache", "llm")}
+    agreement = {
+        confident: {
+            result: int(local_agreement.value(confident=confident, result=result))
+            for result in ("agree", "disagree")
+        }
+        for confident in ("true", "false")
+    }
+    audited = sum(agreement["true"].values())
+    total = sum(tiers.values())
+    await local_classifier.refresh()
+    return {
+        "models": whatsapp_handler.ai_processor.circuit_stats(),
+        "local_classifier": {
+            **local_classifier.stats(),
+            "classifications": tiers,
+            "llm_calls_avoided": round(tiers["local"] / total, 4) if total else None,
+            "agreement": agreement,
+            "audited_agreement_rate": round(agreement["true"]["agree"] / audited, 4) if audited else None
+        }
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Counters and latency histograms in the Prometheus text format."""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
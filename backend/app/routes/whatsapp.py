@@ -2,53 +2,114 @@ from fastapi import APIRouter, Request, Depends
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from database import get_db
-from app.services.whatsapp_service import WhatsAppHandler
-from app.services.content_service import ContentService
+from app.services.whatsapp_service import whatsapp_handler
+from app.services.content_service import ContentService, SavedLinks
+from app.services.ingestion_service import IngestionQueue, IngestionJob
+from app.services.reclassify_service import Reclassifier
+from app.utils.message_idempotency import MessageInProgress, message_idempotency
+from app.utils.metrics import span
 from twilio.twiml.messaging_response import MessagingResponse
+from typing import List, Tuple
+import asyncio
 import logging
-import traceback
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/whatsapp", tags=["whatsapp"])
 
-whatsapp_handler = WhatsAppHandler()
+ingestion_queue = IngestionQueue(whatsapp_handler)
+reclassifier = Reclassifier(whatsapp_handler.ai_processor)
+
+
+def _twiml(message: str) -> str:
+    twiml = MessagingResponse()
+    twiml.message(message)
+    return str(twiml)
+
+
+def _twiml_response(message: str) -> Response:
+    return Response(
+        content=_twiml(message),
+        media_type="application/xml"
+    )
+
+
+def _save_links(db: Session, user_id: str, links: List[Tuple[str, str]]) -> Tuple[SavedLinks, List[str]]:
+    """Store new links and describe the known ones; blocking, run it in a thread."""
+    saved = ContentService.save_links(db, user_id, links)
+    service = whatsapp_handler.whatsapp_service
+    replies = [
+        service.format_already_saved_message(row.title, row.original_url, restored=True)
+        for row in saved.restored
+    ] + [
+        service.format_already_saved_message(row.title, row.original_url)
+        for row in saved.existing
+    ]
+    return saved, replies
 
 
 @router.post("/webhook")
 async def whatsapp_webhook(request: Request, db: Session = Depends(get_db)):
+    """Acknowledge a message right away and hand its new links to the workers.
+
+    Links the user already saved are answered from the database alone.
+    Twilio retries of a message (same ``MessageSid``) get the first reply, or
+    an empty one while another worker is still handling it.
+    """
 
     try:
-        form_data = await request.form()
-        from_number = form_data.get("From", "").replace("whatsapp:", "")
-        body = form_data.get("Body", "")
+        with span("webhook_parse"):
+            form_data = await request.form()
+            from_number = form_data.get("From", "").replace("whatsapp:", "")
+            body = form_data.get("Body", "")
 
-        success, response_text, extracted_data = (
-            whatsapp_handler.process_message(from_number, body)
+        content = await message_idempotency.run(
+            form_data.get("MessageSid"),
+            from_number,
+            lambda: _handle_message(db, from_number, body)
         )
+        return Response(content=content, media_type="application/xml")
 
-        if success and extracted_data:
-            extracted_data["user_id"] = from_number
+    except MessageInProgress:
+        # Another worker is still on the first delivery and will answer it.
+        return Response(content=str(MessagingResponse()), media_type="application/xml")
 
-            from app.models.schemas import CreateSavedContentSchema
-            content_schema = CreateSavedContentSchema(**extracted_data)
-            ContentService.create_content(db, content_schema)
+    except Exception:
+        logger.exception("Error handling WhatsApp webhook")
+        return _twiml_response("😅 Something went wrong. Please try again!")
 
-        twiml = MessagingResponse()
-        twiml.message(response_text)
 
-        return Response(
-            content=str(twiml),
-            media_type="application/xml"
-        )
+async def _handle_message(db: Session, from_number: str, body: str) -> Tuple[str, bool]:
+    """Reply TwiML for one message, and whether a retry may replay it."""
+    with span("webhook_validate"):
+        urls, error_response = whatsapp_handler.validate_message(body)
+    if not urls:
+        return _twiml(error_response), True
 
-    except Exception:
-        logger.error("🔥 FULL ERROR TRACE BELOW:")
-        traceback.print_exc()
+    links = [
+        (whatsapp_handler.url_extractor.identify_platform(url), url)
+        for url in urls
+    ]
+    with span("webhook_save_links"):
+        saved, replies = await asyncio.to_thread(_save_links, db, from_number, links)
+
+    if not saved.queued:
+        return _twiml("\n\n".join(replies)), True
 
-        twiml = MessagingResponse()
-        twiml.message("😅 Something went wrong. Please try again!")
+    if not ingestion_queue.submit(IngestionJob(from_number, saved.queued)):
+        # Mark them failed so sending the link again retries them.
+        await asyncio.to_thread(ContentService.update_contents, db, from_number, {
+            content_id: {"status": "failed", "is_archived": True}
+            for content_id, _ in saved.queued
+        })
+        return _twiml(
+            "⏳ I'm a little busy right now. Please send the link again in a minute!"
+        ), False
 
-        return Response(
-            content=str(twiml),
-            media_type="application/xml"
-        )
\ No newline at end of file
+    if len(saved.queued) == 1:
+        ack = "⏳ Got it! I'm saving your link now and will message you once it's categorized."
+    else:
+        ack = (
+            f"⏳ Got it! I'm saving your {len(saved.queued)} links now and will message you "
+            "once they're categorized."
+        )
+    return _twiml("\n\n".join([ack] + replies)), True
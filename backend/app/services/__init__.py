@@ -2,5 +2,15 @@
 
 from app.services.content_service import ContentService
 from app.services.whatsapp_service import WhatsAppHandler, WhatsAppService
+from app.services.ingestion_service import IngestionQueue, IngestionJob
+from app.services.job_service import JobRegistry, job_registry
 
-__all__ = ["ContentService", "WhatsAppHandler", "WhatsAppService"]
+__all__ = [
+    "ContentService",
+    "WhatsAppHandler",
+    "WhatsAppService",
+    "IngestionQueue",
+    "IngestionJob",
+    "JobRegistry",
+    "job_registry",
+]
@@ -0,0 +1,74 @@
+"""Training the local first-tier classifier from labelled saves."""
+import logging
+import random
+from typing import Dict, Iterator, List, Tuple
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.models.database import SavedContent
+from app.utils.ai_processor import AIProcessor
+from app.utils.local_classifier import NaiveBayesModel, classifier_text
+
+logger = logging.getLogger(__name__)
+
+Document = Tuple[str, str]  # (text, category)
+
+
+def labelled_documents(db: Session, batch_size: int = 2000) -> Iterator[Document]:
+    """Saves labelled by the LLM or by hand, never by the local model itself."""
+    last_id = 0
+    while True:
+        rows = db.query(
+            SavedContent.id, SavedContent.caption, SavedContent.title, SavedContent.category
+        ).filter(
+            SavedContent.id > last_id,
+            SavedContent.status == "ready",
+            SavedContent.category.in_(AIProcessor.CATEGORIES),
+            SavedContent.summary.notin_(AIProcessor.FALLBACK_SUMMARIES),
+            or_(SavedContent.classified_by.is_(None), SavedContent.classified_by != "local"),
+            or_(SavedContent.needs_classification.is_(None), SavedContent.needs_classification == False)
+        ).order_by(SavedContent.id).limit(batch_size).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        for row in rows:
+            yield classifier_text(row.caption, row.title), row.category
+
+
+def evaluate(model: NaiveBayesModel, documents: List[Document], threshold: float) -> Dict:
+    """Accuracy overall, and coverage/accuracy of the predictions above ``threshold``."""
+    correct = confident = confident_correct = 0
+    for text, category in documents:
+        prediction = model.predict(text)
+        hit = prediction is not None and prediction.category == category
+        correct += hit
+        if prediction is not None and prediction.confidence >= threshold:
+            confident += 1
+            confident_correct += hit
+    total = len(documents)
+    return {
+        "samples": total,
+        "accuracy": round(correct / total, 4) if total else None,
+        "coverage": round(confident / total, 4) if total else None,
+        "confident_accuracy": round(confident_correct / confident, 4) if confident else None,
+    }
+
+
+def train(db: Session, threshold: float, holdout: float = 0.1, seed: int = 0) -> Tuple[NaiveBayesModel, Dict]:
+    """Fit on the labelled saves, holding out a share to report quality on.
+
+    The returned model is refitted on every document.
+    """
+    documents = list(labelled_documents(db))
+    random.Random(seed).shuffle(documents)
+    split = int(len(documents) * holdout)
+    test, train_set = documents[:split], documents[split:]
+
+    report = {"threshold": threshold}
+    if test:
+        report["holdout"] = evaluate(
+            NaiveBayesModel.train(train_set, AIProcessor.CATEGORIES), test, threshold
+        )
+    model = NaiveBayesModel.train(documents, AIProcessor.CATEGORIES)
+    model.info["holdout"] = report.get("holdout")
+    report["model"] = model.info
+    return model, report
@@ -1,26 +1,266 @@
 """Service layer for saved content operations."""
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Query, Session
+from sqlalchemy import or_, and_, func, insert, literal_column, tuple_
+from sqlalchemy.sql import table, column
+from sqlalchemy.exc import IntegrityError
 from app.models.database import SavedContent
 from app.models.schemas import CreateSavedContentSchema
+from app.utils.search_query import to_fts5_query, to_tsquery
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.facet_cache import facet_cache
+from app.utils.url_canonical import canonicalize_url
+from app.services.vector_index import vector_index
+from app.services.near_duplicate_index import near_duplicate_index
+from app.services.facet_service import FacetService
+from app.services.tag_service import TagService
+from database import search_index
 import logging
 
 logger = logging.getLogger(__name__)
 
+_fts = table(search_index.FTS_TABLE, column("rowid"), column(search_index.FTS_TABLE))
+_search_vector = literal_column(f"saved_content.{search_index.TSVECTOR_COLUMN}")
+
+# bm25() column weights, in FTS table column order: title, caption, summary, hashtags.
+_BM25_WEIGHTS = (10.0, 1.0, 4.0, 8.0)
+
+
+@dataclass
+class SavedLinks:
+    """Outcome of ``ContentService.save_links`` for one message."""
+    queued: List[Tuple[int, str]] = field(default_factory=list)  # (content_id, url) to enrich
+    restored: List[SavedContent] = field(default_factory=list)  # un-archived, no work needed
+    existing: List[SavedContent] = field(default_factory=list)  # already saved or in progress
+
 
 class ContentService:
     """Service for managing saved content."""
     
+    @staticmethod
+    def _sync_indexes(db: Session, rows: List[SavedContent]) -> None:
+        """Keep derived indexes in step with rows written in this transaction."""
+        live = [r for r in rows if not r.is_archived and r.status == "ready"]
+        vector_index.index_contents(db, live)
+        near_duplicate_index.index_contents(db, live)
+        TagService.sync(db, rows)
+        for row in rows:
+            if row.is_archived or row.status != "ready":
+                vector_index.remove(db, row.user_id, [row.id])
+                near_duplicate_index.remove(db, [row.id])
+    
     @staticmethod
     def create_content(db: Session, content: CreateSavedContentSchema) -> SavedContent:
-        """Create a new saved content entry."""
-        db_content = SavedContent(**content.dict())
+        """Create a new saved content entry.
+
+        Raises ``IntegrityError`` if the user already saved the same link.
+        """
+        db_content = SavedContent(
+            **content.dict(),
+            canonical_url=canonicalize_url(content.original_url)
+        )
         db.add(db_content)
+        db.flush()
+        ContentService._sync_indexes(db, [db_content])
         db.commit()
+        facet_cache.invalidate(content.user_id, new_rows=True)
         db.refresh(db_content)
         return db_content
     
+    @staticmethod
+    def find_saved_links(
+        db: Session,
+        user_id: str,
+        canonical_urls: List[str]
+    ) -> Dict[str, SavedContent]:
+        """Look up a user's entries by canonical URL through the unique index."""
+        if not canonical_urls:
+            return {}
+        rows = db.query(SavedContent).filter(
+            and_(
+                SavedContent.user_id == user_id,
+                SavedContent.canonical_url.in_(canonical_urls)
+            )
+        ).all()
+        return {row.canonical_url: row for row in rows}
+    
+    @staticmethod
+    def save_links(
+        db: Session,
+        user_id: str,
+        links: List[Tuple[str, str]],
+        _retry: bool = True
+    ) -> SavedLinks:
+        """Store ``(platform, url)`` links, skipping ones the user already has.
+
+        Links are matched on their canonical URL, so platform URL variants of
+        one post collapse to a single entry, with no network I/O. New links get
+        a pending entry; failed ones are set pending again and archived ones are
+        restored. A link stored as a near-duplicate stands for the post it
+        duplicates, or is scraped again if that post is gone. Everything
+        happens in one transaction.
+        """
+        by_canonical = {}
+        for platform, url in links:
+            by_canonical.setdefault(canonicalize_url(url), (platform, url))
+        
+        found = ContentService.find_saved_links(db, user_id, list(by_canonical))
+        originals = ContentService._duplicated_rows(db, user_id, found.values())
+        result = SavedLinks()
+        new_rows = []
+        seen = set()
+        for canonical, (platform, url) in by_canonical.items():
+            row = found.get(canonical)
+            if row is not None and row.status == "duplicate":
+                row = originals.get(row.duplicate_of, row)
+            if row is not None:
+                if row.id in seen:
+                    continue
+                seen.add(row.id)
+            if row is None:
+                new_rows.append(SavedContent(
+                    user_id=user_id,
+                    platform=platform,
+                    original_url=url,
+                    canonical_url=canonical,
+                    status="pending"
+                ))
+            elif row.status in ("failed", "duplicate"):
+                row.status = "pending"
+                row.is_archived = False
+                row.duplicate_of = None
+                result.queued.append((row.id, row.original_url))
+            elif row.status == "ready" and row.is_archived:
+                row.is_archived = False
+                result.restored.append(row)
+            else:
+                result.existing.append(row)
+        
+        try:
+            db.add_all(new_rows)
+            db.flush()
+        except IntegrityError:
+            # The same link arrived concurrently in another message.
+            db.rollback()
+            if not _retry:
+                raise
+            return ContentService.save_links(db, user_id, links, _retry=False)
+        
+        result.queued.extend((row.id, row.original_url) for row in new_rows)
+        ContentService._sync_indexes(db, result.restored)
+        db.commit()
+        if result.queued or result.restored:
+            facet_cache.invalidate(user_id, new_rows=bool(new_rows))
+        return result
+    
+    @staticmethod
+    def _duplicated_rows(
+        db: Session,
+        user_id: str,
+        rows: Iterable[SavedContent]
+    ) -> Dict[int, SavedContent]:
+        """The posts that near-duplicate ``rows`` stand for, by id."""
+        ids = [row.duplicate_of for row in rows if row.status == "duplicate" and row.duplicate_of]
+        if not ids:
+            return {}
+        return {
+            row.id: row
+            for row in db.query(SavedContent).filter(
+                and_(SavedContent.user_id == user_id, SavedContent.id.in_(ids))
+            )
+        }
+    
+    @staticmethod
+    def import_links(
+        db: Session,
+        user_id: str,
+        links: Iterable[Tuple[str, str]],
+        chunk_size: int = 1000
+    ) -> Tuple[List[int], int]:
+        """Bulk-insert ``(platform, url)`` links as ``importing`` entries.
+
+        Links are consumed lazily and written ``chunk_size`` at a time, each
+        chunk as one multi-row INSERT in its own transaction. Links the user
+        already saved, or repeated in the import, are skipped; failed and
+        unfinished imports of the same links are picked up again. Returns the
+        ids to enrich and the number skipped.
+        """
+        ids: List[int] = []
+        skipped = 0
+        seen = set()
+        chunk: Dict[str, Tuple[str, str]] = {}
+        
+        for platform, url in links:
+            canonical = canonicalize_url(url)
+            if canonical in seen:
+                skipped += 1
+                continue
+            seen.add(canonical)
+            chunk[canonical] = (platform, url)
+            if len(chunk) >= chunk_size:
+                new_ids = ContentService._insert_import_chunk(db, user_id, chunk)
+                ids.extend(new_ids)
+                skipped += len(chunk) - len(new_ids)
+                chunk = {}
+        
+        if chunk:
+            new_ids = ContentService._insert_import_chunk(db, user_id, chunk)
+            ids.extend(new_ids)
+            skipped += len(chunk) - len(new_ids)
+        return ids, skipped
+    
+    @staticmethod
+    def _insert_import_chunk(
+        db: Session,
+        user_id: str,
+        chunk: Dict[str, Tuple[str, str]],
+        _retry: bool = True
+    ) -> List[int]:
+        found = ContentService.find_saved_links(db, user_id, list(chunk))
+        retried = [
+            row for row in found.values()
+            if row.status == "failed" or row.status == "importing"
+        ]
+        retried_ids = []
+        for row in retried:
+            row.status = "importing"
+            row.is_archived = False
+            retried_ids.append(row.id)
+        rows = [
+            {
+                "user_id": user_id,
+                "platform": platform,
+                "original_url": url,
+                "canonical_url": canonical,
+                "status": "importing"
+            }
+            for canonical, (platform, url) in chunk.items()
+            if canonical not in found
+        ]
+        if not rows:
+            db.commit()
+            facet_cache.invalidate(user_id)
+            return retried_ids
+        
+        try:
+            ids = db.execute(
+                insert(SavedContent).returning(SavedContent.id, sort_by_parameter_order=True),
+                rows
+            ).scalars().all()
+            # Core inserts bypass the flush hook that maintains user_facets.
+            FacetService.apply(db.connection(), *FacetService.count_rows(rows))
+            db.commit()
+            facet_cache.invalidate(user_id, new_rows=True)
+        except IntegrityError:
+            # A link in the chunk was saved concurrently; look again.
+            db.rollback()
+            if not _retry:
+                raise
+            return ContentService._insert_import_chunk(db, user_id, chunk, _retry=False)
+        return retried_ids + ids
+    
     @staticmethod
     def get_content_by_id(db: Session, content_id: int, user_id: str) -> Optional[SavedContent]:
         """Get content by ID for a specific user."""
@@ -50,33 +290,262 @@ class ContentService:
         return query.offset(skip).limit(limit).all()
     
     @staticmethod
-    def search_content(
+    def get_user_content_page(
+        db: Session,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        archived: bool = False,
+        tag: Optional[str] = None
+    ) -> Tuple[List[SavedContent], Optional[str]]:
+        """Get one page of a user's content using keyset pagination.
+
+        Pages are ordered by ``(created_at, id)`` descending and seek past the
+        cursor through ``ix_saved_content_user_feed``, so every page costs the
+        same regardless of depth. ``tag`` keeps items with that hashtag
+        (``fit*`` for a prefix). Returns the items and the next cursor, which
+        is None on the last page. Raises ValueError for a malformed cursor.
+        """
+        query = db.query(SavedContent).filter(
+            and_(
+                SavedContent.user_id == user_id,
+                SavedContent.is_archived == archived
+            )
+        )
+        if tag:
+            query = query.filter(TagService.tag_filter(user_id, tag))
+        
+        if cursor:
+            created_at, content_id = decode_cursor(cursor)
+            if not isinstance(created_at, datetime):
+                raise ValueError("Invalid cursor")
+            query = query.filter(
+                tuple_(SavedContent.created_at, SavedContent.id)
+                < tuple_(created_at, content_id)
+            )
+        
+        items = query.order_by(
+            SavedContent.created_at.desc(),
+            SavedContent.id.desc()
+        ).limit(limit + 1).all()
+        
+        if len(items) <= limit:
+            return items, None
+        items = items[:limit]
+        return items, encode_cursor(items[-1].created_at, items[-1].id)
+    
+    @staticmethod
+    def _search_query(
         db: Session,
         user_id: str,
         query: str,
         category: Optional[str] = None,
-        platform: Optional[str] = None
-    ) -> List[SavedContent]:
-        """Search user's content."""
+        platform: Optional[str] = None,
+        tag: Optional[str] = None
+    ) -> Optional[Query]:
+        """Build a search query selecting ``(SavedContent, score)``.
+
+        Rows are ordered by ``(score, id)`` descending, where score is the
+        full-text relevance when an index is installed and ``created_at`` for
+        the ilike fallback. Returns None when the query has no searchable terms.
+        """
         filters = [
             SavedContent.user_id == user_id,
-            SavedContent.is_archived == False,
-            or_(
-                SavedContent.caption.ilike(f"%{query}%"),
-                SavedContent.title.ilike(f"%{query}%"),
-                SavedContent.summary.ilike(f"%{query}%"),
-                SavedContent.hashtags.ilike(f"%{query}%")
-            )
+            SavedContent.is_archived == False
         ]
         
         if category:
             filters.append(SavedContent.category.ilike(f"%{category}%"))
         if platform:
             filters.append(SavedContent.platform == platform)
+        if tag:
+            filters.append(TagService.tag_filter(user_id, tag))
         
-        return db.query(SavedContent).filter(and_(*filters)).order_by(
-            SavedContent.created_at.desc()
-        ).all()
+        dialect = db.get_bind().dialect.name
+        if search_index.installed_dialect == dialect == "sqlite":
+            match = to_fts5_query(query)
+            if not match:
+                return None
+            # bm25() is lower-is-better; negate it so every backend sorts descending.
+            score = -func.bm25(literal_column(search_index.FTS_TABLE), *_BM25_WEIGHTS)
+            return db.query(SavedContent, score.label("score")).join(
+                _fts, _fts.c.rowid == SavedContent.id
+            ).filter(
+                _fts.c[search_index.FTS_TABLE].op("MATCH")(match),
+                *filters
+            )
+        
+        if search_index.installed_dialect == dialect == "postgresql":
+            expression = to_tsquery(query)
+            if not expression:
+                return None
+            ts_query = func.to_tsquery("english", expression)
+            score = func.ts_rank_cd(_search_vector, ts_query)
+            return db.query(SavedContent, score.label("score")).filter(
+                _search_vector.op("@@")(ts_query),
+                *filters
+            )
+        
+        filters.append(or_(
+            SavedContent.caption.ilike(f"%{query}%"),
+            SavedContent.title.ilike(f"%{query}%"),
+            SavedContent.summary.ilike(f"%{query}%"),
+            SavedContent.hashtags.ilike(f"%{query}%")
+        ))
+        return db.query(SavedContent, SavedContent.created_at.label("score")).filter(
+            and_(*filters)
+        )
+    
+    @staticmethod
+    def _seek(search: Query, cursor: Optional[str]) -> Query:
+        """Order a search query and seek past the cursor, if any."""
+        score = search.selectable.selected_columns.score
+        if cursor:
+            last_score, content_id = decode_cursor(cursor)
+            search = search.filter(
+                tuple_(score, SavedContent.id) < tuple_(last_score, content_id)
+            )
+        return search.order_by(score.desc(), SavedContent.id.desc())
+    
+    @staticmethod
+    def search_content_page(
+        db: Session,
+        user_id: str,
+        query: str,
+        category: Optional[str] = None,
+        platform: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        count_cap: int = 1000,
+        tag: Optional[str] = None
+    ) -> Tuple[List[SavedContent], Optional[str], Optional[int]]:
+        """Get one page of search results, ordered by relevance.
+
+        Bare words match as prefixes and double-quoted text as a phrase.
+        Uses the full-text index when one is installed, otherwise falls back
+        to a substring scan ordered by recency.
+
+        Returns the items, the next cursor (None on the last page) and, for
+        the first page only, a match count capped at ``count_cap``. A count
+        equal to the cap means "at least this many". Raises ValueError for a
+        malformed cursor.
+        """
+        search = ContentService._search_query(db, user_id, query, category, platform, tag)
+        if search is None:
+            return [], None, 0 if not cursor else None
+        
+        total = None
+        if not cursor:
+            capped = search.with_entities(SavedContent.id).limit(count_cap).subquery()
+            total = db.query(func.count()).select_from(capped).scalar()
+        
+        rows = ContentService._seek(search, cursor).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last, score = rows[-1]
+            next_cursor = encode_cursor(score, last.id)
+        return [row[0] for row in rows], next_cursor, total
+    
+    @staticmethod
+    def stream_search_content(
+        db: Session,
+        user_id: str,
+        query: str,
+        category: Optional[str] = None,
+        platform: Optional[str] = None,
+        cursor: Optional[str] = None,
+        batch_size: int = 200,
+        tag: Optional[str] = None
+    ) -> Iterator[SavedContent]:
+        """Iterate over every matching row, fetching ``batch_size`` rows at a time.
+
+        Rows are streamed from the cursor with ``yield_per`` so memory stays
+        flat however many rows match. The query is built, and the cursor
+        decoded, before this returns, so a malformed cursor raises ValueError
+        here rather than once a streamed response has started.
+        """
+        search = ContentService._search_query(db, user_id, query, category, platform, tag)
+        if search is None:
+            return iter(())
+        rows = ContentService._seek(search, cursor).yield_per(batch_size)
+        return (content for content, _score in rows)
+    
+    @staticmethod
+    def _fetch_ranked(
+        db: Session,
+        user_id: str,
+        ids: List[int],
+        category: Optional[str] = None,
+        platform: Optional[str] = None,
+        tag: Optional[str] = None
+    ) -> List[SavedContent]:
+        """Load the live rows among ``ids``, keeping the order of ``ids``."""
+        if not ids:
+            return []
+        filters = [
+            SavedContent.id.in_(ids),
+            SavedContent.user_id == user_id,
+            SavedContent.is_archived == False
+        ]
+        if category:
+            filters.append(SavedContent.category.ilike(f"%{category}%"))
+        if platform:
+            filters.append(SavedContent.platform == platform)
+        if tag:
+            filters.append(TagService.tag_filter(user_id, tag))
+        
+        by_id = {row.id: row for row in db.query(SavedContent).filter(*filters)}
+        return [by_id[i] for i in ids if i in by_id]
+    
+    @staticmethod
+    def semantic_search(
+        db: Session,
+        user_id: str,
+        query: str,
+        category: Optional[str] = None,
+        platform: Optional[str] = None,
+        limit: int = 50,
+        tag: Optional[str] = None
+    ) -> List[SavedContent]:
+        """Search by embedding similarity to the query, most similar first."""
+        depth = limit * 4 if category or platform or tag else limit
+        hits = vector_index.search(db, user_id, query, depth)
+        ids = [content_id for content_id, _ in hits]
+        return ContentService._fetch_ranked(db, user_id, ids, category, platform, tag)[:limit]
+    
+    @staticmethod
+    def hybrid_search(
+        db: Session,
+        user_id: str,
+        query: str,
+        category: Optional[str] = None,
+        platform: Optional[str] = None,
+        limit: int = 50,
+        rrf_k: int = 60,
+        tag: Optional[str] = None
+    ) -> List[SavedContent]:
+        """Fuse keyword and vector rankings with reciprocal rank fusion.
+
+        Each list contributes ``1 / (rrf_k + rank)`` per item, so items ranked
+        well by both rise to the top without having to calibrate BM25 scores
+        against cosine similarities.
+        """
+        depth = limit * 4
+        keyword_ids = []
+        search = ContentService._search_query(db, user_id, query, category, platform, tag)
+        if search is not None:
+            keyword_ids = [
+                row[0].id for row in ContentService._seek(search, None).limit(depth)
+            ]
+        vector_ids = [content_id for content_id, _ in vector_index.search(db, user_id, query, depth)]
+        
+        fused: Dict[int, float] = {}
+        for ranking in (keyword_ids, vector_ids):
+            for rank, content_id in enumerate(ranking, start=1):
+                fused[content_id] = fused.get(content_id, 0.0) + 1.0 / (rrf_k + rank)
+        ordered = sorted(fused, key=fused.get, reverse=True)
+        return ContentService._fetch_ranked(db, user_id, ordered, category, platform, tag)[:limit]
     
     @staticmethod
     def update_content(
@@ -94,10 +563,36 @@ class ContentService:
             if hasattr(db_content, key):
                 setattr(db_content, key, value)
         
+        ContentService._sync_indexes(db, [db_content])
         db.commit()
+        facet_cache.invalidate(user_id)
         db.refresh(db_content)
         return db_content
     
+    @staticmethod
+    def update_contents(
+        db: Session,
+        user_id: str,
+        updates_by_id: Dict[int, dict]
+    ) -> int:
+        """Apply per-row updates to several entries in one transaction."""
+        rows = db.query(SavedContent).filter(
+            and_(
+                SavedContent.user_id == user_id,
+                SavedContent.id.in_(list(updates_by_id))
+            )
+        ).all()
+        
+        for row in rows:
+            for key, value in updates_by_id[row.id].items():
+                if hasattr(row, key):
+                    setattr(row, key, value)
+        
+        ContentService._sync_indexes(db, rows)
+        db.commit()
+        facet_cache.invalidate(user_id)
+        return len(rows)
+    
     @staticmethod
     def delete_content(db: Session, content_id: int, user_id: str) -> bool:
         """Archive/delete content entry."""
@@ -106,33 +601,20 @@ class ContentService:
             return False
         
         db_content.is_archived = True
+        ContentService._sync_indexes(db, [db_content])
         db.commit()
+        facet_cache.invalidate(user_id)
         return True
     
     @staticmethod
     def get_categories(db: Session, user_id: str) -> List[str]:
         """Get all unique categories for a user."""
-        results = db.query(SavedContent.category).filter(
-            and_(
-                SavedContent.user_id == user_id,
-                SavedContent.is_archived == False,
-                SavedContent.category.isnot(None)
-            )
-        ).distinct().all()
-        
-        return [r[0] for r in results if r[0]]
+        return [f.value for f in FacetService.get_facets(db, user_id, "category")]
     
     @staticmethod
     def get_platforms(db: Session, user_id: str) -> List[str]:
         """Get all unique platforms for a user."""
-        results = db.query(SavedContent.platform).filter(
-            and_(
-                SavedContent.user_id == user_id,
-                SavedContent.is_archived == False
-            )
-        ).distinct().all()
-        
-        return [r[0] for r in results if r[0]]
+        return [f.value for f in FacetService.get_facets(db, user_id, "platform")]
 
     @staticmethod
     def get_users(db: Session) -> List[str]:
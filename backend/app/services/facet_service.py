@@ -0,0 +1,218 @@
+"""Per-user category/platform counts kept in ``user_facets``."""
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import DateTime, and_, case, delete, event, func, inspect, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.models.database import SavedContent, UserFacet
+
+logger = logging.getLogger(__name__)
+
+FACET_TYPES = ("category", "platform")
+
+FacetKey = Tuple[str, str, str]  # (user_id, facet_type, value)
+
+_facets = UserFacet.__table__
+
+
+def contributions(
+    user_id: str,
+    platform: Optional[str],
+    category: Optional[str],
+    is_archived: Optional[bool]
+) -> List[FacetKey]:
+    """The facet keys one row counts towards: live rows only."""
+    if is_archived:
+        return []
+    keys = []
+    if platform:
+        keys.append((user_id, "platform", platform))
+    if category:
+        keys.append((user_id, "category", category))
+    return keys
+
+
+def _latest(current, new):
+    """SQL for the later of two nullable timestamps."""
+    new = new if hasattr(new, "is_") else literal(new, DateTime)
+    return case(
+        (current.is_(None), new),
+        (new > current, new),
+        else_=current
+    )
+
+
+def _previous(row: SavedContent, attribute: str):
+    history = inspect(row).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(row, attribute)
+
+
+class FacetService:
+    """Maintains ``user_facets`` alongside ``saved_content`` writes.
+
+    ORM writes are picked up in ``before_flush``, so the counts change in the
+    same transaction as the rows: inserts add to their platform and category,
+    archive flips and category or platform edits move counts between values.
+    Core bulk inserts report their rows through ``apply``. ``rebuild``
+    recomputes the table from ``saved_content`` if it ever drifts.
+    """
+
+    @staticmethod
+    def delta_for_flush(session: Session) -> Tuple[Counter, Dict[FacetKey, datetime]]:
+        delta: Counter = Counter()
+        saved_at: Dict[FacetKey, datetime] = {}
+
+        for row in session.new:
+            if isinstance(row, SavedContent):
+                for key in contributions(row.user_id, row.platform, row.category, row.is_archived):
+                    delta[key] += 1
+                    saved_at[key] = row.created_at or datetime.utcnow()
+
+        for row in session.dirty:
+            if not isinstance(row, SavedContent) or not session.is_modified(row):
+                continue
+            before = contributions(
+                row.user_id,
+                _previous(row, "platform"),
+                _previous(row, "category"),
+                _previous(row, "is_archived")
+            )
+            after = contributions(row.user_id, row.platform, row.category, row.is_archived)
+            for key in before:
+                delta[key] -= 1
+            for key in after:
+                delta[key] += 1
+                if row.created_at and (key not in saved_at or row.created_at > saved_at[key]):
+                    saved_at[key] = row.created_at
+
+        for row in session.deleted:
+            if isinstance(row, SavedContent):
+                for key in contributions(
+                    row.user_id,
+                    _previous(row, "platform"),
+                    _previous(row, "category"),
+                    _previous(row, "is_archived")
+                ):
+                    delta[key] -= 1
+
+        return delta, saved_at
+
+    @staticmethod
+    def apply(
+        conn: Connection,
+        delta: Counter,
+        saved_at: Optional[Dict[FacetKey, datetime]] = None
+    ) -> None:
+        """Add ``delta`` to the stored counts in one upsert per dialect."""
+        saved_at = saved_at or {}
+        changes = [(key, n) for key, n in delta.items() if n]
+        if not changes:
+            return
+
+        dialect = conn.dialect.name
+        for (user_id, facet_type, value), n in changes:
+            row = {
+                "user_id": user_id,
+                "facet_type": facet_type,
+                "value": value,
+                "count": n,
+                "last_saved_at": saved_at.get((user_id, facet_type, value)),
+            }
+            if dialect in ("sqlite", "postgresql"):
+                insert = (sqlite if dialect == "sqlite" else postgresql).insert(_facets)
+                conn.execute(insert.values(**row).on_conflict_do_update(
+                    index_elements=["user_id", "facet_type", "value"],
+                    set_={
+                        "count": _facets.c.count + insert.excluded.count,
+                        "last_saved_at": _latest(
+                            _facets.c.last_saved_at, insert.excluded.last_saved_at
+                        ),
+                    }
+                ))
+            else:
+                result = conn.execute(update(_facets).where(and_(
+                    _facets.c.user_id == user_id,
+                    _facets.c.facet_type == facet_type,
+                    _facets.c.value == value
+                )).values(
+                    count=_facets.c.count + n,
+                    last_saved_at=_latest(_facets.c.last_saved_at, row["last_saved_at"])
+                ))
+                if result.rowcount == 0:
+                    conn.execute(_facets.insert().values(**row))
+
+        users = {user_id for (user_id, _, _), n in changes if n < 0}
+        if users:
+            conn.execute(delete(_facets).where(and_(
+                _facets.c.user_id.in_(users), _facets.c.count <= 0
+            )))
+
+    @staticmethod
+    def rebuild(db: Session, user_id: Optional[str] = None) -> int:
+        """Recompute counts from ``saved_content``; the caller commits.
+
+        Returns the number of facet rows written.
+        """
+        conn = db.connection()
+        clear = delete(_facets)
+        if user_id is not None:
+            clear = clear.where(_facets.c.user_id == user_id)
+        conn.execute(clear)
+
+        written = 0
+        for facet_type in FACET_TYPES:
+            column = getattr(SavedContent, facet_type)
+            filters = [SavedContent.is_archived == False, column.isnot(None), column != ""]
+            if user_id is not None:
+                filters.append(SavedContent.user_id == user_id)
+            query = select(
+                SavedContent.user_id,
+                literal(facet_type),
+                column,
+                func.count(),
+                func.max(SavedContent.created_at)
+            ).where(*filters).group_by(SavedContent.user_id, column)
+            result = conn.execute(_facets.insert().from_select(
+                ["user_id", "facet_type", "value", "count", "last_saved_at"], query
+            ))
+            written += max(result.rowcount, 0)
+        return written
+
+    @staticmethod
+    def get_facets(db: Session, user_id: str, facet_type: str) -> List[UserFacet]:
+        """A user's facets of one type, largest first."""
+        return db.query(UserFacet).filter(
+            and_(
+                UserFacet.user_id == user_id,
+                UserFacet.facet_type == facet_type,
+                UserFacet.count > 0
+            )
+        ).order_by(UserFacet.count.desc(), UserFacet.value).all()
+
+    @staticmethod
+    def count_rows(rows: Iterable[Dict]) -> Tuple[Counter, Dict[FacetKey, datetime]]:
+        """Delta for rows inserted with Core, given as column dicts."""
+        delta: Counter = Counter()
+        saved_at: Dict[FacetKey, datetime] = {}
+        now = datetime.utcnow()
+        for row in rows:
+            for key in contributions(
+                row["user_id"], row.get("platform"), row.get("category"), row.get("is_archived")
+            ):
+                delta[key] += 1
+                saved_at[key] = row.get("created_at") or now
+        return delta, saved_at
+
+
+@event.listens_for(Session, "before_flush")
+def _track_facets(session: Session, flush_context, instances) -> None:
+    delta, saved_at = FacetService.delta_for_flush(session)
+    if delta:
+        FacetService.apply(session.connection(), delta, saved_at)
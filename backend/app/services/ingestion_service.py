@@ -0,0 +1,206 @@
+"""Background ingestion pipeline for links received over WhatsApp."""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from database import SessionLocal
+from app.models.database import SavedContent
+from app.services.content_service import ContentService
+from app.services.near_duplicate_index import near_duplicate_index
+from app.services.whatsapp_service import WhatsAppHandler, EnrichResult
+from app.utils.metrics import saves, span, stage_seconds
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestionJob:
+    """Pending ``SavedContent`` rows from one message, as ``(content_id, url)``."""
+    user_id: str
+    items: List[Tuple[int, str]]
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class IngestionQueue:
+    """Bounded queue drained by a fixed pool of worker tasks.
+
+    The webhook only stores a pending row and enqueues it; the workers run
+    extraction, classification and the DB update off the request path and
+    send the rich reply through the Twilio REST client.
+    """
+
+    def __init__(
+        self,
+        handler: WhatsAppHandler,
+        workers: Optional[int] = None,
+        maxsize: Optional[int] = None
+    ):
+        self.handler = handler
+        self.workers = workers or int(os.getenv("INGESTION_WORKERS", 4))
+        self.maxsize = maxsize or int(os.getenv("INGESTION_QUEUE_SIZE", 100))
+        self.links_concurrency = int(os.getenv("INGESTION_LINKS_CONCURRENCY", 4))
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the worker pool and requeue rows left pending by a restart."""
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._requeue_pending()))
+        logger.info(f"Ingestion queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Cancel the workers; unfinished rows stay pending for the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def drain(self) -> None:
+        """Wait until every submitted job has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def submit(self, job: IngestionJob) -> bool:
+        """Enqueue a job without blocking. Returns False if the queue is full."""
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _requeue_pending(self) -> None:
+        """Feed rows left pending by a restart to the workers as the queue frees up.
+
+        Only rows pending at startup are read; links saved since were
+        submitted (or marked failed) by the webhook itself.
+        """
+        try:
+            ceiling = await asyncio.to_thread(self._last_pending_id)
+            last_id = 0
+            total = 0
+            while ceiling:
+                rows = await asyncio.to_thread(self._pending_batch, last_id, ceiling)
+                if not rows:
+                    break
+                for content_id, user_id, url in rows:
+                    await self._queue.put(IngestionJob(user_id, [(content_id, url)]))
+                last_id = rows[-1][0]
+                total += len(rows)
+            if total:
+                logger.info(f"Requeued {total} pending saves")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error recovering pending saves: {e}")
+
+    @staticmethod
+    def _last_pending_id() -> Optional[int]:
+        db = SessionLocal()
+        try:
+            return db.query(func.max(SavedContent.id)).filter(
+                SavedContent.status == "pending"
+            ).scalar()
+        finally:
+            db.close()
+
+    def _pending_batch(self, after_id: int, ceiling: int) -> List[Tuple[int, str, str]]:
+        """The next ``maxsize`` pending rows with ids in ``(after_id, ceiling]``."""
+        db = SessionLocal()
+        try:
+            return [tuple(row) for row in db.query(
+                SavedContent.id, SavedContent.user_id, SavedContent.original_url
+            ).filter(
+                SavedContent.status == "pending",
+                SavedContent.id > after_id,
+                SavedContent.id <= ceiling
+            ).order_by(SavedContent.id).limit(self.maxsize).all()]
+        finally:
+            db.close()
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception:
+                logger.exception(f"Ingestion worker {worker_id} failed on job {job}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: IngestionJob) -> None:
+        stage_seconds.observe(time.perf_counter() - job.enqueued_at, stage="queue_wait")
+        urls = [url for _, url in job.items]
+
+        async def screen(url: str, extracted_data: Dict) -> Optional[EnrichResult]:
+            if extracted_data.get("platform") not in near_duplicate_index.PLATFORMS:
+                return None
+            match = await asyncio.to_thread(self._find_near_duplicate, job.user_id, extracted_data)
+            if match is None:
+                return None
+            duplicate_id, title, original_url = match
+            response = self.handler.whatsapp_service.format_already_saved_message(title, original_url)
+            return False, response, {"duplicate_of": duplicate_id}
+
+        with span("enrich"):
+            results = await self.handler.enrich_urls(urls, self.links_concurrency, screen)
+
+        updates_by_id = {}
+        for (content_id, _), (success, _, extracted_data) in zip(job.items, results):
+            if success and extracted_data:
+                updates_by_id[content_id] = {**extracted_data, "status": "ready"}
+            elif extracted_data and "duplicate_of" in extracted_data:
+                # Keep the row so its canonical URL short-circuits a resend.
+                updates_by_id[content_id] = {
+                    "status": "duplicate",
+                    "is_archived": True,
+                    "duplicate_of": extracted_data["duplicate_of"]
+                }
+            else:
+                # Failed saves are hidden from the dashboard, as they were never
+                # stored before ingestion became asynchronous.
+                updates_by_id[content_id] = {"status": "failed", "is_archived": True}
+        for update in updates_by_id.values():
+            saves.inc(status=update["status"])
+
+        reply = self.handler.whatsapp_service.format_batch_response_message(urls, results)
+
+        # The DB session and the Twilio client are blocking; keep them off the loop.
+        with span("db_update"):
+            await asyncio.to_thread(self._save, job.user_id, updates_by_id)
+        with span("reply_send"):
+            await asyncio.to_thread(
+                self.handler.whatsapp_service.send_message, job.user_id, reply
+            )
+
+    @staticmethod
+    def _find_near_duplicate(user_id: str, extracted_data: Dict) -> Optional[Tuple[int, str, str]]:
+        """Return ``(id, title, url)`` of a saved post whose text nearly matches."""
+        db = SessionLocal()
+        try:
+            match = near_duplicate_index.find(
+                db, user_id, extracted_data.get("title"), extracted_data.get("caption")
+            )
+            if match is None:
+                return None
+            original = db.get(SavedContent, match[0])
+            logger.info(f"Near-duplicate of {original.id} for {user_id} (similarity {match[1]:.2f})")
+            return original.id, original.title, original.original_url
+        finally:
+            db.close()
+
+    @staticmethod
+    def _save(user_id: str, updates_by_id: dict) -> None:
+        db = SessionLocal()
+        try:
+            ContentService.update_contents(db, user_id, updates_by_id)
+        finally:
+            db.close()
@@ -0,0 +1,237 @@
+"""In-process registry and runners for long-running content jobs."""
+import asyncio
+import logging
+import threading
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+from database import SessionLocal
+from app.models.database import SavedContent
+from app.services.content_service import ContentService
+from app.services.facet_service import FacetService
+from app.utils.ai_processor import AIProcessor
+from app.utils.facet_cache import facet_cache
+from app.utils.url_extractor import URLExtractor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """Progress of a background job."""
+    id: str
+    kind: str
+    user_id: str
+    status: str = "queued"  # queued, running, completed, failed
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat()
+        data["finished_at"] = self.finished_at.isoformat() if self.finished_at else None
+        return data
+
+
+class JobRegistry:
+    """Keeps the most recent jobs in memory so clients can poll progress."""
+
+    def __init__(self, max_jobs: int = 500):
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def create(self, kind: str, user_id: str) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind, user_id=user_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.pop(next(iter(self._jobs)))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+
+job_registry = JobRegistry()
+ai_processor = AIProcessor()
+
+
+def _load_chunk(db, filters, last_id: int, chunk_size: int):
+    return db.query(SavedContent).filter(
+        *filters, SavedContent.id > last_id
+    ).order_by(SavedContent.id).limit(chunk_size).all()
+
+
+async def run_reclassify_job(job: Job, category: Optional[str] = None, chunk_size: int = 100) -> None:
+    """Re-run AI classification over a user's saved content.
+
+    Rows are read in id-ordered chunks, classified with
+    ``AIProcessor.classify_batch`` and written back one transaction per chunk.
+    """
+    job.status = "running"
+    db = SessionLocal()
+    try:
+        filters = [
+            SavedContent.user_id == job.user_id,
+            SavedContent.is_archived == False,
+            SavedContent.status == "ready"
+        ]
+        if category:
+            filters.append(SavedContent.category == category)
+        job.total = await asyncio.to_thread(
+            lambda: db.query(SavedContent).filter(*filters).count()
+        )
+
+        last_id = 0
+        while True:
+            rows = await asyncio.to_thread(_load_chunk, db, filters, last_id, chunk_size)
+            if not rows:
+                break
+
+            results = await ai_processor.classify_batch(
+                [(row.caption, row.title) for row in rows]
+            )
+            updates_by_id = {}
+            for row, (new_category, summary, source) in zip(rows, results):
+                if summary in AIProcessor.FALLBACK_SUMMARIES:
+                    job.failed += 1
+                    continue
+                updates_by_id[row.id] = {
+                    "category": new_category,
+                    "summary": summary,
+                    "classified_by": source
+                }
+            await asyncio.to_thread(
+                ContentService.update_contents, db, job.user_id, updates_by_id
+            )
+
+            job.processed += len(rows)
+            last_id = rows[-1].id
+
+        job.status = "completed"
+    except Exception as e:
+        logger.error(f"Reclassify job {job.id} failed: {e}")
+        db.rollback()
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.utcnow()
+        db.close()
+
+
+async def run_facet_rebuild_job(job: Job) -> None:
+    """Recompute a user's facet counts from their saved content."""
+    job.status = "running"
+    db = SessionLocal()
+    try:
+        def rebuild() -> int:
+            written = FacetService.rebuild(db, job.user_id)
+            db.commit()
+            return written
+
+        job.total = job.processed = await asyncio.to_thread(rebuild)
+        facet_cache.invalidate(job.user_id)
+        job.status = "completed"
+    except Exception as e:
+        logger.error(f"Facet rebuild job {job.id} failed: {e}")
+        db.rollback()
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.utcnow()
+        db.close()
+
+
+async def _extract_all(urls: List[str], concurrency: int) -> List[Optional[Dict]]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def extract(url: str) -> Optional[Dict]:
+        async with semaphore:
+            try:
+                data = await URLExtractor.extract(url)
+            except Exception as e:
+                logger.error(f"Error extracting {url}: {e}")
+                return None
+            if not data or data.get("platform") == "other":
+                return None
+            return data
+
+    return list(await asyncio.gather(*(extract(url) for url in urls)))
+
+
+async def run_import_job(
+    job: Job,
+    content_ids: List[int],
+    chunk_size: int = 50,
+    concurrency: int = 8
+) -> None:
+    """Scrape and classify imported links in the background.
+
+    Each chunk is extracted concurrently, classified with one
+    ``AIProcessor.classify_batch`` call and written back in one transaction.
+    Links that cannot be extracted are marked failed and archived, like
+    failed WhatsApp saves.
+    """
+    job.status = "running"
+    job.total = len(content_ids)
+    db = SessionLocal()
+    try:
+        for start in range(0, len(content_ids), chunk_size):
+            ids = content_ids[start:start + chunk_size]
+            rows = await asyncio.to_thread(
+                lambda: db.query(SavedContent).filter(
+                    SavedContent.id.in_(ids), SavedContent.status == "importing"
+                ).order_by(SavedContent.id).all()
+            )
+            extracted = await _extract_all([row.original_url for row in rows], concurrency)
+
+            items = []
+            for row, data in zip(rows, extracted):
+                if data:
+                    # Same fallback as WhatsAppHandler.enrich_url for captionless posts.
+                    data["caption"] = data.get("caption") or f"Analyze this Instagram content: {row.original_url}"
+                    items.append((row, data))
+            results = await ai_processor.classify_batch(
+                [(data["caption"], data.get("title")) for _, data in items]
+            ) if items else []
+
+            updates_by_id = {
+                row.id: {"status": "failed", "is_archived": True} for row in rows
+            }
+            for (row, data), (category, summary, source) in zip(items, results):
+                updates_by_id[row.id] = {
+                    "platform": data.get("platform") or row.platform,
+                    "caption": data["caption"],
+                    "title": data.get("title"),
+                    "category": category,
+                    "summary": summary,
+                    "hashtags": ",".join(data.get("hashtags", [])),
+                    "thumbnail_url": data.get("thumbnail_url"),
+                    "needs_classification": ai_processor.needs_retry(summary),
+                    "classified_by": source,
+                    "status": "ready",
+                    "is_archived": False
+                }
+            await asyncio.to_thread(
+                ContentService.update_contents, db, job.user_id, updates_by_id
+            )
+
+            job.processed += len(ids)
+            job.failed += len(rows) - len(items)
+
+        job.status = "completed"
+    except Exception as e:
+        logger.error(f"Import job {job.id} failed: {e}")
+        db.rollback()
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.utcnow()
+        db.close()
@@ -0,0 +1,105 @@
+"""Background re-classification of items saved while inference was down."""
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional
+from database import SessionLocal
+from app.models.database import SavedContent
+from app.services.content_service import ContentService
+from app.utils.ai_processor import AIProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class Reclassifier:
+    """Periodically retries classification for rows flagged ``needs_classification``.
+
+    Saves made while every model failed or had an open circuit keep the
+    fallback category and summary and are flagged. Each round runs only if
+    some model is available, and stops at the first batch that still comes
+    back unclassified.
+    """
+
+    def __init__(
+        self,
+        ai_processor: AIProcessor,
+        interval: Optional[float] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.ai_processor = ai_processor
+        self.interval = interval or float(os.getenv("RECLASSIFY_INTERVAL", 60))
+        self.batch_size = batch_size or int(os.getenv("RECLASSIFY_BATCH_SIZE", 50))
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Re-classification round failed")
+
+    async def run_once(self) -> int:
+        """Re-classify flagged rows until none are left or inference fails again."""
+        if not self.ai_processor.api_token:
+            return 0
+        done = 0
+        last_id = 0
+        while self.ai_processor.available():
+            rows = await asyncio.to_thread(self._pending, last_id)
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            results = await self.ai_processor.classify_batch(
+                [(row["caption"], row["title"]) for row in rows]
+            )
+
+            updates: Dict[str, Dict[int, dict]] = defaultdict(dict)
+            for row, (category, summary, source) in zip(rows, results):
+                if self.ai_processor.needs_retry(summary):
+                    continue
+                updates[row["user_id"]][row["id"]] = {
+                    "category": category,
+                    "summary": summary,
+                    "classified_by": source,
+                    "needs_classification": False
+                }
+            if not updates:
+                break
+            for user_id, updates_by_id in updates.items():
+                done += await asyncio.to_thread(self._save, user_id, updates_by_id)
+
+        if done:
+            logger.info(f"Re-classified {done} saved items")
+        return done
+
+    def _pending(self, after_id: int) -> List[Dict]:
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                SavedContent.id, SavedContent.user_id, SavedContent.caption, SavedContent.title
+            ).filter(
+                SavedContent.needs_classification == True,
+                SavedContent.id > after_id
+            ).order_by(SavedContent.id).limit(self.batch_size).all()
+            return [row._asdict() for row in rows]
+        finally:
+            db.close()
+
+    @staticmethod
+    def _save(user_id: str, updates_by_id: Dict[int, dict]) -> int:
+        db = SessionLocal()
+        try:
+            return ContentService.update_contents(db, user_id, updates_by_id)
+        finally:
+            db.close()
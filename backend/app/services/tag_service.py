@@ -0,0 +1,72 @@
+"""Normalised hashtag index in ``content_tags``."""
+import logging
+from typing import Dict, List, Set
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+from app.models.database import SavedContent, ContentTag
+from app.utils.tags import normalize_tag, parse_hashtags, prefix_upper_bound
+
+logger = logging.getLogger(__name__)
+
+
+class TagService:
+    """Keeps ``content_tags`` in step with ``SavedContent.hashtags``."""
+
+    @staticmethod
+    def sync(db: Session, rows: List[SavedContent]) -> None:
+        """Rewrite the tag rows of ``rows`` that changed; the caller commits."""
+        if not rows:
+            return
+        existing: Dict[int, Set[str]] = {row.id: set() for row in rows}
+        for content_id, tag in db.query(ContentTag.content_id, ContentTag.tag).filter(
+            ContentTag.content_id.in_(list(existing))
+        ):
+            existing[content_id].add(tag)
+
+        for row in rows:
+            wanted = set(parse_hashtags(row.hashtags))
+            stale = existing[row.id] - wanted
+            if stale:
+                db.query(ContentTag).filter(
+                    and_(ContentTag.content_id == row.id, ContentTag.tag.in_(stale))
+                ).delete(synchronize_session=False)
+            db.add_all([
+                ContentTag(content_id=row.id, tag=tag, user_id=row.user_id)
+                for tag in wanted - existing[row.id]
+            ])
+
+    @staticmethod
+    def tag_filter(user_id: str, tag: str):
+        """Filter on ``SavedContent`` for items carrying ``tag``.
+
+        ``tag`` matches exactly; a trailing ``*`` (``fit*``) matches by prefix.
+        Either way it is a seek on ``ix_content_tags_user_tag``.
+        """
+        prefix = tag.endswith("*")
+        value = normalize_tag(tag.rstrip("*"))
+        if not value:
+            # "*" alone: anything tagged.
+            condition = ContentTag.user_id == user_id
+        elif prefix:
+            condition = and_(
+                ContentTag.user_id == user_id,
+                ContentTag.tag >= value,
+                ContentTag.tag < prefix_upper_bound(value)
+            )
+        else:
+            condition = and_(ContentTag.user_id == user_id, ContentTag.tag == value)
+        return SavedContent.id.in_(select(ContentTag.content_id).where(condition))
+
+    @staticmethod
+    def top_tags(db: Session, user_id: str, limit: int = 20) -> List[Dict]:
+        """A user's most used tags on live items, most used first."""
+        count = func.count().label("count")
+        rows = db.query(ContentTag.tag, count).join(
+            SavedContent, SavedContent.id == ContentTag.content_id
+        ).filter(
+            and_(
+                ContentTag.user_id == user_id,
+                SavedContent.is_archived == False
+            )
+        ).group_by(ContentTag.tag).order_by(count.desc(), ContentTag.tag).limit(limit).all()
+        return [{"tag": tag, "count": n} for tag, n in rows]
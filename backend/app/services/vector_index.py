@@ -0,0 +1,242 @@
+"""Per-user in-memory vector index over saved content embeddings."""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import and_, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.database import SavedContent, ContentEmbedding
+from app.utils.embeddings import Embedder, get_embedder
+
+logger = logging.getLogger(__name__)
+
+
+class UserVectors:
+    """Contiguous float32 matrix of one user's embeddings with id lookup.
+
+    Rows live in a buffer that doubles when full, so incremental adds are
+    amortised O(dim); removals swap the last row into the hole.
+    """
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.matrix = np.zeros((max(capacity, 1), dim), dtype=np.float32)
+        self.ids = np.zeros(max(capacity, 1), dtype=np.int64)
+        self.size = 0
+        self._position: Dict[int, int] = {}
+
+    def upsert(self, content_id: int, vector: np.ndarray) -> None:
+        position = self._position.get(content_id)
+        if position is None:
+            if self.size == len(self.ids):
+                self.matrix = np.concatenate([self.matrix, np.zeros_like(self.matrix)])
+                self.ids = np.concatenate([self.ids, np.zeros_like(self.ids)])
+            position = self.size
+            self.size += 1
+            self._position[content_id] = position
+            self.ids[position] = content_id
+        self.matrix[position] = vector
+
+    def remove(self, content_id: int) -> None:
+        position = self._position.pop(content_id, None)
+        if position is None:
+            return
+        last = self.size - 1
+        if position != last:
+            moved = int(self.ids[last])
+            self.matrix[position] = self.matrix[last]
+            self.ids[position] = moved
+            self._position[moved] = position
+        self.size = last
+
+    def top_k(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Cosine top-k; vectors are normalised so this is one matrix-vector product."""
+        if self.size == 0 or k <= 0:
+            return []
+        scores = self.matrix[:self.size] @ query
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.ids[i]), float(scores[i])) for i in top]
+
+
+# Session.info key for index changes waiting on the session's commit.
+_PENDING = "vector_index_pending"
+
+# (user_id, content_id, vector); a None vector removes the item.
+Change = Tuple[str, int, Optional[np.ndarray]]
+
+
+class VectorIndex:
+    """Embeds content on write and answers per-user nearest-neighbour queries.
+
+    Embeddings are persisted as float32 BLOBs in ``content_embeddings`` in the
+    caller's transaction, and reach the in-memory index only once that
+    transaction commits. A user's vectors are loaded into a ``UserVectors``
+    matrix on their first semantic query (embedding any rows still missing,
+    e.g. saved before the index existed) and then kept current in place as
+    items are created, edited or archived. The least recently queried users
+    are evicted beyond ``max_users``.
+    """
+
+    def __init__(self, embedder: Optional[Embedder] = None, max_users: int = 256):
+        self._embedder = embedder
+        self.max_users = max_users
+        self._users: "OrderedDict[str, UserVectors]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Per-user locks so only one thread loads a user at a time.
+        self._load_locks: Dict[str, threading.Lock] = {}
+        # Changes committed while a user is being loaded, re-applied on top of it.
+        self._loading: Dict[str, List[Change]] = {}
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    @staticmethod
+    def content_text(content: SavedContent) -> str:
+        return "\n".join(filter(None, (content.title, content.caption, content.summary)))
+
+    def index_contents(self, db: Session, contents: List[SavedContent]) -> None:
+        """Embed and store vectors for ``contents``; the caller commits."""
+        if not contents:
+            return
+        vectors = self.embedder.embed([self.content_text(c) for c in contents])
+        for content, vector in zip(contents, vectors):
+            db.merge(ContentEmbedding(
+                content_id=content.id,
+                user_id=content.user_id,
+                model=self.embedder.name,
+                vector=vector.tobytes()
+            ))
+            db.info.setdefault(_PENDING, []).append((content.user_id, content.id, vector))
+
+    def remove(self, db: Session, user_id: str, content_ids: Iterable[int]) -> None:
+        """Drop archived items from the in-memory index once ``db`` commits."""
+        db.info.setdefault(_PENDING, []).extend(
+            (user_id, content_id, None) for content_id in content_ids
+        )
+
+    def apply(self, changes: List[Change]) -> None:
+        """Apply committed changes to the loaded users, and to users being loaded."""
+        with self._lock:
+            for user_id, content_id, vector in changes:
+                if user_id in self._loading:
+                    self._loading[user_id].append((user_id, content_id, vector))
+                loaded = self._users.get(user_id)
+                if loaded is None:
+                    continue
+                if vector is None:
+                    loaded.remove(content_id)
+                else:
+                    loaded.upsert(content_id, vector)
+
+    def search(self, db: Session, user_id: str, query: str, k: int) -> List[Tuple[int, float]]:
+        """Return up to ``k`` ``(content_id, cosine)`` pairs, best first."""
+        vectors = self._user_vectors(db, user_id)
+        query_vector = self.embedder.embed([query])[0]
+        with self._lock:
+            return vectors.top_k(query_vector, k)
+
+    def _loaded(self, user_id: str) -> Optional[UserVectors]:
+        with self._lock:
+            if user_id in self._users:
+                self._users.move_to_end(user_id)
+                return self._users[user_id]
+            return None
+
+    def _user_vectors(self, db: Session, user_id: str) -> UserVectors:
+        vectors = self._loaded(user_id)
+        if vectors is not None:
+            return vectors
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(user_id, threading.Lock())
+        with load_lock:
+            vectors = self._loaded(user_id)
+            if vectors is not None:
+                return vectors
+            with self._lock:
+                self._loading[user_id] = []
+            try:
+                vectors = self._load(db, user_id)
+            finally:
+                with self._lock:
+                    changes = self._loading.pop(user_id)
+                    self._load_locks.pop(user_id, None)
+            with self._lock:
+                # Changes committed during the load may be missing from what it read.
+                for _, content_id, vector in changes:
+                    if vector is None:
+                        vectors.remove(content_id)
+                    else:
+                        vectors.upsert(content_id, vector)
+                self._users[user_id] = vectors
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            return vectors
+
+    def _load(self, db: Session, user_id: str) -> UserVectors:
+        rows = db.query(SavedContent.id, ContentEmbedding.model, ContentEmbedding.vector).outerjoin(
+            ContentEmbedding, ContentEmbedding.content_id == SavedContent.id
+        ).filter(
+            and_(
+                SavedContent.user_id == user_id,
+                SavedContent.is_archived == False,
+                SavedContent.status == "ready"
+            )
+        ).all()
+
+        name = self.embedder.name
+        vectors = UserVectors(self.embedder.dim, capacity=len(rows))
+        missing = []
+        for content_id, model, blob in rows:
+            if blob is None or model != name:
+                missing.append(content_id)
+            else:
+                vectors.upsert(content_id, np.frombuffer(blob, dtype=np.float32))
+
+        if missing:
+            contents = db.query(SavedContent).filter(SavedContent.id.in_(missing)).all()
+            fresh = self.embedder.embed([self.content_text(c) for c in contents])
+            for content, vector in zip(contents, fresh):
+                vectors.upsert(content.id, vector)
+            self._store_missing(db, user_id, contents, fresh)
+        return vectors
+
+    def _store_missing(self, db: Session, user_id: str, contents: List[SavedContent], vectors) -> None:
+        """Persist embeddings computed on load, in a session of their own."""
+        writer = Session(bind=db.get_bind())
+        try:
+            for content, vector in zip(contents, vectors):
+                writer.merge(ContentEmbedding(
+                    content_id=content.id,
+                    user_id=user_id,
+                    model=self.embedder.name,
+                    vector=vector.tobytes()
+                ))
+            writer.commit()
+            logger.info(f"Embedded {len(contents)} items for {user_id}")
+        except IntegrityError:
+            # A concurrent save stored some of them first; they are embedded next load.
+            writer.rollback()
+        finally:
+            writer.close()
+
+
+vector_index = VectorIndex()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    changes = session.info.pop(_PENDING, None)
+    if changes:
+        vector_index.apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING, None)
@@ -1,14 +1,21 @@
 """WhatsApp/Twilio integration service."""
+import asyncio
 import os
 import re
 import logging
-from typing import Tuple, Optional, Dict
+from typing import Awaitable, Callable, Tuple, Optional, Dict, List
 from twilio.rest import Client
 from app.utils.url_extractor import URLExtractor
 from app.utils.ai_processor import AIProcessor
+from app.utils.metrics import span
 
 logger = logging.getLogger(__name__)
 
+EnrichResult = Tuple[bool, str, Optional[Dict]]
+# Called with (url, extracted_data) after scraping and before classification;
+# a non-None result is returned in place of classifying the link.
+Screen = Callable[[str, Dict], Awaitable[Optional[EnrichResult]]]
+
 
 class WhatsAppService:
     def __init__(self):
@@ -22,10 +29,23 @@ class WhatsAppService:
             self.client = None
             logger.warning("Twilio credentials not configured")
 
-    def extract_url_from_message(self, message: str) -> Optional[str]:
+    def extract_urls_from_message(self, message: str) -> List[str]:
+        """Every distinct link in the message, in the order they appear."""
         url_pattern = r'https?://[^\s]+'
-        urls = re.findall(url_pattern, message)
-        return urls[0] if urls else None
+        return list(dict.fromkeys(re.findall(url_pattern, message)))
+
+    def send_message(self, to_number: str, body: str) -> bool:
+        """Send an outbound WhatsApp message through the Twilio REST API."""
+        if not self.client:
+            logger.warning("Cannot send WhatsApp reply: Twilio client not configured")
+            return False
+
+        self.client.messages.create(
+            from_=self.bot_number,
+            to=f"whatsapp:{to_number}",
+            body=body
+        )
+        return True
 
     def format_response_message(
         self,
@@ -47,6 +67,44 @@ class WhatsAppService:
 
         return message
 
+    def format_already_saved_message(
+        self,
+        title: Optional[str],
+        url: str,
+        restored: bool = False
+    ) -> str:
+        if restored:
+            message = "♻️ *Restored from your archive!*\n\n"
+        else:
+            message = "✅ *Already in your knowledge base!*\n\n"
+
+        if title:
+            message += f"*{title}*\n"
+        message += f"🔗 {url}"
+        return message
+
+    def format_batch_response_message(
+        self,
+        urls: List[str],
+        results: List[Tuple[bool, str, Optional[Dict]]]
+    ) -> str:
+        """Combine the outcome of several links into one reply."""
+        if len(results) == 1:
+            return results[0][1]
+
+        saved = [data for success, _, data in results if success and data]
+        message = f"✨ *Saved {len(saved)} of {len(results)} links to your knowledge base!*\n\n"
+
+        for url, (success, response, data) in zip(urls, results):
+            if success and data:
+                label = data.get("title") or data.get("summary") or url
+                message += f"📁 {data['category']}: {label}\n🔗 {url}\n\n"
+            else:
+                message += f"{response.splitlines()[0]}\n🔗 {url}\n\n"
+
+        message += "Go to your dashboard to organize and search your saved content! 🚀"
+        return message
+
 
 class WhatsAppHandler:
 
@@ -55,26 +113,43 @@ class WhatsAppHandler:
         self.url_extractor = URLExtractor()
         self.ai_processor = AIProcessor()
 
-    def process_message(
-        self,
-        from_number: str,
-        message_body: str
-    ) -> Tuple[bool, str, Optional[Dict]]:
+    # Links beyond this many in one message are ignored.
+    MAX_LINKS_PER_MESSAGE = 10
 
-        try:
-            url = self.whatsapp_service.extract_url_from_message(message_body)
+    UNSUPPORTED_REPLY = "⚠️ I support Instagram, X/Twitter, YouTube, Reddit, TikTok and blogs only."
+
+    def validate_message(self, message_body: str) -> Tuple[List[str], Optional[str]]:
+        """Find supported links in the message without any network I/O.
+
+        Returns ``(urls, None)`` on success or ``([], error_response)``.
+        """
+        urls = self.whatsapp_service.extract_urls_from_message(message_body)
+
+        if not urls:
+            response = (
+                "❌ I didn't find a link in your message.\n\n"
+                "Please send me a link from Instagram, X/Twitter, YouTube, Reddit, TikTok or a blog."
+            )
+            return [], response
+
+        supported = [
+            url for url in urls
+            if self.url_extractor.identify_platform(url) != "other"
+        ]
+        if not supported:
+            return [], self.UNSUPPORTED_REPLY
+
+        return supported[:self.MAX_LINKS_PER_MESSAGE], None
 
-            if not url:
-                response = (
-                    "❌ I didn't find a link in your message.\n\n"
-                    "Please send me a link from Instagram, Twitter, or any blog."
-                )
-                return False, response, None
+    async def enrich_url(self, url: str, screen: Optional[Screen] = None) -> EnrichResult:
+        """Scrape and classify a validated link.
 
-            # Remove tracking params
-            url = url.split("?")[0]
+        ``screen`` can short-circuit a link after extraction, before the AI call.
+        """
 
-            extracted_data = self.url_extractor.extract(url)
+        try:
+            with span("extract", platform=self.url_extractor.identify_platform(url)):
+                extracted_data = await self.url_extractor.extract(url)
 
             if not extracted_data:
                 return False, "⚠️ Could not extract content from this link.", None
@@ -82,9 +157,12 @@ class WhatsAppHandler:
             platform = extracted_data.get("platform")
 
             if platform == "other":
-                return False, (
-                    "⚠️ I support Instagram, Twitter, and blogs only."
-                ), None
+                return False, self.UNSUPPORTED_REPLY, None
+
+            if screen:
+                screened = await screen(url, extracted_data)
+                if screened:
+                    return screened
 
             caption = extracted_data.get("caption")
             title = extracted_data.get("title")
@@ -94,7 +172,8 @@ class WhatsAppHandler:
                 caption = f"Analyze this Instagram content: {url}"
 
             # Process with AI
-            category, summary = self.ai_processor.process(caption, title)
+            with span("classify"):
+                category, summary, source = await self.ai_processor.classify(caption, title)
 
             response = self.whatsapp_service.format_response_message(
                 title=title,
@@ -111,9 +190,33 @@ class WhatsAppHandler:
                 "category": category,
                 "summary": summary,
                 "hashtags": ",".join(extracted_data.get("hashtags", [])),
-                "thumbnail_url": extracted_data.get("thumbnail_url")
+                "thumbnail_url": extracted_data.get("thumbnail_url"),
+                "needs_classification": self.ai_processor.needs_retry(summary),
+                "classified_by": source
             }
 
         except Exception as e:
             logger.error(f"Error processing message: {e}")
-            return False, "😅 Something went wrong. Please try again!", None
\ No newline at end of file
+            return False, "😅 Something went wrong. Please try again!", None
+
+    async def enrich_urls(
+        self,
+        urls: List[str],
+        concurrency: int = 4,
+        screen: Optional[Screen] = None
+    ) -> List[EnrichResult]:
+        """Scrape and classify several links concurrently, in input order.
+
+        At most ``concurrency`` links are in flight at once, so one long
+        message cannot monopolise the HTTP pool.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def enrich(url: str) -> EnrichResult:
+            async with semaphore:
+                return await self.enrich_url(url, screen)
+
+        return list(await asyncio.gather(*(enrich(url) for url in urls)))
+
+
+whatsapp_handler = WhatsAppHandler()
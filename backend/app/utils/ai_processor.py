@@ -1,14 +1,29 @@
 """AI processing using Hugging Face Inference API (Stable Version)."""
 
+import asyncio
 import os
-import requests
+import hashlib
+import random
 import re
-from typing import Tuple, Optional
+import time
+from typing import Dict, List, NamedTuple, Tuple, Optional
 import logging
+from app.utils.circuit_breaker import ModelCircuit, circuit_for
+from app.utils.classification_cache import classification_cache
+from app.utils.http_client import http_client
+from app.utils.local_classifier import Prediction, classifier_text, local_classifier, local_summary
+from app.utils.metrics import classifications, hf_errors, llm_tokens, local_agreement, span
+from app.utils.prompt_builder import content_for_prompt, estimate_tokens
 
 logger = logging.getLogger(__name__)
 
 
+class Classification(NamedTuple):
+    category: str
+    summary: str
+    source: Optional[str]  # "local", "llm", or None for a fallback result
+
+
 class AIProcessor:
 
     CATEGORIES = [
@@ -25,83 +40,309 @@ class AIProcessor:
         "Other"
     ]
 
+    # Summaries returned in place of a model answer when inference fails.
+    FALLBACK_SUMMARIES = frozenset({
+        "HF API not configured",
+        "AI service unavailable",
+        "AI response invalid",
+        "Unable to generate summary",
+    })
+
+    # Bump whenever the prompt wording changes so cached results are not reused.
+    PROMPT_VERSION = "2"
+
+    # Completion budgets for a single classification and per item of a batch.
+    MAX_TOKENS = 120
+    BATCH_ITEM_TOKENS = 60
+
     def __init__(self):
         self.api_token = os.getenv("HF_API_TOKEN")
 
         # Router endpoint compatible with OpenAI-style chat completions.
         self.api_url = "https://router.huggingface.co/v1/chat/completions"
         self.model = os.getenv("HF_MODEL", "Qwen/Qwen2.5-7B-Instruct")
+        self.batch_size = int(os.getenv("HF_BATCH_SIZE", 8))
+        self.batch_concurrency = int(os.getenv("HF_BATCH_CONCURRENCY", 4))
+        self.read_timeout = float(os.getenv("HF_READ_TIMEOUT", 60))
+        # Approximate tokens of cleaned content sent per item.
+        self.input_token_budget = int(os.getenv("HF_INPUT_TOKEN_BUDGET", 256))
+        # Share of items the local model is confident about that the LLM checks anyway.
+        self.local_audit_rate = float(os.getenv("LOCAL_CLASSIFIER_AUDIT_RATE", 0.05))
+        # Tried in order when the primary model fails: "model" uses the router,
+        # "model@https://host/v1/chat/completions" another compatible endpoint.
+        self.fallback_models = [
+            entry.strip() for entry in os.getenv("HF_FALLBACK_MODELS", "").split(",") if entry.strip()
+        ]
+
+    @classmethod
+    def prompt_version(cls) -> str:
+        """Prompt template version combined with a fingerprint of the categories."""
+        categories = hashlib.sha1(",".join(cls.CATEGORIES).encode()).hexdigest()[:8]
+        return f"{cls.PROMPT_VERSION}:{categories}"
+
+    def _targets(self) -> List[Tuple[str, str]]:
+        """``(model, endpoint)`` pairs, primary first."""
+        targets = [(self.model, self.api_url)]
+        for entry in self.fallback_models:
+            model, _, url = entry.partition("@")
+            targets.append((model, url or self.api_url))
+        return targets
+
+    def circuit(self, model: str) -> ModelCircuit:
+        return circuit_for(model, max_timeout=self.read_timeout)
+
+    def available(self) -> bool:
+        """False while every model's circuit is open."""
+        return any(self.circuit(model).available() for model, _ in self._targets())
+
+    def circuit_stats(self) -> Dict[str, Dict]:
+        """Per-model health, with latencies for a single-item classification."""
+        return {
+            model: self.circuit(model).stats(self.MAX_TOKENS) for model, _ in self._targets()
+        }
+
+    @classmethod
+    def needs_retry(cls, summary: Optional[str]) -> bool:
+        """Whether a result is a fallback worth classifying again later."""
+        return summary in cls.FALLBACK_SUMMARIES and summary != "HF API not configured"
 
-    def process(self, caption: Optional[str], title: Optional[str]) -> Tuple[str, str]:
+    def prune_classification_cache(self) -> int:
+        """Drop cached results for unconfigured models/old prompts and evict old entries."""
+        return classification_cache.maintain(
+            [model for model, _ in self._targets()], self.prompt_version()
+        )
+
+    async def classify(self, caption: Optional[str], title: Optional[str]) -> Classification:
+        return (await self.classify_batch([(caption, title)]))[0]
+
+    async def classify_batch(
+        self,
+        items: List[Tuple[Optional[str], Optional[str]]],
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> List[Classification]:
+        """Classify many ``(caption, title)`` items with few round-trips.
+
+        Items the local model is confident about are answered in-process.
+        The others are reduced to their token-budgeted prompt content, which
+        keys the classification cache together with the model that answered;
+        lookups try the primary model's entries first, then the fallbacks'. Uncached items are packed
+        ``batch_size`` to a prompt and the prompts are sent concurrently, at
+        most ``concurrency`` at a time. Items whose line is missing or
+        unparseable in a batch response fall back to a single-item call.
+        Results are returned in input order.
+        """
+        batch_size = batch_size or self.batch_size
+        concurrency = concurrency or self.batch_concurrency
+        version = self.prompt_version()
+        texts = [classifier_text(caption, title) for caption, title in items]
+
+        results: Dict[int, Classification] = {}
+        await local_classifier.refresh()
+        predictions = [local_classifier.predict(text) for text in texts]
+        remote = []
+        for index, prediction in enumerate(predictions):
+            if local_classifier.is_confident(prediction) and not self._audit():
+                caption, title = items[index]
+                results[index] = Classification(
+                    prediction.category, local_summary(caption, title), "local"
+                )
+                classifications.inc(tier="local")
+            else:
+                remote.append(index)
 
         if not self.api_token:
-            return "Other", "HF API not configured"
+            for index in remote:
+                results[index] = Classification("Other", "HF API not configured", None)
+            return [results[i] for i in range(len(items))]
 
-        text = f"{title or ''}\n{caption or ''}".strip()
+        prompts = {
+            index: content_for_prompt(*items[index], self.input_token_budget) for index in remote
+        }
+        models = [model for model, _ in self._targets()]
 
-        if not text:
-            text = "Social media content."
+        def lookup(prompt: str) -> Optional[Tuple[str, str]]:
+            for model in models:
+                cached = classification_cache.get(model, version, prompt)
+                if cached:
+                    return cached
+            return None
 
-        prompt = (
-            "Classify the following content into ONE category from this list:\n"
-            f"{', '.join(self.CATEGORIES)}\n\n"
-            "Then write a short one sentence summary.\n\n"
-            f"Content:\n{text}\n\n"
-            "Respond exactly like this:\n"
-            "Category: <category>\n"
-            "Summary: <summary>"
+        cached_results = await asyncio.to_thread(lambda: [lookup(prompts[i]) for i in remote])
+        pending = []
+        for index, cached in zip(remote, cached_results):
+            if cached:
+                results[index] = Classification(*cached, "llm")
+                classifications.inc(tier="cache")
+                self._record_agreement(predictions[index], cached[0])
+            else:
+                pending.append(index)
+
+        chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def classify_chunk(chunk: List[int]) -> None:
+            parsed, batch_model = {}, None
+            if len(chunk) > 1:
+                async with semaphore:
+                    parsed, batch_model = await self._classify_many([prompts[i] for i in chunk])
+            for position, index in enumerate(chunk):
+                if position in parsed:
+                    category, summary = parsed[position]
+                    model = batch_model
+                else:
+                    async with semaphore:
+                        category, summary, model = await self._classify(prompts[index])
+                if model:
+                    # Keyed by the model that answered, which may be a fallback.
+                    await asyncio.to_thread(
+                        classification_cache.set, model, version, prompts[index], category, summary
+                    )
+                    classifications.inc(tier="llm")
+                    self._record_agreement(predictions[index], category)
+                results[index] = Classification(category, summary, "llm" if model else None)
+
+        await asyncio.gather(*(classify_chunk(chunk) for chunk in chunks))
+
+        return [results[i] for i in range(len(items))]
+
+    def _audit(self) -> bool:
+        """Send a sample of confident items to the LLM anyway, to measure agreement."""
+        return bool(self.api_token) and random.random() < self.local_audit_rate
+
+    def _record_agreement(self, prediction: Optional[Prediction], category: str) -> None:
+        if prediction is None:
+            return
+        local_agreement.inc(
+            confident=str(local_classifier.is_confident(prediction)).lower(),
+            result="agree" if prediction.category == category else "disagree"
         )
 
+    async def _chat(
+        self, system: str, prompt: str, max_tokens: int
+    ) -> Tuple[Optional[str], str, Optional[str]]:
+        """Send one chat completion, failing over between models.
+
+        Models are tried in order, skipping those whose circuit is open.
+        Returns ``(output, error_summary, model)``, with the model that
+        produced the output, or None when there is none.
+        """
+        error = "AI service unavailable"
+        attempted = False
+        for model, url in self._targets():
+            circuit = self.circuit(model)
+            if not circuit.allow():
+                continue
+            attempted = True
+            start = time.perf_counter()
+            healthy = False
+            try:
+                output, error, healthy = await self._chat_model(
+                    model, url, system, prompt, max_tokens, circuit.timeout(max_tokens)
+                )
+            finally:
+                # Always release a half-open probe, even on cancellation.
+                circuit.record(time.perf_counter() - start, healthy, max_tokens)
+            if healthy:
+                return output, error, model if output is not None else None
+            logger.warning(f"Model {model} failed ({error}); trying the next one")
+
+        if not attempted:
+            hf_errors.inc(status="circuit_open")
+        return None, error, None
+
+    async def _chat_model(
+        self,
+        model: str,
+        url: str,
+        system: str,
+        prompt: str,
+        max_tokens: int,
+        timeout: float
+    ) -> Tuple[Optional[str], str, bool]:
+        """One request to one model. The flag is False if the model is unhealthy."""
+
         headers = {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
 
         payload = {
-            "model": self.model,
+            "model": model,
             "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a strict formatter. Output only two lines: "
-                        "'Category: ...' and 'Summary: ...'."
-                    ),
-                },
+                {"role": "system", "content": system},
                 {"role": "user", "content": prompt},
             ],
-            "max_tokens": 120,
+            "max_tokens": max_tokens,
             "temperature": 0.3,
             "stream": False,
         }
 
         try:
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
-
-            logger.debug("HF status: %s", response.status_code)
-
-            if response.status_code != 200:
-                logger.warning(
-                    "HF returned non-200 status=%s body=%s",
-                    response.status_code,
-                    response.text[:300],
-                )
-                return "Other", "AI service unavailable"
+            with span("llm_request", model=model):
+                async with http_client.session.post(
+                    url,
+                    headers=headers,
+                    json=payload,
+                    timeout=http_client.timeout(read=timeout, total=timeout)
+                ) as response:
+
+                    logger.debug("HF status: %s", response.status)
 
-            result = response.json()
+                    if response.status != 200:
+                        hf_errors.inc(status=response.status)
+                        logger.warning(
+                            "HF returned non-200 status=%s body=%s",
+                            response.status,
+                            (await response.text())[:300],
+                        )
+                        return None, "AI service unavailable", False
+
+                    result = await response.json(content_type=None)
 
             choices = result.get("choices") if isinstance(result, dict) else None
             if not choices:
-                return "Other", "AI response invalid"
+                hf_errors.inc(status="invalid")
+                return None, "AI response invalid", True
             message = choices[0].get("message", {})
             output = (message.get("content") or "").strip()
             if not output:
-                return "Other", "AI response invalid"
+                hf_errors.inc(status="invalid")
+                return None, "AI response invalid", True
+            self._record_tokens(model, result.get("usage"), system, prompt, output)
+            return output, "", True
+
+        except Exception as e:
+            hf_errors.inc(status=type(e).__name__)
+            logger.error(f"HuggingFace AI error ({model}): {e!r}")
+            return None, "Unable to generate summary", False
 
+    @staticmethod
+    def _record_tokens(model: str, usage: Optional[Dict], system: str, prompt: str, output: str) -> None:
+        """Token counts reported by the endpoint, or estimated when it reports none."""
+        usage = usage if isinstance(usage, dict) else {}
+        input_tokens = usage.get("prompt_tokens") or estimate_tokens(system) + estimate_tokens(prompt)
+        output_tokens = usage.get("completion_tokens") or estimate_tokens(output)
+        llm_tokens.observe(input_tokens, model=model, kind="input")
+        llm_tokens.observe(output_tokens, model=model, kind="output")
+        logger.debug(f"HF tokens ({model}): input={input_tokens} output={output_tokens}")
+
+    async def _classify(self, text: str) -> Tuple[str, str, Optional[str]]:
+        """Call the model. Returns the category, summary and the model that
+        answered, which is None for fallback results that must not be cached."""
+
+        output, error, model = await self._chat(
+            f"Classify the content into one of: {', '.join(self.CATEGORIES)}.\n"
+            "Reply with exactly two lines:\n"
+            "Category: <category>\n"
+            "Summary: <one short sentence>",
+            text,
+            self.MAX_TOKENS
+        )
+        if output is None:
+            return "Other", error, None
+
+        with span("llm_parse"):
             category = "Other"
             summary = "Unable to generate summary"
 
@@ -117,24 +358,61 @@ class AIProcessor:
                 if line_candidates:
                     summary = line_candidates[-1]
 
-            # Normalize category spelling/casing and map unknowns to Other.
-            normalized = None
-            for c in self.CATEGORIES:
-                if category.lower() == c.lower():
-                    normalized = c
-                    break
-            if not normalized:
-                match = re.search(r"(fitness|coding|food|travel|design|business|education|entertainment|health|productivity|other)", category.lower())
-                if match:
-                    token = match.group(1)
-                    normalized = next((c for c in self.CATEGORIES if c.lower() == token), "Other")
-            category = normalized or "Other"
+            category = self._normalize_category(category)
+        return category, summary, model
 
-            if category not in self.CATEGORIES:
-                category = "Other"
+    _BATCH_LINE = re.compile(
+        r"^\W*(\d+)\W+category\s*:\s*(.+?)\s*\|\s*summary\s*:\s*(.+?)\s*$",
+        re.IGNORECASE
+    )
 
-            return category, summary
+    async def _classify_many(
+        self, texts: List[str]
+    ) -> Tuple[Dict[int, Tuple[str, str]], Optional[str]]:
+        """Classify several texts in one prompt.
 
-        except Exception as e:
-            logger.error(f"HuggingFace AI error: {e}")
-            return "Other", "Unable to generate summary"
+        Returns results keyed by position, where items missing from the
+        response are simply absent, and the model that answered.
+        """
+        output, _, model = await self._chat(
+            f"Classify each item into one of: {', '.join(self.CATEGORIES)}.\n"
+            "Reply with exactly one line per item:\n"
+            "<n>. Category: <category> | Summary: <one short sentence>",
+            "\n\n".join(f"Item {n}:\n{text}" for n, text in enumerate(texts, start=1)),
+            self.BATCH_ITEM_TOKENS * len(texts)
+        )
+        if output is None:
+            return {}, None
+
+        parsed = {}
+        with span("llm_parse"):
+            for line in output.splitlines():
+                match = self._BATCH_LINE.match(line.strip())
+                if not match:
+                    continue
+                position = int(match.group(1)) - 1
+                if 0 <= position < len(texts) and position not in parsed:
+                    parsed[position] = (
+                        self._normalize_category(match.group(2)),
+                        match.group(3)
+                    )
+        return parsed, model
+
+    def _normalize_category(self, category: str) -> str:
+        """Normalize category spelling/casing and map unknowns to Other."""
+        normalized = None
+        for c in self.CATEGORIES:
+            if category.lower() == c.lower():
+                normalized = c
+                break
+        if not normalized:
+            match = re.search(r"(fitness|coding|food|travel|design|business|education|entertainment|health|productivity|other)", category.lower())
+            if match:
+                token = match.group(1)
+                normalized = next((c for c in self.CATEGORIES if c.lower() == token), "Other")
+        category = normalized or "Other"
+
+        if category not in self.CATEGORIES:
+            category = "Other"
+
+        return category
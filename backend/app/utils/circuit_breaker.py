@@ -0,0 +1,139 @@
+"""Per-model circuit breaker with latency-derived timeouts."""
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ModelCircuit:
+    """Rolling health of one inference model.
+
+    ``failure_threshold`` consecutive failures open the circuit, and calls
+    are refused without any I/O for ``cooldown`` seconds. After that a single
+    probe is let through: success closes the circuit, failure reopens it.
+
+    Latencies are kept per unit of ``cost`` (a request's token budget), so
+    one window covers single and batched prompts. ``timeout(cost)`` is the
+    p99 of recent successful calls scaled to ``cost``, times
+    ``timeout_multiplier``, clamped to ``[min_timeout, max_timeout]``; until
+    ``min_samples`` successes have been seen it is ``max_timeout``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        window: int = 200,
+        min_samples: int = 20,
+        min_timeout: float = 5.0,
+        max_timeout: float = 60.0,
+        timeout_multiplier: float = 2.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._outcomes: deque = deque(maxlen=window)  # True/False per call
+        self._latencies: deque = deque(maxlen=window)  # per unit cost, successful calls only
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str, max_timeout: float) -> "ModelCircuit":
+        return cls(
+            name,
+            failure_threshold=int(os.getenv("HF_CIRCUIT_FAILURES", 5)),
+            cooldown=float(os.getenv("HF_CIRCUIT_COOLDOWN", 30)),
+            window=int(os.getenv("HF_LATENCY_WINDOW", 200)),
+            min_timeout=float(os.getenv("HF_MIN_TIMEOUT", 5)),
+            max_timeout=max_timeout,
+            timeout_multiplier=float(os.getenv("HF_TIMEOUT_P99_MULTIPLIER", 2)),
+        )
+
+    def available(self) -> bool:
+        """Whether ``allow`` would let a call through, without claiming a probe."""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self._opened_at >= self.cooldown
+            return self.state == CLOSED or not self._probing
+
+    def allow(self) -> bool:
+        """Whether a call may be made now; claims the probe when half-open."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, latency: float, ok: bool, cost: float = 1.0) -> None:
+        with self._lock:
+            self._outcomes.append(ok)
+            if ok:
+                self._latencies.append(latency / cost)
+                self.consecutive_failures = 0
+                self.state = CLOSED
+            else:
+                self.consecutive_failures += 1
+                if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                    self.state = OPEN
+                    self._opened_at = time.monotonic()
+            self._probing = False
+
+    def p99(self) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+
+    def timeout(self, cost: float = 1.0) -> float:
+        p99 = self.p99()
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * cost * self.timeout_multiplier))
+
+    def error_rate(self) -> float:
+        with self._lock:
+            outcomes = list(self._outcomes)
+        return round(outcomes.count(False) / len(outcomes), 4) if outcomes else 0.0
+
+    def stats(self, cost: float = 1.0) -> Dict:
+        """Current health; latency figures are for a call of ``cost``."""
+        p99 = self.p99()
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "error_rate": self.error_rate(),
+            "calls": len(self._outcomes),
+            "p99_seconds": round(p99 * cost, 3) if p99 is not None else None,
+            "timeout_seconds": round(self.timeout(cost), 3),
+        }
+
+
+_circuits: Dict[str, ModelCircuit] = {}
+_circuits_lock = threading.Lock()
+
+
+def circuit_for(model: str, max_timeout: float) -> ModelCircuit:
+    """The process-wide circuit of ``model``, shared by every ``AIProcessor``."""
+    with _circuits_lock:
+        if model not in _circuits:
+            _circuits[model] = ModelCircuit.from_env(model, max_timeout=max_timeout)
+        return _circuits[model]
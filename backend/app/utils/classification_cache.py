@@ -0,0 +1,174 @@
+"""Persistent memo of AI classification results."""
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from database import SessionLocal
+from app.models.database import ClassificationCache as CacheRow
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case so trivially different inputs share a key."""
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def cache_key(model: str, prompt_version: str, text: str) -> str:
+    raw = "\x1f".join((model, prompt_version, normalize_text(text)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """Database-backed classification cache with an in-process LRU front.
+
+    Entries are keyed by the answering model, prompt version and normalised
+    input text, so changing ``HF_MODEL``, the prompt or the category list
+    simply stops matching old rows; ``maintain`` then deletes them along
+    with rows past the TTL or beyond the row cap (least recently used first).
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = 2048,
+        max_rows: int = 50000,
+        ttl_days: int = 30
+    ):
+        self.memory_entries = memory_entries
+        self.max_rows = max_rows
+        self.ttl_days = ttl_days
+        self._memory: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ClassificationCache":
+        return cls(
+            memory_entries=int(os.getenv("CLASSIFICATION_CACHE_MEMORY_SIZE", 2048)),
+            max_rows=int(os.getenv("CLASSIFICATION_CACHE_MAX_ROWS", 50000)),
+            ttl_days=int(os.getenv("CLASSIFICATION_CACHE_TTL_DAYS", 30)),
+        )
+
+    def get(self, model: str, prompt_version: str, text: str) -> Optional[Tuple[str, str]]:
+        """Return a cached ``(category, summary)`` or None."""
+        key = cache_key(model, prompt_version, text)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        db = SessionLocal()
+        try:
+            row = db.get(CacheRow, key)
+            if row is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            row.last_used_at = datetime.utcnow()
+            db.commit()
+            result = (row.category, row.summary)
+        except Exception as e:
+            logger.warning(f"Classification cache read failed: {e}")
+            return None
+        finally:
+            db.close()
+
+        with self._lock:
+            self.hits += 1
+            self._remember(key, result)
+        return result
+
+    def set(self, model: str, prompt_version: str, text: str, category: str, summary: str) -> None:
+        key = cache_key(model, prompt_version, text)
+        with self._lock:
+            self._remember(key, (category, summary))
+
+        db = SessionLocal()
+        try:
+            db.add(CacheRow(
+                key=key,
+                model=model,
+                prompt_version=prompt_version,
+                category=category,
+                summary=summary
+            ))
+            db.commit()
+        except IntegrityError:
+            # Another worker classified the same text first.
+            db.rollback()
+        except Exception as e:
+            logger.warning(f"Classification cache write failed: {e}")
+        finally:
+            db.close()
+
+    def invalidate(self, model: Optional[str] = None) -> int:
+        """Delete every entry, or only those for ``model``. Returns rows deleted."""
+        with self._lock:
+            self._memory.clear()
+
+        db = SessionLocal()
+        try:
+            query = db.query(CacheRow)
+            if model:
+                query = query.filter(CacheRow.model == model)
+            deleted = query.delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def maintain(self, models: Iterable[str], prompt_version: str) -> int:
+        """Evict rows of other models or prompts, expired and least recently
+        used rows. Returns rows deleted."""
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=self.ttl_days)
+            deleted = db.query(CacheRow).filter(or_(
+                CacheRow.model.notin_(list(models)),
+                CacheRow.prompt_version != prompt_version,
+                CacheRow.last_used_at < cutoff
+            )).delete(synchronize_session=False)
+
+            overflow = db.query(CacheRow).count() - self.max_rows
+            if overflow > 0:
+                oldest = db.query(CacheRow.key).order_by(
+                    CacheRow.last_used_at
+                ).limit(overflow).subquery()
+                deleted += db.query(CacheRow).filter(
+                    CacheRow.key.in_(oldest.select())
+                ).delete(synchronize_session=False)
+
+            db.commit()
+            if deleted:
+                logger.info(f"Evicted {deleted} classification cache entries")
+            return deleted
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self._memory),
+            "max_rows": self.max_rows,
+        }
+
+    def _remember(self, key: str, result: Tuple[str, str]) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+classification_cache = ClassificationCache.from_env()
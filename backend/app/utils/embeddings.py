@@ -0,0 +1,125 @@
+"""Text embedders for semantic search."""
+import logging
+import os
+import re
+import zlib
+from abc import ABC, abstractmethod
+from typing import List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Small topic lexicon so related vocabulary ("squats", "leg day") shares a
+# dimension even without a neural model. Keys match AIProcessor.CATEGORIES.
+CONCEPTS = {
+    "fitness": "gym workout exercise squat squats lunge lunges leg legs deadlift cardio "
+               "training muscle strength fitness fit hiit abs run running yoga pushup pullup",
+    "coding": "code coding programming python javascript developer software api bug "
+              "github frontend backend react sql algorithm devops debugging",
+    "food": "food recipe recipes cooking cook baking bake dinner lunch breakfast meal "
+            "pasta pizza dessert vegan restaurant kitchen snack",
+    "travel": "travel trip vacation holiday flight hotel beach itinerary destination "
+              "backpacking tourism passport hiking road city",
+    "design": "design ui ux typography figma layout color palette logo branding "
+              "illustration interface font sketch",
+    "business": "business startup marketing sales revenue founder entrepreneur finance "
+                "investing money strategy growth product management",
+    "education": "learn learning education course tutorial study lesson school "
+                 "university teacher student lecture",
+    "entertainment": "movie movies film music song series show netflix game gaming "
+                     "meme funny comedy celebrity concert",
+    "health": "health healthy nutrition diet sleep mental wellness doctor medical "
+              "therapy vitamins meditation stress",
+    "productivity": "productivity habits habit focus time routine planner notion "
+                    "workflow goals schedule morning organize",
+}
+_CONCEPT_OF = {
+    word: concept
+    for concept, words in CONCEPTS.items()
+    for word in words.split()
+}
+
+
+class Embedder(ABC):
+    """Maps texts to L2-normalised float32 vectors of a fixed dimension."""
+
+    name = "base"
+    dim = 0
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """One row per text, shape ``(len(texts), dim)``."""
+
+
+class HashingEmbedder(Embedder):
+    """Offline embedder using signed feature hashing.
+
+    Features are words, character trigrams (so "squat" is close to "squats")
+    and topic concepts from ``CONCEPTS``, weighted by ``1 + log(tf)``. Needs
+    no model download and embeds thousands of texts per second.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        for word in _WORD.findall(text.lower()):
+            features.append(f"w:{word}")
+            padded = f"<{word}>"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+            concept = _CONCEPT_OF.get(word)
+            if concept:
+                features.extend([f"k:{concept}"] * 3)
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for feature in self._features(text or ""):
+                counts[feature] = counts.get(feature, 0) + 1
+            for feature, count in counts.items():
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 1 else -1.0
+                matrix[row, (digest >> 1) % self.dim] += sign * (1.0 + np.log(count))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """Local neural embedder; requires the optional ``sentence-transformers`` package."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name)
+        self.dim = self._model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self._model.encode(texts, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+_embedder: Optional[Embedder] = None
+
+
+def get_embedder() -> Embedder:
+    """The configured embedder (``EMBEDDER=hashing|sentence-transformers``)."""
+    global _embedder
+    if _embedder is None:
+        if os.getenv("EMBEDDER", "hashing") == "sentence-transformers":
+            try:
+                _embedder = SentenceTransformerEmbedder(
+                    os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+                )
+            except Exception as e:
+                logger.warning(f"Falling back to hashing embedder: {e}")
+        if _embedder is None:
+            _embedder = HashingEmbedder(int(os.getenv("EMBEDDING_DIM", 512)))
+    return _embedder
@@ -0,0 +1,186 @@
+"""Shared cache of URL extraction results keyed by canonical URL."""
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.utils.url_canonical import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+class ExtractionCache:
+    """Two-tier TTL + LRU cache for ``URLExtractor.extract`` results.
+
+    The in-process tier is an ``OrderedDict`` in LRU order. The optional
+    persistent tier is a table in a local SQLite file, shared by every worker
+    process on the host and surviving restarts.
+
+    Expired entries stored with HTTP validators (ETag/Last-Modified) are
+    kept for ``stale_seconds`` so the page can be re-fetched conditionally.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 86400,
+        db_path: Optional[str] = None,
+        max_persistent_entries: int = 100000,
+        stale_seconds: int = 7 * 86400
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = max(stale_seconds, ttl_seconds)
+        self.max_persistent_entries = max_persistent_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+
+        if db_path:
+            self._open_persistent(db_path)
+
+    @classmethod
+    def from_env(cls) -> "ExtractionCache":
+        return cls(
+            max_entries=int(os.getenv("EXTRACTION_CACHE_SIZE", 1024)),
+            ttl_seconds=int(os.getenv("EXTRACTION_CACHE_TTL", 86400)),
+            db_path=os.getenv("EXTRACTION_CACHE_DB") or None,
+            stale_seconds=int(os.getenv("EXTRACTION_CACHE_STALE_TTL", 7 * 86400)),
+        )
+
+    def _open_persistent(self, db_path: str) -> None:
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_cache ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL, validators TEXT)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(extraction_cache)")}
+            if "validators" not in columns:
+                self._db.execute("ALTER TABLE extraction_cache ADD COLUMN validators TEXT")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_extraction_cache_accessed_at "
+                "ON extraction_cache (accessed_at)"
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent extraction cache disabled: {e}")
+            self._db = None
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return a copy of the cached extraction for ``url``, if fresh."""
+        key = canonicalize_url(url)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+
+            row = self._get_persistent(key)
+            if row is not None and now - row[0] < self.ttl_seconds:
+                self._remember(key, row[1], row[0], row[2])
+                self.hits += 1
+                self.persistent_hits += 1
+                return copy.deepcopy(row[1])
+
+            self.misses += 1
+            return None
+
+    def get_stale(self, url: str) -> Optional[Tuple[Dict, Dict]]:
+        """An expired extraction and its validators, for a conditional re-fetch."""
+        key = canonicalize_url(url)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key) or self._get_persistent(key)
+            if not entry or not entry[2] or now - entry[0] >= self.stale_seconds:
+                return None
+            return copy.deepcopy(entry[1]), dict(entry[2])
+
+    def set(self, url: str, data: Dict, validators: Optional[Dict] = None) -> None:
+        """Store an extraction result for ``url``, with the response's validators."""
+        key = canonicalize_url(url)
+        now = time.time()
+        validators = {k: v for k, v in (validators or {}).items() if v}
+        with self._lock:
+            self._remember(key, copy.deepcopy(data), now, validators)
+            self._set_persistent(key, data, now, validators)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db:
+                self._db.execute("DELETE FROM extraction_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "persistent_hits": self.persistent_hits,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "persistent": self._db is not None,
+        }
+
+    def _remember(self, key: str, data: Dict, stored_at: float, validators: Dict) -> None:
+        self._entries[key] = (stored_at, data, validators)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_persistent(self, key: str) -> Optional[tuple]:
+        """``(stored_at, data, validators)`` of the stored row, fresh or not."""
+        if not self._db:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT data, stored_at, validators FROM extraction_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            self._db.execute(
+                "UPDATE extraction_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._db.commit()
+            return row[1], json.loads(row[0]), json.loads(row[2] or "{}")
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache read failed: {e}")
+            return None
+
+    def _set_persistent(self, key: str, data: Dict, now: float, validators: Dict) -> None:
+        if not self._db:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO extraction_cache "
+                "(key, data, stored_at, accessed_at, validators) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(data), now, now, json.dumps(validators) if validators else None)
+            )
+            self._writes += 1
+            # Evict in batches rather than counting rows on every write.
+            if self._writes % 100 == 0:
+                self._db.execute(
+                    "DELETE FROM extraction_cache WHERE stored_at < ? OR key IN ("
+                    "SELECT key FROM extraction_cache ORDER BY accessed_at DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (now - self.stale_seconds, self.max_persistent_entries)
+                )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache write failed: {e}")
+
+
+extraction_cache = ExtractionCache.from_env()
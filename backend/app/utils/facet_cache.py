@@ -0,0 +1,106 @@
+"""In-process cache of per-user filter lists with ETags."""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Scope of facets that span every user, e.g. the user list.
+GLOBAL_SCOPE = "*"
+
+
+class FacetCache:
+    """Caches small read-mostly values per user, invalidated on write.
+
+    Each scope (a user id, or ``GLOBAL_SCOPE``) has a version that
+    ``invalidate`` bumps, which makes every entry of the scope stale in O(1).
+    A value computed under an older version is not stored, so a read racing
+    a write cannot cache stale data. ETags are a hash of the value, so they
+    stay valid across restarts and processes.
+
+    Versions are per process: with several workers, a write only invalidates
+    the worker that made it. Entries therefore also expire after ``ttl``
+    seconds, which bounds how long another worker serves a stale list (and
+    keeps answering 304 for its old ETag).
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 10.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # (scope, name) -> (version, value, etag, stored_at)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, Any, str, float]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "FacetCache":
+        return cls(
+            max_entries=int(os.getenv("FACET_CACHE_MAX_ENTRIES", 4096)),
+            ttl=float(os.getenv("FACET_CACHE_TTL", 10)),
+        )
+
+    @staticmethod
+    def make_etag(value: Any) -> str:
+        digest = hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8"))
+        return f'"{digest.hexdigest()}"'
+
+    def version(self, scope: str) -> int:
+        with self._lock:
+            return self._versions.get(scope, 0)
+
+    def get(self, scope: str, name: str) -> Optional[Tuple[Any, str]]:
+        """Return ``(value, etag)`` if cached."""
+        with self._lock:
+            entry = self._entries.get((scope, name))
+            if (
+                entry is None
+                or entry[0] != self._versions.get(scope, 0)
+                or time.monotonic() - entry[3] >= self.ttl
+            ):
+                self.misses += 1
+                return None
+            self._entries.move_to_end((scope, name))
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, scope: str, name: str, value: Any, version: int) -> Tuple[Any, str]:
+        """Store a value read under ``version``; returns ``(value, etag)``."""
+        etag = self.make_etag(value)
+        with self._lock:
+            if self._versions.get(scope, 0) == version:
+                self._entries[(scope, name)] = (version, value, etag, time.monotonic())
+                self._entries.move_to_end((scope, name))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value, etag
+
+    def invalidate(self, user_id: str, new_rows: bool = False) -> None:
+        """Drop a user's cached facets, and the user list if rows were added."""
+        scopes = [user_id, GLOBAL_SCOPE] if new_rows else [user_id]
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for scope in {key[0] for key in self._entries}:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+        }
+
+
+facet_cache = FacetCache.from_env()
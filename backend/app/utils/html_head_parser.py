@@ -0,0 +1,98 @@
+"""Incremental parser for the metadata in an HTML document's head."""
+import json
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+
+class HeadMetadataParser(HTMLParser):
+    """Collect ``<meta>`` tags, ``<title>``, JSON-LD and optionally the first ``<h1>``.
+
+    Feed it chunks as they arrive and stop reading once ``done`` is True:
+    at ``</head>`` (or the first body tag when ``</head>`` is omitted), or,
+    when ``want_h1`` is set, once the first ``<h1>`` has closed. A JSON-LD
+    ``headline`` in the head stands in for the ``<h1>``, so the body is
+    not read at all.
+    """
+
+    # Tags that can only appear once the head is over.
+    BODY_TAGS = {"body", "main", "article", "header", "div", "section", "h1", "p"}
+
+    def __init__(self, want_h1: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.want_h1 = want_h1
+        self.meta: Dict[str, str] = {}
+        self.title: Optional[str] = None
+        self.h1: Optional[str] = None
+        # Objects from <script type="application/ld+json"> blocks in the head.
+        self.json_ld: List[Dict] = []
+        self.done = False
+        # ETag/Last-Modified of the response, filled in by the fetcher.
+        self.validators: Dict[str, str] = {}
+        self._head_closed = False
+        self._capture: Optional[str] = None
+        self._buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "meta":
+            attributes = dict(attrs)
+            key = attributes.get("property") or attributes.get("name")
+            content = attributes.get("content")
+            if key and content is not None:
+                self.meta.setdefault(key.lower(), content)
+        elif tag == "title" and self.title is None and not self._head_closed:
+            self._start_capture("title")
+        elif tag == "script" and not self._head_closed:
+            if (dict(attrs).get("type") or "").lower() == "application/ld+json":
+                self._start_capture("script")
+        elif tag == "h1" and self.want_h1 and self.h1 is None:
+            self._close_head()
+            self._start_capture("h1")
+        elif tag in self.BODY_TAGS:
+            self._close_head()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if tag == "script" and self._capture == "script":
+            self._add_json_ld("".join(self._buffer))
+            self._capture = None
+            self._buffer = []
+        elif tag == self._capture:
+            text = " ".join("".join(self._buffer).split())
+            setattr(self, tag, text)
+            self._capture = None
+            self._buffer = []
+            if tag == "h1":
+                self.done = True
+        elif tag == "head":
+            self._close_head()
+
+    def handle_data(self, data):
+        if self._capture:
+            self._buffer.append(data)
+
+    def _start_capture(self, tag: str) -> None:
+        self._capture = tag
+        self._buffer = []
+
+    def _add_json_ld(self, text: str) -> None:
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return
+        items = data if isinstance(data, list) else [data]
+        for item in items:
+            if isinstance(item, dict):
+                self.json_ld.extend(
+                    node for node in item.get("@graph", [item]) if isinstance(node, dict)
+                )
+
+    def _close_head(self) -> None:
+        self._head_closed = True
+        if not self.want_h1 or any(item.get("headline") for item in self.json_ld):
+            self.done = True
@@ -0,0 +1,65 @@
+"""Shared, pooled async HTTP client for scraping and inference."""
+import logging
+import os
+from typing import Optional
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClient:
+    """One ``aiohttp.ClientSession`` shared by every outbound caller.
+
+    The connector keeps idle connections alive for reuse and caps open
+    connections both overall and per host, so repeated saves from the same
+    platform and every Hugging Face call skip the TCP and TLS handshake.
+    The session is opened and closed with the application.
+    """
+
+    def __init__(self):
+        self.pool_size = int(os.getenv("HTTP_POOL_SIZE", 100))
+        self.pool_size_per_host = int(os.getenv("HTTP_POOL_SIZE_PER_HOST", 10))
+        self.keepalive_timeout = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", 30))
+        self.connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+        self.read_timeout = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _open(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=self.timeout())
+
+    async def start(self) -> None:
+        if self._session is None or self._session.closed:
+            self._session = self._open()
+            logger.info("HTTP client started")
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session; opened on first use outside the app lifespan."""
+        if self._session is None or self._session.closed:
+            self._session = self._open()
+        return self._session
+
+    def timeout(self, read: Optional[float] = None, total: Optional[float] = None) -> aiohttp.ClientTimeout:
+        """Separate connect and read timeouts; ``read`` overrides the default.
+
+        ``total`` additionally bounds the whole request.
+        """
+        return aiohttp.ClientTimeout(
+            total=total,
+            sock_connect=self.connect_timeout,
+            sock_read=read or self.read_timeout,
+        )
+
+
+http_client = HTTPClient()
@@ -0,0 +1,100 @@
+"""Read links out of exported saves (CSV, JSON or JSON Lines files)."""
+import codecs
+import csv
+import itertools
+import json
+from typing import IO, Any, Iterator, Optional
+
+# Columns/keys that hold the link, in order of preference.
+URL_FIELDS = ("url", "original_url", "link", "href", "uri")
+
+
+def _is_url(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(("http://", "https://"))
+
+
+def _urls_in_json(value: Any) -> Iterator[str]:
+    """Depth-first walk yielding every link-valued field.
+
+    Handles a plain list of URLs, a list of ``{"url": ...}`` objects, and
+    nested exports such as Instagram's ``saved_saved_media`` entries, whose
+    links sit in ``string_map_data["Saved on"]["href"]``.
+    """
+    if _is_url(value):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from _urls_in_json(item)
+    elif isinstance(value, dict):
+        for key in URL_FIELDS:
+            if _is_url(value.get(key)):
+                yield value[key]
+                return
+        for item in value.values():
+            if isinstance(item, (list, dict)):
+                yield from _urls_in_json(item)
+
+
+def _urls_in_csv(lines: Iterator[str]) -> Iterator[str]:
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    names = [name.strip().lower() for name in header]
+    column: Optional[int] = next(
+        (names.index(key) for key in URL_FIELDS if key in names), None
+    )
+    if column is None:
+        # No recognised header: the first line may already be data.
+        reader = itertools.chain([header], reader)
+    for row in reader:
+        if column is not None:
+            if column < len(row) and _is_url(row[column].strip()):
+                yield row[column].strip()
+        else:
+            link = next((cell.strip() for cell in row if _is_url(cell.strip())), None)
+            if link:
+                yield link
+
+
+def iter_import_urls(file: IO[bytes], filename: str = "") -> Iterator[str]:
+    """Yield links from an uploaded export file, in file order.
+
+    CSV and JSON Lines files are decoded and parsed incrementally, a line at
+    a time. A JSON document has to be parsed whole. Raises ValueError if the
+    file cannot be parsed, including malformed CSV and text that is not UTF-8.
+    """
+    lines = codecs.iterdecode(file, "utf-8-sig")
+    name = filename.lower()
+
+    if name.endswith(".csv"):
+        try:
+            yield from _urls_in_csv(lines)
+        except csv.Error as e:
+            raise ValueError(f"Invalid CSV: {e}")
+        except UnicodeDecodeError:
+            raise ValueError("The file is not UTF-8 text")
+        return
+
+    if name.endswith((".jsonl", ".ndjson")):
+        try:
+            for number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield from _urls_in_json(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {number}: {e}")
+        except UnicodeDecodeError:
+            raise ValueError("The file is not UTF-8 text")
+        return
+
+    if name.endswith(".json"):
+        try:
+            document = json.loads(file.read().decode("utf-8-sig"))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        yield from _urls_in_json(document)
+        return
+
+    raise ValueError("Unsupported file type; upload a .csv, .json or .jsonl export")
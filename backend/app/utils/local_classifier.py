@@ -0,0 +1,225 @@
+"""In-process naive Bayes classifier answering easy saves before the LLM."""
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_URL = re.compile(r"https?://\S+")
+_TOKEN = re.compile(r"#?[^\W_]{2,}")
+_HASHTAG = re.compile(r"#\w+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+SUMMARY_CHARS = 200
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words plus ``#tag`` tokens, so a hashtag counts twice."""
+    tokens = []
+    for token in _TOKEN.findall(_URL.sub(" ", text.lower())):
+        tokens.append(token)
+        if token.startswith("#"):
+            tokens.append(token[1:])
+    return tokens
+
+
+def classifier_text(caption: Optional[str], title: Optional[str]) -> str:
+    """The text a save is classified on, in training and at prediction time."""
+    text = f"{title or ''}\n{caption or ''}".strip()
+    return text or "Social media content."
+
+
+def local_summary(caption: Optional[str], title: Optional[str]) -> str:
+    """A short extractive summary: the title, or the caption's first sentence."""
+    text = title or _HASHTAG.sub("", _URL.sub("", caption or ""))
+    text = " ".join(text.split())
+    text = _SENTENCE_END.split(text, maxsplit=1)[0] if text else ""
+    if len(text) > SUMMARY_CHARS:
+        text = text[:SUMMARY_CHARS - 1].rsplit(" ", 1)[0] + "…"
+    return text or "Saved post."
+
+
+@dataclass
+class Prediction:
+    category: str
+    confidence: float
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over word and hashtag counts.
+
+    Scoring gathers each document's token columns from the
+    ``(categories, vocabulary)`` log-likelihood matrix, so it costs a few
+    vector adds per document.
+    """
+
+    def __init__(
+        self,
+        categories: Sequence[str],
+        vocabulary: Sequence[str],
+        log_prior: np.ndarray,
+        log_likelihood: np.ndarray,
+        info: Optional[Dict] = None
+    ):
+        self.categories = list(categories)
+        self.index = {token: i for i, token in enumerate(vocabulary)}
+        self.vocabulary = list(vocabulary)
+        self.log_prior = log_prior
+        self.log_likelihood = log_likelihood
+        self.info = info or {}
+
+    @classmethod
+    def train(
+        cls,
+        documents: Iterable[Tuple[str, str]],
+        categories: Sequence[str],
+        alpha: float = 1.0,
+        min_count: int = 2,
+        max_features: int = 50000
+    ) -> "NaiveBayesModel":
+        """Fit on ``(text, category)`` pairs; unknown categories are skipped."""
+        category_index = {c: i for i, c in enumerate(categories)}
+        doc_counts = np.zeros(len(categories))
+        token_counts: List[Counter] = [Counter() for _ in categories]
+        totals: Counter = Counter()
+        for text, category in documents:
+            c = category_index.get(category)
+            if c is None:
+                continue
+            tokens = tokenize(text)
+            doc_counts[c] += 1
+            token_counts[c].update(tokens)
+            totals.update(tokens)
+
+        vocabulary = [t for t, n in totals.most_common(max_features) if n >= min_count]
+        index = {t: i for i, t in enumerate(vocabulary)}
+        counts = np.zeros((len(categories), len(vocabulary)))
+        for c, counter in enumerate(token_counts):
+            for token, n in counter.items():
+                i = index.get(token)
+                if i is not None:
+                    counts[c, i] = n
+
+        smoothed = counts + alpha
+        log_likelihood = np.log(smoothed / smoothed.sum(axis=1, keepdims=True))
+        # Categories never seen get no prior mass.
+        with np.errstate(divide="ignore"):
+            log_prior = np.log(doc_counts / max(doc_counts.sum(), 1))
+        return cls(categories, vocabulary, log_prior, log_likelihood, {
+            "samples": int(doc_counts.sum()),
+            "samples_per_category": {c: int(n) for c, n in zip(categories, doc_counts)},
+            "vocabulary": len(vocabulary),
+        })
+
+    def predict(self, text: str, min_tokens: int = 2) -> Optional[Prediction]:
+        """Best category with its posterior, or None if too few known tokens."""
+        columns = [self.index[t] for t in tokenize(text) if t in self.index]
+        if len(columns) < min_tokens:
+            return None
+        scores = self.log_prior + self.log_likelihood[:, columns].sum(axis=1)
+        best = int(np.argmax(scores))
+        posterior = np.exp(scores - scores[best])
+        return Prediction(self.categories[best], float(1.0 / posterior.sum()))
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp,
+            categories=np.array(self.categories),
+            vocabulary=np.array(self.vocabulary),
+            log_prior=self.log_prior,
+            log_likelihood=self.log_likelihood.astype(np.float32),
+            info=np.array(json.dumps(self.info)),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NaiveBayesModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["categories"].tolist(),
+                data["vocabulary"].tolist(),
+                data["log_prior"],
+                data["log_likelihood"],
+                json.loads(str(data["info"])),
+            )
+
+
+class LocalClassifier:
+    """First classification tier in front of the LLM.
+
+    Predictions at or above ``threshold`` posterior are used as is; anything
+    else goes to the LLM. A model retrained on disk is picked up within
+    ``reload_interval`` seconds of ``refresh``, which reads the file on a
+    worker thread. Without a model file every item goes to the LLM.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.9, reload_interval: float = 60.0):
+        self.path = path
+        self.threshold = threshold
+        self.reload_interval = reload_interval
+        self.model: Optional[NaiveBayesModel] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LocalClassifier":
+        return cls(
+            path=os.getenv("LOCAL_CLASSIFIER_PATH", "./local_classifier.npz"),
+            threshold=float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", 0.9)),
+        )
+
+    def _due(self) -> bool:
+        return not self._checked_at or time.monotonic() - self._checked_at >= self.reload_interval
+
+    async def refresh(self) -> None:
+        """Pick up a new or retrained model file once a check is due."""
+        if self._due():
+            await asyncio.to_thread(self._refresh)
+
+    def _refresh(self) -> None:
+        with self._lock:
+            if not self._due():
+                return  # another thread just checked
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                self.model, self._mtime = None, None
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                self.model = NaiveBayesModel.load(self.path)
+                self._mtime = mtime
+                logger.info(f"Loaded local classifier from {self.path} ({self.model.info})")
+            except Exception as e:
+                logger.warning(f"Could not load local classifier {self.path}: {e}")
+
+    def predict(self, text: str) -> Optional[Prediction]:
+        """The model's guess for ``text``, confident or not; None without a model."""
+        model = self.model
+        return model.predict(text) if model is not None else None
+
+    def is_confident(self, prediction: Optional[Prediction]) -> bool:
+        return prediction is not None and prediction.confidence >= self.threshold
+
+    def stats(self) -> Dict:
+        return {
+            "loaded": self.model is not None,
+            "path": self.path,
+            "threshold": self.threshold,
+            **({"model": self.model.info} if self.model is not None else {}),
+        }
+
+
+local_classifier = LocalClassifier.from_env()
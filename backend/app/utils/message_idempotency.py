@@ -0,0 +1,248 @@
+"""Replay of webhook replies for messages Twilio delivers more than once."""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from database import SessionLocal
+from app.models.database import ProcessedMessage
+from app.utils.metrics import webhook_replays
+
+logger = logging.getLogger(__name__)
+
+# Produces ``(twiml, remember)``; replies that ask the user to retry are not
+# remembered, so a retry of them does the work again.
+Handler = Callable[[], Awaitable[Tuple[str, bool]]]
+
+
+class MessageInProgress(Exception):
+    """Another worker holds the claim on a message and has not replied yet."""
+
+
+class MessageIdempotency:
+    """Answers each ``MessageSid`` once, whatever Twilio retries.
+
+    Before any work, a delivery claims the message by inserting its
+    ``processed_messages`` row; the primary key decides which worker or
+    process owns it. The owner runs the handler and stores the TwiML on the
+    row. A retry that loses the insert polls the row and replays the stored
+    reply, or raises ``MessageInProgress`` after ``wait_seconds``. Claims
+    older than ``claim_timeout`` (a crashed owner) and replies older than
+    ``ttl_seconds`` are taken over. Retries within this process are also
+    answered from an in-process LRU, or by awaiting the running attempt.
+    """
+
+    PRUNE_EVERY = 500
+
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        memory_entries: int = 4096,
+        claim_timeout: float = 60.0,
+        wait_seconds: float = 10.0,
+        poll_interval: float = 0.25
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.claim_timeout = claim_timeout
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stores = 0
+
+    @classmethod
+    def from_env(cls) -> "MessageIdempotency":
+        return cls(
+            ttl_seconds=int(os.getenv("WEBHOOK_IDEMPOTENCY_TTL", 3600)),
+            memory_entries=int(os.getenv("WEBHOOK_IDEMPOTENCY_MEMORY_SIZE", 4096)),
+            claim_timeout=float(os.getenv("WEBHOOK_CLAIM_TIMEOUT", 60)),
+            wait_seconds=float(os.getenv("WEBHOOK_CLAIM_WAIT", 10)),
+        )
+
+    async def run(self, message_sid: Optional[str], user_id: str, handler: Handler) -> str:
+        """Return the reply for ``message_sid``, calling ``handler`` at most once.
+
+        Raises ``MessageInProgress`` if another process is still handling
+        the message after ``wait_seconds``.
+        """
+        if not message_sid:
+            return (await handler())[0]
+
+        # No awaits between these checks and registering the future, so two
+        # deliveries on the same event loop cannot both start the work.
+        cached = self._recall(message_sid)
+        if cached is not None:
+            webhook_replays.inc(source="memory")
+            return cached
+        pending = self._in_flight.get(message_sid)
+        if pending is not None:
+            webhook_replays.inc(source="in_flight")
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[message_sid] = future
+        try:
+            response = await self._run_claimed(message_sid, user_id, handler)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here so an exception nobody else awaited is not logged.
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(message_sid, None)
+
+    async def _run_claimed(self, message_sid: str, user_id: str, handler: Handler) -> str:
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            claimed, stored = await asyncio.to_thread(self._claim, message_sid, user_id)
+            if stored is not None:
+                webhook_replays.inc(source="database")
+                self._remember(message_sid, stored)
+                return stored
+            if claimed:
+                break
+            if time.monotonic() >= deadline:
+                webhook_replays.inc(source="in_progress")
+                raise MessageInProgress(message_sid)
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            response, remember = await handler()
+        except BaseException:
+            await asyncio.to_thread(self._release, message_sid)
+            raise
+        if remember:
+            self._remember(message_sid, response)
+            await asyncio.to_thread(self._complete, message_sid, response)
+        else:
+            await asyncio.to_thread(self._release, message_sid)
+        return response
+
+    def prune(self) -> int:
+        """Delete rows past the TTL. Returns rows deleted."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        db = SessionLocal()
+        try:
+            deleted = db.query(ProcessedMessage).filter(
+                ProcessedMessage.created_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
+                logger.info(f"Pruned {deleted} processed webhook messages")
+            return deleted
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        return {
+            "memory_size": len(self._memory),
+            "in_flight": len(self._in_flight),
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _recall(self, message_sid: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(message_sid)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl_seconds:
+                del self._memory[message_sid]
+                return None
+            return entry[1]
+
+    def _remember(self, message_sid: str, response: str) -> None:
+        with self._lock:
+            self._memory[message_sid] = (time.time(), response)
+            self._memory.move_to_end(message_sid)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _claim(self, message_sid: str, user_id: str) -> Tuple[bool, Optional[str]]:
+        """Try to own the message. Returns ``(claimed, stored_reply)``."""
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            db.add(ProcessedMessage(
+                message_sid=message_sid,
+                user_id=user_id,
+                status="processing",
+                response="",
+                created_at=now
+            ))
+            try:
+                db.commit()
+                return True, None
+            except IntegrityError:
+                db.rollback()
+
+            row = db.get(ProcessedMessage, message_sid)
+            if row is None:
+                return False, None  # released since; the next poll claims it
+            age = (now - row.created_at).total_seconds()
+            if row.status == "done" and age <= self.ttl_seconds:
+                return False, row.response
+            if row.status == "processing" and age <= self.claim_timeout:
+                return False, None
+
+            # An expired reply, or a claim left by a worker that died: take it
+            # over, unless another delivery got there first.
+            taken = db.query(ProcessedMessage).filter(
+                ProcessedMessage.message_sid == message_sid,
+                ProcessedMessage.created_at == row.created_at
+            ).update({
+                "status": "processing",
+                "response": "",
+                "user_id": user_id,
+                "created_at": now
+            }, synchronize_session=False)
+            db.commit()
+            return taken == 1, None
+        finally:
+            db.close()
+
+    def _release(self, message_sid: str) -> None:
+        """Give up a claim so a retry does the work again."""
+        db = SessionLocal()
+        try:
+            db.query(ProcessedMessage).filter(
+                ProcessedMessage.message_sid == message_sid,
+                ProcessedMessage.status == "processing"
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Releasing processed message claim failed: {e}")
+        finally:
+            db.close()
+
+    def _complete(self, message_sid: str, response: str) -> None:
+        db = SessionLocal()
+        try:
+            db.query(ProcessedMessage).filter(
+                ProcessedMessage.message_sid == message_sid
+            ).update({"status": "done", "response": response}, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Processed message write failed: {e}")
+        finally:
+            db.close()
+
+        self._stores += 1
+        if self._stores % self.PRUNE_EVERY == 0:
+            try:
+                self.prune()
+            except Exception as e:
+                logger.warning(f"Processed message pruning failed: {e}")
+
+
+message_idempotency = MessageIdempotency.from_env()
@@ -0,0 +1,299 @@
+"""In-process metrics with Prometheus text exposition.
+
+Histograms use fixed buckets, so an observation is a bisect and two
+increments under a lock, and p50/p95/p99 are estimated from the bucket
+counts at scrape time.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+LabelValues = Tuple[Tuple[str, str], ...]
+
+# Seconds, from 1 ms to 2 minutes: covers DB calls through slow LLM requests.
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+# Tokens per LLM request, prompt or completion.
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _labels(labels: Dict[str, str]) -> LabelValues:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_labels(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram:
+    """Bucketed distribution per label set, with quantile estimates."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # label set -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def total(self, **labels) -> Tuple[float, int]:
+        """Sum and count of the observations for one label set."""
+        with self._lock:
+            series = self._series.get(_labels(labels))
+            return (series[1], series[2]) if series else (0.0, 0)
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        with self._lock:
+            series = self._series.get(_labels(labels))
+            counts = list(series[0]) if series else None
+        return self._estimate(counts, q) if counts else None
+
+    def _estimate(self, counts: List[int], q: float) -> Optional[float]:
+        """Linear interpolation inside the bucket holding the q-th observation."""
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = ("le", _format_value(bound) if bound == float("inf") else repr(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+    def render_quantiles(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(s[0])) for k, s in self._series.items())
+        lines = []
+        for key, counts in items:
+            for q in QUANTILES:
+                value = self._estimate(counts, q)
+                if value is not None:
+                    lines.append(
+                        f"{self.name}_quantile{_format_labels(key, ('quantile', str(q)))} {value!r}"
+                    )
+        return lines
+
+
+# A collector returns (name, kind, help, [(labels, value)]) for values kept
+# elsewhere, e.g. the caches' own hit counters.
+Collector = Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._register(Counter(name, help))
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+            if isinstance(metric, Histogram):
+                lines.append(f"# HELP {metric.name}_quantile Estimated p50/p95/p99 of {metric.name}")
+                lines.append(f"# TYPE {metric.name}_quantile gauge")
+                lines.extend(metric.render_quantiles())
+        for collector in list(self._collectors):
+            for name, kind, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(
+                    f"{name}{_format_labels(_labels(labels))} {_format_value(value)}"
+                    for labels, value in samples
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_seconds = registry.histogram(
+    "socialsaver_stage_duration_seconds",
+    "Time spent in each stage of the save pipeline"
+)
+http_request_seconds = registry.histogram(
+    "socialsaver_http_request_duration_seconds",
+    "API request latency by route"
+)
+llm_tokens = registry.histogram(
+    "socialsaver_llm_tokens",
+    "Input and output tokens per LLM request, by model",
+    buckets=TOKEN_BUCKETS
+)
+hf_errors = registry.counter(
+    "socialsaver_hf_errors_total",
+    "Failed Hugging Face inference calls by HTTP status or error kind"
+)
+scrape_failures = registry.counter(
+    "socialsaver_scrape_failures_total",
+    "Links whose page could not be scraped, by platform"
+)
+scrape_bytes = registry.counter(
+    "socialsaver_scrape_bytes_total",
+    "Response bytes read by the extractors, by provider and format (html, json)"
+)
+scrape_throttled = registry.counter(
+    "socialsaver_scrape_throttled_total",
+    "Scrapes delayed by a host's rate limit, or refused while it backs off"
+)
+scrape_revalidations = registry.counter(
+    "socialsaver_scrape_revalidations_total",
+    "Conditional re-fetches of expired extractions, by whether the page changed"
+)
+saves = registry.counter(
+    "socialsaver_saves_total",
+    "Processed links by outcome"
+)
+classifications = registry.counter(
+    "socialsaver_classifications_total",
+    "Classified items by tier: local model, cached LLM result or LLM call"
+)
+local_agreement = registry.counter(
+    "socialsaver_local_classifier_agreement_total",
+    "Local model guesses compared with the LLM's category"
+)
+webhook_replays = registry.counter(
+    "socialsaver_webhook_replays_total",
+    "Repeated Twilio deliveries answered without redoing the work, by source"
+)
+
+
+def span(stage: str, **labels):
+    """Time a block as one pipeline stage: ``with span("scrape"): ...``."""
+    return stage_seconds.time(stage=stage, **labels)
+
+
+class RequestTimer:
+    """ASGI middleware recording ``http_request_seconds`` per route template.
+
+    Labels use the matched route's path (``/api/content/{user_id}/all``), not
+    the raw URL, so the series count stays bounded. Streaming responses are
+    timed until their last body chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status
+            )
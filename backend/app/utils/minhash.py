@@ -0,0 +1,56 @@
+"""MinHash signatures and LSH banding for near-duplicate text detection."""
+import re
+import zlib
+from typing import List, Optional, Set
+import numpy as np
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Texts with fewer shingles than this are too short to compare meaningfully.
+MIN_SHINGLES = 5
+
+# Multiply-shift hash family: h(x) = (a * x + b) mod 2**64 >> 32, with a odd.
+# Seeded so signatures stay comparable across processes and restarts.
+_rng = np.random.default_rng(20240229)
+_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Overlapping word n-grams of the lowercased text."""
+    words = _WORD.findall((text or "").lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def signature(text: str) -> Optional[np.ndarray]:
+    """``NUM_PERM`` uint32 minimum hashes of the text's shingles, or None if too short."""
+    grams = shingles(text)
+    if len(grams) < MIN_SHINGLES:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(g.encode("utf-8")) for g in grams),
+        dtype=np.uint64,
+        count=len(grams)
+    )
+    # (perm, shingle) matrix; uint64 arithmetic wraps, which is the mod 2**64.
+    permuted = (np.outer(_A, hashes) + _B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def bands(sig: np.ndarray) -> List[int]:
+    """One bucket id per band; texts sharing any bucket are candidates."""
+    return [
+        zlib.crc32(sig[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND].tobytes())
+        for i in range(BANDS)
+    ]
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity: the fraction of agreeing minimum hashes."""
+    return float(np.mean(a == b))
@@ -0,0 +1,139 @@
+"""Rate-limited, size-bounded page and JSON fetches for the extractors."""
+import codecs
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from app.utils.html_head_parser import HeadMetadataParser
+from app.utils.http_client import http_client
+from app.utils.metrics import scrape_bytes, stage_seconds
+from app.utils.scrape_scheduler import HostThrottled, parse_retry_after, scrape_scheduler
+from app.utils.url_canonical import host_of
+
+T = TypeVar("T")
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0"
+}
+
+CHUNK_SIZE = 16 * 1024
+MAX_HEAD_BYTES = int(os.getenv("SCRAPE_MAX_HEAD_BYTES", 512 * 1024))
+# oEmbed and similar endpoints answer with a few KB; anything bigger is not one.
+MAX_JSON_BYTES = 256 * 1024
+# Retries of a rate-limited fetch, each after the host's backoff.
+MAX_RETRIES = int(os.getenv("SCRAPE_MAX_RETRIES", 2))
+
+
+class NotModified(Exception):
+    """A conditional request found the page unchanged (HTTP 304)."""
+
+
+def _rate_limited(response) -> bool:
+    """429/503, or a redirect to a login wall (Instagram, X) instead of the post."""
+    if response.status in (429, 503):
+        return True
+    return bool(response.history) and "login" in response.url.path.lower()
+
+
+async def _scheduled(url: str, once: Callable[[], Awaitable[Optional[T]]]) -> T:
+    """Run ``once`` in the host's scheduler slot, retrying while it is rate-limited."""
+    for _ in range(MAX_RETRIES + 1):
+        async with scrape_scheduler.slot(url):
+            result = await once()
+        if result is not None:
+            return result
+    raise HostThrottled(host_of(url), scrape_scheduler.remaining(url))
+
+
+def _accepted(url: str, response) -> bool:
+    """False (after backing off the host) for rate-limited responses."""
+    if _rate_limited(response):
+        scrape_scheduler.backoff(url, parse_retry_after(response.headers.get("Retry-After")))
+        return False
+    scrape_scheduler.succeeded(url)
+    if response.status == 304:
+        raise NotModified(url)
+    response.raise_for_status()
+    return True
+
+
+def _record(provider: str, kind: str, received: int, elapsed: float, parse_time: float) -> None:
+    scrape_bytes.inc(received, provider=provider, format=kind)
+    stage_seconds.observe(elapsed - parse_time, stage="scrape_fetch", provider=provider)
+    stage_seconds.observe(parse_time, stage="scrape_parse", provider=provider)
+
+
+async def fetch_head(
+    url: str,
+    want_h1: bool = False,
+    validators: Optional[Dict[str, str]] = None,
+    provider: str = "html"
+) -> HeadMetadataParser:
+    """Stream a page until its metadata has been read.
+
+    The body is decoded and parsed chunk by chunk and the download stops
+    at ``</head>`` (or the first ``<h1>`` when ``want_h1`` is set), or
+    after ``MAX_HEAD_BYTES``, whichever comes first.
+
+    Requests go through the per-host ``scrape_scheduler``; rate-limited
+    responses are retried after the host's backoff. With ``validators``
+    from an earlier response the request is conditional, and an
+    unchanged page raises ``NotModified``.
+    """
+    headers = dict(HEADERS)
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    async def once() -> Optional[HeadMetadataParser]:
+        parser = HeadMetadataParser(want_h1=want_h1)
+        start = time.perf_counter()
+        parse_time = 0.0
+        received = 0
+        async with http_client.session.get(url, headers=headers) as response:
+            if not _accepted(url, response):
+                return None
+            parser.validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                received += len(chunk)
+                parse_start = time.perf_counter()
+                parser.feed(decoder.decode(chunk))
+                parse_time += time.perf_counter() - parse_start
+                if parser.done or received >= MAX_HEAD_BYTES:
+                    break
+        _record(provider, "html", received, time.perf_counter() - start, parse_time)
+        return parser
+
+    return await _scheduled(url, once)
+
+
+async def fetch_json(url: str, provider: str = "json") -> Dict:
+    """GET a small JSON document, such as an oEmbed response."""
+
+    async def once() -> Optional[Dict]:
+        start = time.perf_counter()
+        async with http_client.session.get(
+            url, headers={**HEADERS, "Accept": "application/json"}
+        ) as response:
+            if not _accepted(url, response):
+                return None
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                body += chunk
+                if len(body) > MAX_JSON_BYTES:
+                    raise ValueError(f"JSON response from {host_of(url)} is over {MAX_JSON_BYTES} bytes")
+        parse_start = time.perf_counter()
+        data = json.loads(body)
+        parse_time = time.perf_counter() - parse_start
+        _record(provider, "json", len(body), time.perf_counter() - start, parse_time)
+        if not isinstance(data, dict):
+            raise ValueError(f"Unexpected JSON from {host_of(url)}")
+        return data
+
+    return await _scheduled(url, once)
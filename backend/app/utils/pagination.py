@@ -0,0 +1,33 @@
+"""Opaque cursor tokens for keyset pagination."""
+import base64
+import json
+from datetime import datetime
+from typing import List, Union
+
+CursorValue = Union[str, int, float, datetime]
+
+
+def encode_cursor(*values: CursorValue) -> str:
+    """Encode the sort key of the last row on a page."""
+    payload = [
+        {"dt": v.isoformat()} if isinstance(v, datetime) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int = 2) -> List[CursorValue]:
+    """Decode a cursor token. Raises ValueError if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values = [
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for v in payload
+        ]
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if len(values) != size or not isinstance(values[-1], int):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,81 @@
+"""Compact, token-budgeted content text for classification prompts."""
+import re
+import unicodedata
+from typing import List, Optional, Tuple
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_HASHTAG = re.compile(r"#(\w+)")
+_MENTION = re.compile(r"(?<!\w)@\w+")
+# Roughly how BPE tokenizers split text: short word pieces, digit groups,
+# and one token per punctuation mark or symbol.
+_TOKEN = re.compile(r"[^\W\d_]{1,4}|\d{1,3}|[^\w\s]|_")
+# Joiners and emoji presentation selectors left behind once the emoji go.
+_EMOJI_JOINERS = {"\u200d", "\ufe0e", "\ufe0f", "\u20e3"}
+
+# Hashtags kept, as plain words, once the rest are stripped.
+MAX_TAGS = 5
+EMPTY_CONTENT = "Social media content."
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count, within ~20% of common LLM tokenizers on English."""
+    return len(_TOKEN.findall(text))
+
+
+def _strip_symbols(text: str) -> str:
+    return "".join(
+        " " if unicodedata.category(ch) in ("So", "Sk", "Cs", "Co") else ch
+        for ch in text
+        if ch not in _EMOJI_JOINERS
+    )
+
+
+def _clean(caption: Optional[str], title: Optional[str]) -> Tuple[str, str]:
+    raw = f"{title or ''}\n{caption or ''}"
+    tags: List[str] = []
+    for tag in _HASHTAG.findall(raw):
+        tag = tag.lower()
+        if tag not in tags and len(tags) < MAX_TAGS:
+            tags.append(tag)
+
+    text = _strip_symbols(_MENTION.sub(" ", _HASHTAG.sub(" ", _URL.sub(" ", raw))))
+    lines: List[str] = []
+    seen = set()
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        key = line.lower()
+        # Drop separator lines ("." / "-") and lines already seen.
+        if not any(ch.isalnum() for ch in line) or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return "\n".join(lines), ("Tags: " + " ".join(tags) if tags else "")
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """Cut ``text`` after about ``budget`` tokens, at a word boundary if possible."""
+    for count, match in enumerate(_TOKEN.finditer(text), start=1):
+        if count > budget:
+            head = text[:match.start()]
+            if head[-1:].isalnum() and match.group()[0].isalnum():
+                # Mid-word: back off to the previous whitespace.
+                word_start = max(head.rfind(" "), head.rfind("\n"))
+                if word_start > 0:
+                    head = head[:word_start]
+            head = head.rstrip(" \n,;:-")
+            return head + "…" if head else ""
+    return text
+
+
+def content_for_prompt(caption: Optional[str], title: Optional[str], budget: int) -> str:
+    """Title and caption without URLs, mentions, emoji or repeated lines.
+
+    Hashtags are removed from the text; the first ``MAX_TAGS`` distinct
+    ones are kept as a trailing ``Tags:`` line since they often name the
+    topic. The result is at most about ``budget`` tokens.
+    """
+    body, tags = _clean(caption, title)
+    if tags:
+        body = truncate_tokens(body, max(budget - estimate_tokens(tags), 0))
+        return f"{body}\n{tags}" if body else tags
+    return truncate_tokens(body, budget) or EMPTY_CONTENT
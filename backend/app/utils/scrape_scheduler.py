@@ -0,0 +1,188 @@
+"""Per-host rate limiting and backoff for outbound scrapes."""
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+from app.utils.metrics import scrape_throttled
+from app.utils.url_canonical import host_of
+
+logger = logging.getLogger(__name__)
+
+
+class HostThrottled(Exception):
+    """A host asked us to back off for longer than we are willing to wait."""
+
+    def __init__(self, host: str, delay: float):
+        super().__init__(f"{host} is backing off for {delay:.0f}s")
+        self.host = host
+        self.delay = delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header, given as seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """``rate`` requests per second with bursts of up to ``burst``.
+
+    ``reserve`` takes a token immediately, going into debt if none is left,
+    and returns how long the caller must wait for it, so concurrent callers
+    are spaced out in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class HostState:
+    def __init__(self, rate: float, burst: int, concurrency: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.blocked_until = 0.0
+        self.failures = 0
+
+
+class ScrapeScheduler:
+    """Token-bucket rate limit, bounded concurrency and backoff per host.
+
+    A 429/503 or a login wall blocks the host until its ``Retry-After``, or
+    for an exponential backoff with full jitter, and later requests to it
+    wait that out. When the wait would exceed ``max_delay`` requests fail
+    fast with ``HostThrottled`` instead of holding up ingestion.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 3,
+        concurrency: int = 2,
+        backoff_base: float = 1.0,
+        backoff_max: float = 300.0,
+        max_delay: float = 30.0,
+        host_rates: Optional[Dict[str, float]] = None,
+        max_hosts: int = 10000
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_delay = max_delay
+        self.host_rates = host_rates or {}
+        self.max_hosts = max_hosts
+        self._hosts: "OrderedDict[str, HostState]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "ScrapeScheduler":
+        # SCRAPE_HOST_RATES="instagram.com=0.2,x.com=0.5" overrides the rate by host suffix.
+        host_rates = {}
+        for entry in os.getenv("SCRAPE_HOST_RATES", "").split(","):
+            host, _, rate = entry.partition("=")
+            if host.strip() and rate.strip():
+                host_rates[host.strip().lower()] = float(rate)
+        return cls(
+            rate=float(os.getenv("SCRAPE_HOST_RATE", 1.0)),
+            burst=int(os.getenv("SCRAPE_HOST_BURST", 3)),
+            concurrency=int(os.getenv("SCRAPE_HOST_CONCURRENCY", 2)),
+            backoff_base=float(os.getenv("SCRAPE_BACKOFF_BASE", 1.0)),
+            backoff_max=float(os.getenv("SCRAPE_BACKOFF_MAX", 300)),
+            max_delay=float(os.getenv("SCRAPE_MAX_DELAY", 30)),
+            host_rates=host_rates,
+        )
+
+    def _rate_for(self, host: str) -> float:
+        for suffix, rate in self.host_rates.items():
+            if host == suffix or host.endswith("." + suffix):
+                return rate
+        return self.rate
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = HostState(self._rate_for(host), self.burst, self.concurrency)
+            self._hosts[host] = state
+            while len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+        else:
+            self._hosts.move_to_end(host)
+        return state
+
+    def _check_blocked(self, host: str, state: HostState) -> float:
+        delay = state.blocked_until - time.monotonic()
+        if delay > self.max_delay:
+            scrape_throttled.inc(reason="deferred")
+            raise HostThrottled(host, delay)
+        return max(delay, 0.0)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Wait for a request slot to ``url``'s host."""
+        host = host_of(url)
+        state = self._state(host)
+        self._check_blocked(host, state)
+        async with state.semaphore:
+            delay = max(self._check_blocked(host, state), state.bucket.reserve())
+            if delay:
+                scrape_throttled.inc(reason="rate_limit")
+                await asyncio.sleep(delay)
+            yield
+
+    def backoff(self, url: str, retry_after: Optional[float] = None) -> float:
+        """Block ``url``'s host after a rate-limit response; returns the delay."""
+        host = host_of(url)
+        state = self._state(host)
+        state.failures += 1
+        if retry_after is None:
+            ceiling = min(self.backoff_max, self.backoff_base * 2 ** (state.failures - 1))
+            delay = random.uniform(0, ceiling)
+        else:
+            delay = min(retry_after, self.backoff_max)
+        state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+        logger.warning(f"Backing off {host} for {delay:.1f}s (failure {state.failures})")
+        return delay
+
+    def remaining(self, url: str) -> float:
+        """Seconds until ``url``'s host may be contacted again."""
+        return max(self._state(host_of(url)).blocked_until - time.monotonic(), 0.0)
+
+    def succeeded(self, url: str) -> None:
+        self._state(host_of(url)).failures = 0
+
+    def stats(self) -> Dict:
+        """Hosts tracked, and seconds left for each host that is backing off."""
+        now = time.monotonic()
+        return {
+            "hosts": len(self._hosts),
+            "backing_off": {
+                host: round(state.blocked_until - now, 1)
+                for host, state in self._hosts.items()
+                if state.blocked_until > now
+            },
+        }
+
+
+scrape_scheduler = ScrapeScheduler.from_env()
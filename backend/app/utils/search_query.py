@@ -0,0 +1,47 @@
+"""Translate free-text search input into full-text query syntax."""
+import re
+from typing import List, Tuple
+
+_PHRASE_OR_TERM = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def parse_search_terms(query: str) -> List[Tuple[str, List[str]]]:
+    """Split a query into ``("phrase", words)`` and ``("term", [word])`` parts.
+
+    Double-quoted text is kept together as a phrase; everything else is
+    reduced to bare words so no user input reaches the query syntax.
+    """
+    parts = []
+    for phrase, bare in _PHRASE_OR_TERM.findall(query):
+        if phrase:
+            words = _WORD.findall(phrase.lower())
+            if len(words) > 1:
+                parts.append(("phrase", words))
+            elif words:
+                parts.append(("term", words))
+        else:
+            parts.extend(("term", [w]) for w in _WORD.findall(bare.lower()))
+    return parts
+
+
+def to_fts5_query(query: str) -> str:
+    """Build an FTS5 MATCH expression: prefix terms and exact phrases, ANDed."""
+    clauses = []
+    for kind, words in parse_search_terms(query):
+        if kind == "phrase":
+            clauses.append('"' + " ".join(words) + '"')
+        else:
+            clauses.append(f'"{words[0]}"*')
+    return " ".join(clauses)
+
+
+def to_tsquery(query: str) -> str:
+    """Build a Postgres ``to_tsquery`` expression with the same semantics."""
+    clauses = []
+    for kind, words in parse_search_terms(query):
+        if kind == "phrase":
+            clauses.append("(" + " <-> ".join(words) + ")")
+        else:
+            clauses.append(f"{words[0]}:*")
+    return " & ".join(clauses)
@@ -0,0 +1,26 @@
+"""Hashtag normalisation."""
+from typing import List, Optional
+
+MAX_TAG_LENGTH = 100
+
+
+def normalize_tag(tag: str) -> str:
+    """Lowercase a tag and strip whitespace and leading ``#``."""
+    return tag.strip().lstrip("#").strip().lower()[:MAX_TAG_LENGTH]
+
+
+def parse_hashtags(hashtags: Optional[str]) -> List[str]:
+    """Distinct normalised tags from the comma-separated ``hashtags`` column."""
+    if not hashtags:
+        return []
+    tags = (normalize_tag(tag) for tag in hashtags.split(","))
+    return list(dict.fromkeys(tag for tag in tags if tag))
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with ``prefix``.
+
+    ``prefix <= tag < bound`` is an index range scan on any backend, unlike
+    ``LIKE 'prefix%'``.
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
@@ -0,0 +1,110 @@
+"""Canonical forms of saved links, used as cache and de-duplication keys."""
+import re
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the share on any site.
+TRACKING_PARAMS = {"fbclid", "gclid"}  # plus every utm_* key
+# Share-tracking parameters of particular sites, matched by host suffix.
+# Generic names such as ``t`` and ``s`` mean something elsewhere (a YouTube
+# timestamp, a search term), so they are only dropped where they are known
+# to be noise.
+HOST_TRACKING_PARAMS = {
+    "instagram.com": {"igsh", "igshid"},
+    "twitter.com": {"s", "t", "ref_src", "ref_url"},
+    "x.com": {"s", "t", "ref_src", "ref_url"},
+    "youtube.com": {"si", "feature"},
+    "youtu.be": {"si", "feature"},
+    "facebook.com": {"mibextid"},
+    "reddit.com": {"share_id", "ref", "ref_source"},
+    "tiktok.com": {"is_from_webapp", "sender_device", "_r", "_t"},
+    "medium.com": {"source"},
+}
+HOST_PREFIXES = ("www.", "m.", "mobile.")
+
+_INSTAGRAM_POST = re.compile(r"^/(?:[^/]+/)?(?:p|reel|reels|tv)/([A-Za-z0-9_-]+)")
+_TWEET = re.compile(r"/status(?:es)?/(\d+)")
+_YOUTUBE_PATH = re.compile(r"^/(?:shorts|embed|live)/([A-Za-z0-9_-]{11})")
+_YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+def host_of(url: str) -> str:
+    """Lowercased host without ``www.``/``m.``/``mobile.``, so mobile links share a key."""
+    host = (urlsplit(url.strip()).hostname or "").lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+def _is_host(host: str, domain: str) -> bool:
+    return host == domain or host.endswith("." + domain)
+
+
+def platform_canonical_url(url: str) -> Optional[str]:
+    """Canonical URL from a platform's own post id, if the link has one.
+
+    ``instagram.com/reel/X/``, ``www.instagram.com/p/X/?igsh=...`` and
+    ``instagram.com/user/p/X`` all become ``https://instagram.com/p/X``;
+    tweets on twitter.com and x.com become ``https://twitter.com/i/status/<id>``;
+    youtu.be, watch, shorts and embed links become ``https://youtube.com/watch?v=<id>``.
+    """
+    host = host_of(url)
+    path = urlsplit(url.strip()).path
+
+    if _is_host(host, "instagram.com"):
+        match = _INSTAGRAM_POST.match(path)
+        if match:
+            return f"https://instagram.com/p/{match.group(1)}"
+    elif _is_host(host, "twitter.com") or _is_host(host, "x.com"):
+        match = _TWEET.search(path)
+        if match:
+            return f"https://twitter.com/i/status/{match.group(1)}"
+    elif _is_host(host, "youtube.com") or host == "youtu.be":
+        if host == "youtu.be":
+            video_id = path.strip("/")
+        else:
+            match = _YOUTUBE_PATH.match(path)
+            video_id = match.group(1) if match else dict(parse_qsl(urlsplit(url.strip()).query)).get("v", "")
+        if _YOUTUBE_ID.match(video_id):
+            return f"https://youtube.com/watch?v={video_id}"
+    return None
+
+
+def _is_tracking_param(host: str, key: str) -> bool:
+    key = key.lower()
+    if key in TRACKING_PARAMS or key.startswith("utm_"):
+        return True
+    return any(
+        key in params for domain, params in HOST_TRACKING_PARAMS.items()
+        if _is_host(host, domain)
+    )
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalise a URL so trivially different links share one key.
+
+    Links to a known platform post collapse to that post's canonical URL.
+    Otherwise the host is lowercased without ``www.``/``m.`` prefixes, and
+    default ports, fragments, trailing slashes and tracking parameters are
+    dropped, with the remaining query string sorted. URLs too malformed to
+    parse (a bad port, an unclosed IPv6 bracket) are returned stripped.
+    """
+    try:
+        platform_url = platform_canonical_url(url)
+        if platform_url:
+            return platform_url
+
+        parts = urlsplit(url.strip())
+        host = netloc = host_of(url)
+        if parts.port and parts.port not in (80, 443):
+            netloc = f"{host}:{parts.port}"
+    except ValueError:
+        return url.strip()
+
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query)
+        if not _is_tracking_param(host, k)
+    ))
+    return urlunsplit(("https", netloc, path, query, ""))
@@ -0,0 +1 @@
+"""Local benchmarks for backend hot paths."""
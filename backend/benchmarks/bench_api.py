@@ -0,0 +1,298 @@
+"""Throughput and tail latency of the API hot paths on a synthetic corpus.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_api --users 50 --saves 200 --output before.json
+    python -m benchmarks.bench_api --users 50 --saves 200 --baseline before.json
+
+Seeds a fresh database (a temporary SQLite file unless ``--database-url``
+points at an empty SQLite or Postgres database), starts the app in-process
+and drives it through ``httpx`` with ``--concurrency`` clients. Scraped
+pages and Hugging Face inference are served by local stubs with fixed
+latencies, and outbound WhatsApp replies are dropped. Scenarios:
+
+* ``search``: full-text search with single, two-term and prefix queries
+* ``feed``: cursor pagination, each client walking deeper into a user's feed
+* ``facets``: category/platform counts, filter lists and top tags
+* ``webhook``: new links sent over WhatsApp, plus the time for the workers
+  to finish scraping and classifying them
+
+The report is JSON; with ``--baseline`` the change against an earlier report
+is printed to stderr.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from benchmarks import corpus
+from benchmarks.stubs import StubServers
+
+SCENARIOS = ("search", "feed", "facets", "webhook")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--saves", type=int, default=250, help="saves per user")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--webhook-requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--database-url", help="empty database to seed (default: temporary SQLite)")
+    parser.add_argument("--reuse", action="store_true", help="benchmark an already seeded database")
+    parser.add_argument("--page-latency-ms", type=float, default=50)
+    parser.add_argument("--inference-latency-ms", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args()
+
+
+def latency_summary(latencies: List[float]) -> Dict:
+    """Exact percentiles in milliseconds."""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+async def run_scenario(
+    operation: Callable[[int], Awaitable[bool]],
+    total: int,
+    concurrency: int
+) -> Dict:
+    """Run ``operation(0..total-1)`` from ``concurrency`` clients."""
+    latencies: List[float] = []
+    errors = 0
+    indexes = iter(range(total))
+
+    async def client() -> None:
+        nonlocal errors
+        for index in indexes:
+            start = time.perf_counter()
+            try:
+                ok = await operation(index)
+            except Exception:
+                logging.getLogger(__name__).exception("Benchmark request failed")
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else None,
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict, baseline: Dict) -> str:
+    lines = [f"{'scenario':<10} {'metric':<15} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for name, current in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        pairs = [("throughput_rps", before.get("throughput_rps"), current.get("throughput_rps"))]
+        pairs += [
+            (f"{q} ms", before["latency_ms"].get(q), current["latency_ms"].get(q))
+            for q in ("p50", "p95", "p99")
+        ]
+        for metric, old, new in pairs:
+            if old is None or new is None:
+                continue
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            lines.append(f"{name:<10} {metric:<15} {old:>10} {new:>10} {change:>8}")
+    return "\n".join(lines)
+
+
+async def benchmark(args: argparse.Namespace, stubs: StubServers) -> Dict:
+    # Imported here so the environment set in main() is seen at import time.
+    import httpx
+    import database
+    import main as app_main
+    from app.extractors import extractor_registry
+    from app.routes import whatsapp
+    from app.utils.url_extractor import URLExtractor
+
+    if database.DATABASE_URL != os.environ["DATABASE_URL"]:
+        raise SystemExit(
+            f"backend/.env points DATABASE_URL at {database.DATABASE_URL}; "
+            "move it aside before benchmarking"
+        )
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    seeded = None
+    if not args.reuse:
+        started = time.perf_counter()
+        rows = corpus.seed(database.engine, args.users, args.saves)
+        seeded = {"rows": rows, "insert_seconds": round(time.perf_counter() - started, 3)}
+
+    # Point the pipeline at the stubs and drop outbound replies.
+    URLExtractor.registry = stubs.install(extractor_registry)
+    whatsapp.whatsapp_handler.ai_processor.api_url = stubs.inference_url
+    whatsapp.whatsapp_handler.ai_processor.api_token = "bench"
+    whatsapp.whatsapp_handler.whatsapp_service.send_message = lambda to, body: True
+
+    started = time.perf_counter()
+    await app_main.startup_event()
+    if seeded is not None:
+        # init_db builds facets, tags, signatures and the search index.
+        seeded["index_seconds"] = round(time.perf_counter() - started, 3)
+
+    rng = random.Random(args.seed)
+    users = corpus.user_ids(args.users)
+    cursors: Dict[str, Optional[str]] = {}
+    nonce = int(time.time())
+    webhook_outcomes = {"queued": 0, "busy": 0}
+    results: Dict[str, Dict] = {}
+
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+
+        async def search(index: int) -> bool:
+            term = rng.choice(corpus.SEARCH_TERMS)
+            query = (term, f"{term} {rng.choice(corpus.SEARCH_TERMS)}", f"{term[:3]}*")[index % 3]
+            response = await client.get(
+                f"/api/content/{rng.choice(users)}/search", params={"q": query, "limit": 20}
+            )
+            return response.status_code == 200
+
+        async def feed(index: int) -> bool:
+            user_id = users[index % len(users)]
+            params = {"limit": 20}
+            if cursors.get(user_id):
+                params["cursor"] = cursors[user_id]
+            response = await client.get(f"/api/content/{user_id}/all", params=params)
+            cursors[user_id] = response.headers.get("X-Next-Cursor")
+            return response.status_code == 200
+
+        async def facets(index: int) -> bool:
+            user_id = rng.choice(users)
+            path = (
+                f"/api/content/{user_id}/facets?type=category",
+                f"/api/content/{user_id}/filters/categories",
+                f"/api/content/{user_id}/filters/platforms",
+                f"/api/content/{user_id}/tags",
+            )[index % 4]
+            response = await client.get(path)
+            return response.status_code == 200
+
+        async def webhook(index: int) -> bool:
+            domain = ("instagram.com/p", "twitter.com/i/status", "medium.com/@bench")[index % 3]
+            response = await client.post("/api/whatsapp/webhook", data={
+                "From": f"whatsapp:{rng.choice(users)}",
+                "Body": f"{stubs.url}/{domain}/bench{nonce}x{index}",
+            })
+            if "busy" in response.text:
+                webhook_outcomes["busy"] += 1
+                return False
+            webhook_outcomes["queued"] += 1
+            return response.status_code == 200
+
+        operations = {"search": search, "feed": feed, "facets": facets}
+        for name in args.scenarios.split(","):
+            if name in operations:
+                results[name] = await run_scenario(operations[name], args.requests, args.concurrency)
+            elif name == "webhook":
+                started = time.perf_counter()
+                results[name] = await run_scenario(webhook, args.webhook_requests, args.concurrency)
+                await whatsapp.ingestion_queue.drain()
+                ingest_seconds = time.perf_counter() - started
+                results[name].update(webhook_outcomes)
+                results[name]["ingest_seconds"] = round(ingest_seconds, 3)
+                results[name]["links_per_second"] = round(webhook_outcomes["queued"] / ingest_seconds, 1)
+                results[name]["page_requests"] = stubs.page_requests
+                results[name]["inference_requests"] = stubs.inference_requests
+            else:
+                raise SystemExit(f"Unknown scenario: {name}")
+
+    await app_main.shutdown_event()
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "dialect": database.engine.dialect.name,
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "verbose")},
+        },
+        "seed": seeded,
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    workdir = None
+    if not args.database_url:
+        workdir = tempfile.mkdtemp(prefix="socialsaver-bench-")
+        args.database_url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["HF_API_TOKEN"] = "bench"
+    os.environ.pop("EXTRACTION_CACHE_DB", None)
+    # Every stub page is on one local host; don't rate-limit it like a real site.
+    os.environ.setdefault("SCRAPE_HOST_RATE", "100000")
+    os.environ.setdefault("SCRAPE_HOST_BURST", "100000")
+    os.environ.setdefault("SCRAPE_HOST_CONCURRENCY", "1000")
+
+    stubs = StubServers(
+        page_latency=args.page_latency_ms / 1000,
+        inference_latency=args.inference_latency_ms / 1000
+    ).start()
+    try:
+        report = asyncio.run(benchmark(args, stubs))
+    finally:
+        stubs.stop()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            print(compare(report, json.load(f)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
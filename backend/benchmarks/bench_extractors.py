@@ -0,0 +1,108 @@
+"""Bytes fetched and parse time per extractor.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_extractors [--repeat 50] [--body-paragraphs 200]
+
+Every registered extractor is run against local stub pages and oEmbed
+endpoints. oEmbed providers are also measured reading the post page
+instead (``<platform>_page``), the path they fall back to and the way
+every platform used to be scraped.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict
+
+from benchmarks.stubs import StubServers
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="extracts per provider")
+    parser.add_argument("--body-paragraphs", type=int, default=200, help="page body size (~1.2KB each)")
+    parser.add_argument("--output", help="write the JSON report here")
+    return parser.parse_args()
+
+
+async def measure(name: str, extract, urls) -> Dict:
+    from app.utils.metrics import scrape_bytes, stage_seconds
+
+    def totals():
+        parse_seconds, _ = stage_seconds.total(stage="scrape_parse", provider=name)
+        formats = {kind: scrape_bytes.value(provider=name, format=kind) for kind in ("html", "json")}
+        return parse_seconds, formats
+
+    parse_before, bytes_before = totals()
+    started = time.perf_counter()
+    results = [await extract(url) for url in urls]
+    elapsed = time.perf_counter() - started
+    parse_after, bytes_after = totals()
+
+    read = {kind: bytes_after[kind] - bytes_before[kind] for kind in bytes_after}
+    return {
+        "provider": name,
+        "format": max(read, key=read.get),
+        "extracts": len(urls),
+        "complete": sum(1 for data in results if data.get("caption") or data.get("title")),
+        "bytes_per_extract": round(sum(read.values()) / len(urls)),
+        "parse_ms_per_extract": round((parse_after - parse_before) * 1000 / len(urls), 3),
+        "wall_ms_per_extract": round(elapsed * 1000 / len(urls), 3),
+    }
+
+
+async def benchmark(args: argparse.Namespace, stubs: StubServers) -> Dict:
+    # Imported here so the environment set in main() is seen at import time.
+    from app.extractors import OEmbedExtractor, extractor_registry
+    from app.utils.http_client import http_client
+
+    stubs.install(extractor_registry)
+    rows = []
+    try:
+        for extractor in extractor_registry:
+            urls = [
+                f"{stubs.url}/{extractor.hosts[0]}/bench/post{n}" for n in range(args.repeat)
+            ]
+            rows.append(await measure(extractor.platform, extractor.extract, urls))
+            if isinstance(extractor, OEmbedExtractor):
+                rows.append(await measure(f"{extractor.platform}_page", extractor.extract_page, urls))
+    finally:
+        await http_client.close()
+    return {"repeat": args.repeat, "body_paragraphs": args.body_paragraphs, "providers": rows}
+
+
+def table(report: Dict) -> str:
+    lines = [f"{'provider':<16} {'format':<6} {'bytes':>9} {'parse ms':>9} {'wall ms':>9}"]
+    for row in report["providers"]:
+        lines.append(
+            f"{row['provider']:<16} {row['format']:<6} {row['bytes_per_extract']:>9} "
+            f"{row['parse_ms_per_extract']:>9} {row['wall_ms_per_extract']:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    args = parse_args()
+    # Every stub lives on one local host; don't rate-limit it like a real site.
+    os.environ.setdefault("SCRAPE_HOST_RATE", "100000")
+    os.environ.setdefault("SCRAPE_HOST_BURST", "100000")
+    os.environ.setdefault("SCRAPE_HOST_CONCURRENCY", "1000")
+
+    stubs = StubServers(page_latency=0, body_paragraphs=args.body_paragraphs).start()
+    try:
+        report = asyncio.run(benchmark(args, stubs))
+    finally:
+        stubs.stop()
+
+    print(json.dumps(report, indent=2))
+    print(table(report), file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
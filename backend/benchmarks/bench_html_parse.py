@@ -0,0 +1,114 @@
+"""Compare the streaming head parser with a full BeautifulSoup parse.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_html_parse [--repeat 20]
+
+For synthetic pages shaped like the platforms we scrape, reports per-extract
+wall time, peak Python memory (tracemalloc) and the number of body bytes each
+approach has to consume.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from app.utils.html_head_parser import HeadMetadataParser
+from app.utils.page_fetcher import CHUNK_SIZE, MAX_HEAD_BYTES
+
+HEAD = (
+    "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+    "<title>Leg day routine | Example</title>"
+    "<meta name='description' content='Squats and lunges for stronger legs #fitness #gym'>"
+    "<meta property='og:description' content='Squats and lunges #fitness #gym'>"
+    "<meta property='og:image' content='https://cdn.example.com/thumb.jpg'>"
+    "<link rel='stylesheet' href='/app.css'>"
+)
+
+
+def _inline_js(size: int) -> str:
+    line = "window.__data.push({id: 12345, text: \"lorem ipsum dolor sit amet\"});\n"
+    return "<script>" + line * (size // len(line)) + "</script>"
+
+
+def _paragraphs(size: int) -> str:
+    para = "<div class='p'><p>Lorem ipsum <a href='#'>dolor</a> sit amet, consectetur.</p></div>"
+    return para * (size // len(para))
+
+
+PAGES = {
+    # Instagram/Twitter: metadata up front, megabytes of inline JS in the body.
+    "instagram": (HEAD + "</head><body>" + _inline_js(1_500_000) + "</body></html>", False),
+    # Medium-style article: the h1 comes early in a large body.
+    "article": (
+        HEAD + _inline_js(60_000) + "</head><body><header>nav</header>"
+        "<h1>Leg day routine</h1>" + _paragraphs(800_000) + "</body></html>",
+        True,
+    ),
+}
+
+
+def parse_with_soup(html: bytes, want_h1: bool) -> dict:
+    soup = BeautifulSoup(html.decode("utf-8"), "html.parser")
+    og = soup.find("meta", property="og:description")
+    title_tag = (soup.find("h1") or soup.find("title")) if want_h1 else soup.find("title")
+    return {
+        "caption": og.get("content") if og else None,
+        "title": title_tag.get_text().strip() if title_tag else None,
+        "bytes": len(html),
+    }
+
+
+def parse_streaming(html: bytes, want_h1: bool) -> dict:
+    parser = HeadMetadataParser(want_h1=want_h1)
+    consumed = 0
+    for start in range(0, len(html), CHUNK_SIZE):
+        chunk = html[start:start + CHUNK_SIZE]
+        consumed += len(chunk)
+        parser.feed(chunk.decode("utf-8", errors="replace"))
+        if parser.done or consumed >= MAX_HEAD_BYTES:
+            break
+    return {
+        "caption": parser.meta.get("og:description"),
+        "title": parser.h1 or parser.title,
+        "bytes": consumed,
+    }
+
+
+def measure(fn, html: bytes, want_h1: bool, repeat: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(html, want_h1)
+    elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+
+    tracemalloc.start()
+    fn(html, want_h1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ms_per_extract": round(elapsed_ms, 3),
+        "peak_kib": round(peak / 1024, 1),
+        "bytes_consumed": result["bytes"],
+        "title": result["title"],
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    report = {}
+    for name, (page, want_h1) in PAGES.items():
+        html = page.encode("utf-8")
+        report[name] = {
+            "page_bytes": len(html),
+            "beautifulsoup": measure(parse_with_soup, html, want_h1, args.repeat),
+            "streaming_head": measure(parse_streaming, html, want_h1, args.repeat),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
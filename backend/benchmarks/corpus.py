@@ -0,0 +1,98 @@
+"""Deterministic synthetic corpus for the API benchmarks."""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+from sqlalchemy import func, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.database import Base, SavedContent
+from app.utils.url_canonical import canonicalize_url
+
+TOPICS: Dict[str, List[str]] = {
+    "Fitness": ["squats", "deadlift", "mobility", "cardio", "hypertrophy", "stretching", "protein"],
+    "Coding": ["python", "rust", "asyncio", "postgres", "kubernetes", "typescript", "profiling"],
+    "Food": ["pasta", "ramen", "sourdough", "curry", "tacos", "brunch", "dessert"],
+    "Travel": ["lisbon", "kyoto", "hiking", "roadtrip", "hostel", "beaches", "itinerary"],
+    "Design": ["typography", "figma", "palette", "layout", "branding", "icons", "grids"],
+    "Business": ["startup", "pricing", "marketing", "hiring", "fundraising", "sales", "growth"],
+    "Productivity": ["notion", "habits", "pomodoro", "journaling", "focus", "calendar", "inbox"],
+}
+FILLER = ["how", "to", "best", "guide", "tips", "daily", "simple", "quick", "weekly", "my", "favourite"]
+PLATFORMS = (("instagram", 0.5), ("twitter", 0.3), ("blog", 0.2))
+
+# Search terms the benchmark draws from: every topic word occurs in the corpus.
+SEARCH_TERMS = [word for words in TOPICS.values() for word in words]
+
+
+def user_ids(users: int) -> List[str]:
+    return [f"+1555{n:07d}" for n in range(users)]
+
+
+def _url(rng: random.Random, platform: str, n: int) -> str:
+    if platform == "instagram":
+        return f"https://www.instagram.com/p/B{n:010d}/"
+    if platform == "twitter":
+        return f"https://twitter.com/user{rng.randrange(1000)}/status/{10 ** 15 + n}"
+    return f"https://medium.com/@author{rng.randrange(1000)}/post-{n}"
+
+
+def generate(users: int, saves_per_user: int, seed: int = 42) -> Iterator[Dict]:
+    """Yield ``saved_content`` rows, ``saves_per_user`` for each of ``users``."""
+    rng = random.Random(seed)
+    categories = list(TOPICS)
+    platforms, weights = zip(*PLATFORMS)
+    now = datetime.utcnow()
+    n = 0
+    for user_id in user_ids(users):
+        for _ in range(saves_per_user):
+            n += 1
+            category = rng.choice(categories)
+            platform = rng.choices(platforms, weights)[0]
+            words = rng.sample(TOPICS[category], 3) + rng.sample(FILLER, 3)
+            rng.shuffle(words)
+            tags = rng.sample(TOPICS[category], 2)
+            url = _url(rng, platform, n)
+            created_at = now - timedelta(seconds=rng.randrange(365 * 86400))
+            yield {
+                "user_id": user_id,
+                "platform": platform,
+                "original_url": url,
+                "canonical_url": canonicalize_url(url),
+                "caption": " ".join(words) + " " + " ".join(f"#{tag}" for tag in tags),
+                "title": " ".join(words[:4]).title() if platform == "blog" else None,
+                "category": category,
+                "summary": f"A {category.lower()} post about {words[0]} and {words[1]}.",
+                "hashtags": ",".join(tags),
+                "thumbnail_url": None,
+                "is_archived": rng.random() < 0.05,
+                "status": "ready",
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+
+def seed(engine: Engine, users: int, saves_per_user: int, chunk_size: int = 5000) -> int:
+    """Insert the corpus into an empty database; returns the row count.
+
+    Rows go in with Core inserts, so facets, tags, near-duplicate signatures
+    and the full-text index are built afterwards by ``database.init_db``,
+    just as for a database that predates them.
+    """
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        if db.query(func.count(SavedContent.id)).scalar():
+            raise RuntimeError("saved_content is not empty; use --reuse to benchmark it as is")
+
+    rows = 0
+    chunk: List[Dict] = []
+    with engine.begin() as conn:
+        for row in generate(users, saves_per_user):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                conn.execute(insert(SavedContent), chunk)
+                rows += len(chunk)
+                chunk = []
+        if chunk:
+            conn.execute(insert(SavedContent), chunk)
+            rows += len(chunk)
+    return rows
@@ -0,0 +1,161 @@
+"""Local stand-ins for the scraped platforms and the Hugging Face router.
+
+Pages are served under a path that starts with the platform's domain, e.g.
+``http://127.0.0.1:<port>/instagram.com/p/abc``; ``StubServers.install``
+makes ``URLExtractor`` route them as it would the real sites, and points
+the oEmbed extractors at ``GET /oembed/<platform>``.
+``POST /v1/chat/completions`` answers single and packed classification
+prompts in the format ``AIProcessor`` parses.
+"""
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+_ITEM = re.compile(r"^Item (\d+):", re.MULTILINE)
+
+_BODY_FILLER = "<p>" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20 + "</p>"
+
+
+def _page(path: str, body_paragraphs: int) -> str:
+    slug = path.rstrip("/").rsplit("/", 1)[-1]
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{slug} | Stub</title>"
+        f"<meta name='description' content='Notes on {slug} #benchmark #stub'>"
+        f"<meta property='og:description' content='Post {slug} about squats and pasta #fitness #food'>"
+        "<meta property='og:image' content='https://cdn.example.com/thumb.jpg'>"
+        "<script type='application/ld+json'>"
+        + json.dumps({"@context": "https://schema.org", "@type": "BlogPosting", "headline": slug})
+        + f"</script></head><body><h1>{slug}</h1>" + _BODY_FILLER * body_paragraphs + "</body></html>"
+    )
+
+
+def _oembed(url: str) -> dict:
+    """One response with the fields every provider's oEmbed mapping reads."""
+    slug = url.rstrip("/").rsplit("/", 1)[-1]
+    text = f"Post {slug} about squats and pasta #fitness #food"
+    return {
+        "version": "1.0",
+        "type": "rich",
+        "title": text,
+        "author_name": "bench",
+        "thumbnail_url": "https://cdn.example.com/thumb.jpg",
+        "html": f"<blockquote><p lang='en'>{text}</p>&mdash; bench</blockquote>",
+    }
+
+
+class StubRegistry:
+    """Resolves ``<stub>/<domain>/...`` links by ``<domain>``, like the real link."""
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def resolve(self, url: str):
+        return self.registry.for_host(urlsplit(url).path.lstrip("/").split("/", 1)[0])
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # The head parser closes connections mid-body by design.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServers:
+    """One threaded HTTP server for pages and inference, with fixed latencies."""
+
+    def __init__(
+        self,
+        page_latency: float = 0.05,
+        inference_latency: float = 0.3,
+        body_paragraphs: int = 200
+    ):
+        self.page_latency = page_latency
+        self.inference_latency = inference_latency
+        self.body_paragraphs = body_paragraphs
+        self.page_requests = 0
+        self.inference_requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def inference_url(self) -> str:
+        return f"{self.url}/v1/chat/completions"
+
+    def install(self, registry) -> StubRegistry:
+        """Point ``registry``'s oEmbed extractors here; returns a registry for stub links."""
+        for extractor in registry:
+            if getattr(extractor, "endpoint", None):
+                extractor.endpoint = f"{self.url}/oembed/{extractor.platform}"
+        return StubRegistry(registry)
+
+    def start(self) -> "StubServers":
+        stubs = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; without this, responses on
+            # kept-alive connections stall ~40ms on delayed ACKs.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body: str, content_type: str) -> None:
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                with stubs._lock:
+                    stubs.page_requests += 1
+                time.sleep(stubs.page_latency)
+                if self.path.startswith("/oembed/"):
+                    url = parse_qs(urlsplit(self.path).query).get("url", [""])[0]
+                    self._send(json.dumps(_oembed(url)), "application/json")
+                    return
+                self._send(_page(self.path, stubs.body_paragraphs), "text/html; charset=utf-8")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with stubs._lock:
+                    stubs.inference_requests += 1
+                time.sleep(stubs.inference_latency)
+                prompt = payload.get("messages", [{}])[-1].get("content", "")
+                items = _ITEM.findall(prompt)
+                if items:
+                    content = "\n".join(
+                        f"{n}. Category: Fitness | Summary: Stub summary {n}." for n in items
+                    )
+                else:
+                    content = "Category: Fitness\nSummary: Stub summary."
+                self._send(
+                    json.dumps({"choices": [{"message": {"content": content}}]}),
+                    "application/json"
+                )
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
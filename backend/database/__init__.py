@@ -1,8 +1,10 @@
 """Database configuration and session management."""
 import os
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.models.database import Base
+from database.engine import build_engine
+from database.migrations import run_migrations
+from database.search_index import install_search_index
 
 # Database URL
 DATABASE_URL = os.getenv(
@@ -10,12 +12,8 @@ DATABASE_URL = os.getenv(
     "sqlite:///./social_saver.db"
 )
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=False
-)
+# Create engine (pool and SQLite pragmas are configured in database.engine)
+engine = build_engine(DATABASE_URL)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -33,6 +31,19 @@ def get_db():
 def init_db():
     """Initialize database by creating all tables."""
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    install_search_index(engine)
+
+
+async def close_db():
+    """Release pooled connections on shutdown."""
+    engine.dispose()
 
 
-__all__ = ["get_db", "init_db", "SessionLocal", "engine"]
+__all__ = [
+    "get_db",
+    "init_db",
+    "close_db",
+    "SessionLocal",
+    "engine",
+]
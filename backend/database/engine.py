@@ -0,0 +1,75 @@
+"""Engine configuration from environment variables.
+
+SQLite connections get WAL journaling and related pragmas so dashboard reads
+do not wait behind webhook writes. Server databases get a tunable connection
+pool. Routes keep the event loop free by running their sync sessions in
+FastAPI's threadpool (plain ``def`` handlers), so no async driver is needed.
+"""
+import logging
+import os
+from typing import Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def sqlite_pragmas() -> Dict[str, str]:
+    """Pragmas run on every new SQLite connection, in order."""
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+        "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-64000"),  # negative = KiB
+        "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+        "temp_store": "MEMORY",
+    }
+
+
+def pool_options() -> Dict:
+    """QueuePool settings for server databases."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: Dict[str, str]) -> None:
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def build_engine(database_url: str) -> Engine:
+    """Create the application's sync engine for ``database_url``."""
+    url = make_url(database_url)
+    echo = _env_bool("DB_ECHO", False)
+
+    if url.get_backend_name() == "sqlite":
+        engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            echo=echo
+        )
+        pragmas = sqlite_pragmas()
+        if not url.database or url.database == ":memory:":
+            pragmas.pop("journal_mode")  # in-memory databases cannot use WAL
+        install_sqlite_pragmas(engine, pragmas)
+        return engine
+
+    return create_engine(database_url, echo=echo, **pool_options())
@@ -0,0 +1,212 @@
+"""Additive schema migrations applied on startup.
+
+``Base.metadata.create_all`` only creates tables that do not exist yet, so
+columns and indexes added to existing models are brought up to date here.
+Data backfills that scan whole tables run once per database and are then
+recorded in ``applied_migrations``.
+"""
+import logging
+from typing import Callable
+from sqlalchemy import bindparam, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from app.models.database import AppliedMigration, Base, SavedContent
+from app.utils.url_canonical import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+def _column_default_sql(column) -> str:
+    """Render a column's server default as a DDL fragment."""
+    default = column.server_default
+    if default is None or not isinstance(getattr(default, "arg", None), str):
+        return ""
+    return f" DEFAULT '{default.arg}'"
+
+
+def add_missing_columns(engine: Engine) -> None:
+    """Add model columns that are missing from existing tables."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl_type = column.type.compile(dialect=engine.dialect)
+                logger.info(f"Adding column {table.name}.{column.name}")
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                    f"{ddl_type}{_column_default_sql(column)}"
+                ))
+
+
+def backfill_canonical_urls(engine: Engine, batch_size: int = 1000) -> None:
+    """Fill ``saved_content.canonical_url`` for rows saved before it existed.
+
+    Runs before the unique ``(user_id, canonical_url)`` index is created. The
+    oldest row per key gets it; later duplicates keep NULL so they stay
+    visible without blocking the index.
+    """
+    table = SavedContent.__table__
+    with engine.begin() as conn:
+        taken = set(conn.execute(
+            select(table.c.user_id, table.c.canonical_url).where(
+                table.c.canonical_url.isnot(None)
+            )
+        ).all())
+        last_id = 0
+        filled = 0
+        while True:
+            rows = conn.execute(
+                select(table.c.id, table.c.user_id, table.c.original_url).where(
+                    table.c.canonical_url.is_(None), table.c.id > last_id
+                ).order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            updates = []
+            for row in rows:
+                key = (row.user_id, canonicalize_url(row.original_url))
+                if key not in taken:
+                    taken.add(key)
+                    updates.append({"row_id": row.id, "canonical": key[1]})
+            if updates:
+                conn.execute(
+                    update(table).where(table.c.id == bindparam("row_id")).values(
+                        canonical_url=bindparam("canonical")
+                    ),
+                    updates
+                )
+                filled += len(updates)
+        if filled:
+            logger.info(f"Backfilled canonical URLs for {filled} rows")
+
+
+def backfill_near_duplicate_index(engine: Engine, batch_size: int = 500) -> None:
+    """Sign live blog posts saved before near-duplicate detection existed."""
+    from sqlalchemy.orm import Session
+    from app.models.database import ContentSignature
+    from app.services.near_duplicate_index import near_duplicate_index
+
+    signed = select(ContentSignature.content_id)
+    with Session(engine) as db:
+        last_id = 0
+        total = 0
+        while True:
+            # Posts too short to sign stay unsigned, so page by id rather
+            # than re-querying for unsigned rows.
+            rows = db.query(SavedContent).filter(
+                SavedContent.platform.in_(near_duplicate_index.PLATFORMS),
+                SavedContent.status == "ready",
+                SavedContent.is_archived == False,
+                SavedContent.id.notin_(signed),
+                SavedContent.id > last_id
+            ).order_by(SavedContent.id).limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            near_duplicate_index.index_contents(db, rows)
+            db.commit()
+            total += len(rows)
+        if total:
+            logger.info(f"Signed {total} blog posts for near-duplicate detection")
+
+
+def backfill_user_facets(engine: Engine) -> None:
+    """Build ``user_facets`` once for databases that predate it."""
+    from sqlalchemy.orm import Session
+    from app.models.database import UserFacet
+    from app.services.facet_service import FacetService
+
+    with Session(engine) as db:
+        if db.query(UserFacet.user_id).first() or not db.query(SavedContent.id).first():
+            return
+        written = FacetService.rebuild(db)
+        db.commit()
+        logger.info(f"Built {written} user facet counts")
+
+
+def backfill_content_tags(engine: Engine, batch_size: int = 1000) -> None:
+    """Split the comma-separated ``hashtags`` column into ``content_tags``."""
+    from app.models.database import ContentTag
+    from app.utils.tags import parse_hashtags
+
+    content = SavedContent.__table__
+    tags = ContentTag.__table__
+    last_id = 0
+    written = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(content.c.id, content.c.user_id, content.c.hashtags).where(
+                    content.c.hashtags.isnot(None),
+                    content.c.hashtags != "",
+                    content.c.id > last_id,
+                    content.c.id.notin_(select(tags.c.content_id))
+                ).order_by(content.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            values = [
+                {"content_id": row.id, "user_id": row.user_id, "tag": tag}
+                for row in rows
+                for tag in parse_hashtags(row.hashtags)
+            ]
+            if values:
+                conn.execute(tags.insert(), values)
+                written += len(values)
+    if written:
+        logger.info(f"Backfilled {written} content tags")
+
+
+def run_once(engine: Engine, backfill: Callable[[Engine], None]) -> bool:
+    """Run ``backfill`` unless ``applied_migrations`` records that it completed.
+
+    Returns whether it ran. A backfill that fails is retried on the next start.
+    """
+    markers = AppliedMigration.__table__
+    name = backfill.__name__
+    with engine.connect() as conn:
+        if conn.execute(select(markers.c.name).where(markers.c.name == name)).first():
+            return False
+    backfill(engine)
+    try:
+        with engine.begin() as conn:
+            conn.execute(markers.insert().values(name=name))
+    except IntegrityError:
+        pass  # another process finished the same backfill first
+    return True
+
+
+def create_missing_indexes(engine: Engine) -> None:
+    """Create model indexes that are missing from existing tables."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def run_migrations(engine: Engine) -> None:
+    """Bring an existing database up to date with the models."""
+    add_missing_columns(engine)
+    run_once(engine, backfill_canonical_urls)
+    create_missing_indexes(engine)
+    run_once(engine, backfill_near_duplicate_index)
+    backfill_user_facets(engine)
+    run_once(engine, backfill_content_tags)
+
+
+__all__ = [
+    "run_migrations",
+    "run_once",
+    "add_missing_columns",
+    "backfill_canonical_urls",
+    "create_missing_indexes",
+    "backfill_near_duplicate_index",
+    "backfill_user_facets",
+    "backfill_content_tags",
+]
@@ -0,0 +1,108 @@
+"""Full-text search index over saved content.
+
+SQLite uses an external-content FTS5 table kept in sync with
+``saved_content`` by triggers. Postgres uses a generated, weighted
+``tsvector`` column backed by a GIN index. Other backends fall back to the
+``ilike`` scan in ``ContentService._search_query``.
+"""
+import logging
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "saved_content_fts"
+TSVECTOR_COLUMN = "search_vector"
+
+# Dialect the index was installed for, or None when search falls back to ilike.
+installed_dialect: Optional[str] = None
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, caption, summary, hashtags,
+        content='saved_content', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON saved_content BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, caption, summary, hashtags)
+        VALUES (new.id, new.title, new.caption, new.summary, new.hashtags);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON saved_content BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, caption, summary, hashtags)
+        VALUES ('delete', old.id, old.title, old.caption, old.summary, old.hashtags);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF title, caption, summary, hashtags ON saved_content BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, caption, summary, hashtags)
+        VALUES ('delete', old.id, old.title, old.caption, old.summary, old.hashtags);
+        INSERT INTO {FTS_TABLE}(rowid, title, caption, summary, hashtags)
+        VALUES (new.id, new.title, new.caption, new.summary, new.hashtags);
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    f"""
+    ALTER TABLE saved_content ADD COLUMN IF NOT EXISTS {TSVECTOR_COLUMN} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(hashtags, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(caption, '')), 'C')
+    ) STORED
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS ix_saved_content_{TSVECTOR_COLUMN}
+    ON saved_content USING GIN ({TSVECTOR_COLUMN})
+    """,
+]
+
+
+def _install_sqlite(engine: Engine) -> None:
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first()
+        if not exists:
+            conn.execute(text(_SQLITE_DDL[0]))
+        for ddl in _SQLITE_DDL[1:]:
+            conn.execute(text(ddl))
+        if not exists:
+            # Index rows saved before the FTS table existed.
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            logger.info("Built full-text search index")
+
+
+def _install_postgres(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for ddl in _POSTGRES_DDL:
+            conn.execute(text(ddl))
+
+
+def install_search_index(engine: Engine) -> None:
+    """Create the full-text index for the engine's dialect if supported."""
+    global installed_dialect
+
+    dialect = engine.dialect.name
+    installers = {"sqlite": _install_sqlite, "postgresql": _install_postgres}
+    if dialect not in installers:
+        logger.info(f"No full-text index for {dialect}; search will use ilike")
+        return
+
+    try:
+        installers[dialect](engine)
+        installed_dialect = dialect
+    except Exception as e:
+        logger.warning(f"Full-text index unavailable, search will use ilike: {e}")
+
+
+__all__ = ["install_search_index", "FTS_TABLE", "TSVECTOR_COLUMN"]
@@ -11,8 +11,11 @@ from fastapi.middleware.cors import CORSMiddleware
 BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(BASE_DIR / ".env", override=True)
 
-from database import init_db
+from database import init_db, close_db
 from app.routes import whatsapp, content, health
+from app.utils.http_client import http_client
+from app.utils.message_idempotency import message_idempotency
+from app.utils.metrics import RequestTimer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,8 +36,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated"],
 )
 
+# Per-route latency histograms, served at /api/metrics
+app.add_middleware(RequestTimer)
+
 # Include routers
 app.include_router(health.router)
 app.include_router(whatsapp.router)
@@ -47,12 +54,21 @@ async def startup_event():
     logger.info("Starting Social Saver Bot API")
     init_db()
     logger.info("Database initialized")
+    whatsapp.whatsapp_handler.ai_processor.prune_classification_cache()
+    message_idempotency.prune()
+    await http_client.start()
+    await whatsapp.ingestion_queue.start()
+    await whatsapp.reclassifier.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down Social Saver Bot API")
+    await whatsapp.reclassifier.stop()
+    await whatsapp.ingestion_queue.stop()
+    await http_client.close()
+    await close_db()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,41 @@
+"""Shared fixtures. Tests run against a throwaway SQLite database."""
+import os
+import tempfile
+import uuid
+
+# Must be set before ``database`` is imported anywhere.
+_tmp = tempfile.mkdtemp(prefix="social-saver-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["HF_API_TOKEN"] = ""
+os.environ["LOCAL_CLASSIFIER_PATH"] = f"{_tmp}/local_classifier.npz"
+
+import pytest
+from sqlalchemy import text
+from app.models.database import Base
+from database import SessionLocal, engine, init_db
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    init_db()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+@pytest.fixture
+def user_id():
+    """A fresh user, so in-process caches keyed by user never leak between tests."""
+    return f"whatsapp:+1{uuid.uuid4().int % 10**10:010d}"
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from app.utils.ai_processor import AIProcessor
+from app.utils.classification_cache import classification_cache
+from app.utils.prompt_builder import content_for_prompt
+
+
+@pytest.fixture
+def processor(monkeypatch, db):
+    classification_cache._memory.clear()
+    processor = AIProcessor()
+    processor.api_token = "test-token"
+    processor.local_audit_rate = 0
+    return processor
+
+
+def test_batch_items_missing_from_the_reply_are_classified_alone(processor, monkeypatch):
+    calls = []
+
+    async def chat(system, prompt, max_tokens):
+        calls.append(prompt)
+        if prompt.startswith("Item 1"):
+            return "1. Category: Coding | Summary: About Python\n3. Category: food | Summary: A recipe", "", processor.model
+        return "Category: Travel\nSummary: A trip", "", processor.model
+
+    monkeypatch.setattr(processor, "_chat", chat)
+    items = [("python decorators explained", None), ("beach trip to lisbon", None), ("vegan lasagne recipe", None)]
+
+    results = asyncio.run(processor.classify_batch(items, batch_size=3))
+
+    assert [(r.category, r.summary, r.source) for r in results] == [
+        ("Coding", "About Python", "llm"),
+        ("Travel", "A trip", "llm"),
+        ("Food", "A recipe", "llm"),
+    ]
+    assert len(calls) == 2
+
+
+def test_fallback_results_are_not_cached(processor, monkeypatch):
+    async def chat(system, prompt, max_tokens):
+        return None, "AI service unavailable", None
+
+    monkeypatch.setattr(processor, "_chat", chat)
+
+    caption = "a post that cannot be classified now"
+
+    result = asyncio.run(processor.classify(caption, None))
+
+    assert result == ("Other", "AI service unavailable", None)
+    assert processor.needs_retry(result.summary)
+    prompt = content_for_prompt(caption, None, processor.input_token_budget)
+    assert classification_cache.get(processor.model, processor.prompt_version(), prompt) is None
+
+
+def test_answers_after_failover_are_cached_under_the_fallback_model(processor, monkeypatch):
+    processor.model = "primary-model-test"
+    processor.fallback_models = ["fallback-model-test@http://fallback.invalid/v1/chat/completions"]
+    answered_by = []
+
+    async def chat_model(model, url, system, prompt, max_tokens, timeout):
+        answered_by.append(model)
+        if model == "primary-model-test":
+            return None, "AI service unavailable", False
+        return "Category: Food\nSummary: A recipe", "", True
+
+    monkeypatch.setattr(processor, "_chat_model", chat_model)
+    caption = "slow cooker chilli for a crowd"
+    prompt = content_for_prompt(caption, None, processor.input_token_budget)
+    version = processor.prompt_version()
+
+    result = asyncio.run(processor.classify(caption, None))
+
+    assert result == ("Food", "A recipe", "llm")
+    assert answered_by == ["primary-model-test", "fallback-model-test"]
+    assert classification_cache.get("primary-model-test", version, prompt) is None
+    assert classification_cache.get("fallback-model-test", version, prompt) == ("Food", "A recipe")
+
+    # The fallback's answer is found again without another call.
+    assert asyncio.run(processor.classify(caption, None)) == ("Food", "A recipe", "llm")
+    assert len(answered_by) == 2
@@ -0,0 +1,54 @@
+import pytest
+
+from app.utils import circuit_breaker
+from app.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, ModelCircuit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_consecutive_failures_open_the_circuit(clock):
+    circuit = ModelCircuit("m", failure_threshold=3, cooldown=30)
+    for _ in range(2):
+        circuit.record(1.0, False)
+    circuit.record(1.0, True)
+    for _ in range(2):
+        circuit.record(1.0, False)
+    assert circuit.state == CLOSED and circuit.allow()
+
+    circuit.record(1.0, False)
+    assert circuit.state == OPEN
+    assert not circuit.allow() and not circuit.available()
+
+
+def test_one_probe_after_the_cooldown_closes_or_reopens(clock):
+    circuit = ModelCircuit("m", failure_threshold=1, cooldown=30)
+    circuit.record(1.0, False)
+
+    clock[0] += 30
+    assert circuit.available()
+    assert circuit.allow() and circuit.state == HALF_OPEN
+    assert not circuit.allow() and not circuit.available()  # one probe at a time
+    circuit.record(1.0, False)
+    assert circuit.state == OPEN and not circuit.allow()
+
+    clock[0] += 30
+    assert circuit.allow()
+    circuit.record(1.0, True)
+    assert circuit.state == CLOSED and circuit.allow() and circuit.allow()
+
+
+def test_timeout_follows_p99_latency_per_unit_cost():
+    circuit = ModelCircuit("m", min_samples=10, min_timeout=1, max_timeout=60, timeout_multiplier=2)
+    assert circuit.timeout(100) == 60  # not enough samples yet
+
+    for _ in range(20):
+        circuit.record(2.0, True, cost=100)  # 0.02s per token
+    assert circuit.timeout(100) == pytest.approx(4.0)
+    assert circuit.timeout(1000) == pytest.approx(40.0)
+    assert circuit.timeout(10000) == 60
+    assert circuit.timeout(1) == 1
@@ -0,0 +1,95 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.database import SavedContent
+from app.routes import content
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(content.router)
+    return TestClient(app)
+
+
+def test_streamed_search_rejects_a_bad_cursor_before_streaming(client, db, user_id):
+    db.add(SavedContent(user_id=user_id, platform="blog", original_url="https://dev.to/a", title="Python"))
+    db.commit()
+
+    response = client.get(f"/api/content/{user_id}/search", params={"q": "python", "stream": "true", "cursor": "garbage"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_streamed_search_returns_every_match_as_ndjson(client, db, user_id):
+    db.add_all([
+        SavedContent(user_id=user_id, platform="blog", original_url=f"https://dev.to/{n}", title=f"Python {n}")
+        for n in range(3)
+    ])
+    db.commit()
+
+    response = client.get(f"/api/content/{user_id}/search", params={"q": "python", "stream": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(response.text.splitlines()) == 3
+
+
+@pytest.fixture
+def import_jobs(monkeypatch):
+    started = []
+
+    async def run_import_job(job, content_ids):
+        started.append(content_ids)
+
+    monkeypatch.setattr(content, "run_import_job", run_import_job)
+    return started
+
+
+def _jsonl(lines):
+    return {"file": ("saves.jsonl", "\n".join(lines).encode(), "application/x-ndjson")}
+
+
+def test_import_with_a_malformed_line_stores_nothing(client, db, user_id, import_jobs):
+    lines = [f'{{"url": "https://dev.to/post-{n}"}}' for n in range(1500)] + ["{not json"]
+
+    response = client.post(f"/api/content/{user_id}/import", files=_jsonl(lines))
+
+    assert response.status_code == 400
+    assert "line 1501" in response.json()["detail"]
+    assert db.query(SavedContent).filter_by(user_id=user_id).count() == 0
+    assert import_jobs == []
+
+
+def test_import_stores_supported_links_and_starts_the_job(client, db, user_id, import_jobs):
+    lines = [
+        '{"url": "https://dev.to/a"}',
+        '{"url": "https://dev.to/a/?utm_source=x"}',
+        '{"url": "https://box.com/unsupported"}',
+        '{"url": "https://x.com/u/status/1"}',
+    ]
+
+    response = client.post(f"/api/content/{user_id}/import", files=_jsonl(lines))
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["total"] == 2 and body["skipped"] == 2
+    rows = db.query(SavedContent).filter_by(user_id=user_id).all()
+    assert {row.status for row in rows} == {"importing"}
+    assert import_jobs == [sorted(row.id for row in rows)]
+
+
+@pytest.mark.parametrize("name, body, detail", [
+    ("saves.csv", b"url\nhttps://dev.to/a\n\"" + b"x" * 200000 + b"\"\n", "Invalid CSV"),
+    ("saves.csv", b"url\nhttps://dev.to/a\nhttps://dev.to/\xff\xfe\n", "not UTF-8"),
+    ("saves.jsonl", b'{"url": "https://dev.to/a"}\n{"url": "\xff"}\n', "not UTF-8"),
+])
+def test_import_of_an_unreadable_file_is_a_400(client, db, user_id, import_jobs, name, body, detail):
+    response = client.post(f"/api/content/{user_id}/import", files={"file": (name, body, "text/plain")})
+
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+    assert db.query(SavedContent).filter_by(user_id=user_id).count() == 0
+    assert import_jobs == []
@@ -0,0 +1,26 @@
+from sqlalchemy import text
+
+from database import engine
+from database.engine import build_engine, pool_options
+
+
+def test_sqlite_connections_get_wal_and_pragmas():
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+
+def test_in_memory_sqlite_skips_wal():
+    memory = build_engine("sqlite://")
+    with memory.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "memory"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+
+def test_pool_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "off")
+
+    assert pool_options()["pool_size"] == 3
+    assert pool_options()["pool_pre_ping"] is False
@@ -0,0 +1,60 @@
+from typing import Dict
+
+import pytest
+
+from app.extractors import (
+    ArticleExtractor,
+    Extractor,
+    ExtractorRegistry,
+    InstagramExtractor,
+    OEmbedExtractor,
+    RedditExtractor,
+    TikTokExtractor,
+    TwitterExtractor,
+    YouTubeExtractor,
+    extractor_registry,
+)
+
+
+@pytest.mark.parametrize("url, extractor", [
+    ("https://x.com/a/status/1", TwitterExtractor),
+    ("https://mobile.twitter.com/a/status/1", TwitterExtractor),
+    ("https://m.youtube.com/watch?v=dQw4w9WgXcQ", YouTubeExtractor),
+    ("https://youtu.be/dQw4w9WgXcQ", YouTubeExtractor),
+    ("https://old.reddit.com/r/python/comments/abc/", RedditExtractor),
+    ("https://www.tiktok.com/@a/video/1", TikTokExtractor),
+    ("https://www.instagram.com/p/abc/", InstagramExtractor),
+    ("https://medium.com/@a/post", ArticleExtractor),
+])
+def test_links_resolve_by_host_suffix(url, extractor):
+    assert type(extractor_registry.resolve(url)) is extractor
+
+
+def test_lookalike_domains_do_not_match():
+    assert extractor_registry.resolve("https://box.com/file") is None
+    assert extractor_registry.resolve("https://notyoutube.com/watch") is None
+
+
+def test_incomplete_plugins_fail_when_registered():
+    registry = ExtractorRegistry()
+
+    class NoExtract(Extractor):
+        hosts = ("example.com",)
+
+    class NoMapping(OEmbedExtractor):
+        hosts = ("example.org",)
+
+    for plugin in (NoExtract, NoMapping):
+        with pytest.raises(TypeError):
+            registry.register(plugin)
+    assert registry.platforms() == []
+
+    @registry.register
+    class Complete(OEmbedExtractor):
+        platform = "example"
+        hosts = ("example.org",)
+
+        def from_oembed(self, url: str, data: Dict) -> Dict:
+            return self.result(url, title=data.get("title"))
+
+    assert registry.platforms() == ["example"]
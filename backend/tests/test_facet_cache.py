@@ -0,0 +1,50 @@
+import pytest
+
+from app.utils import facet_cache as facet_cache_module
+from app.utils.facet_cache import FacetCache, GLOBAL_SCOPE
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(facet_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_invalidate_makes_the_scope_stale():
+    cache = FacetCache()
+    cache.set("u1", "categories", ["Coding"], cache.version("u1"))
+    cache.set(GLOBAL_SCOPE, "users", ["u1"], cache.version(GLOBAL_SCOPE))
+
+    cache.invalidate("u1")
+    assert cache.get("u1", "categories") is None
+    assert cache.get(GLOBAL_SCOPE, "users") == (["u1"], FacetCache.make_etag(["u1"]))
+
+    cache.invalidate("u1", new_rows=True)
+    assert cache.get(GLOBAL_SCOPE, "users") is None
+
+
+def test_a_value_read_before_a_write_is_not_stored():
+    cache = FacetCache()
+    version = cache.version("u1")
+    cache.invalidate("u1")
+
+    cache.set("u1", "categories", ["stale"], version)
+
+    assert cache.get("u1", "categories") is None
+
+
+def test_entries_expire_so_other_workers_catch_up(clock):
+    # A write handled by another worker never bumps this process's version.
+    cache = FacetCache(ttl=10)
+    cache.set("u1", "categories", ["Coding"], cache.version("u1"))
+
+    clock[0] += 9.9
+    assert cache.get("u1", "categories") is not None
+    clock[0] += 0.1
+    assert cache.get("u1", "categories") is None
+
+
+def test_etags_depend_only_on_the_value():
+    assert FacetCache.make_etag({"a": 1, "b": 2}) == FacetCache().make_etag({"b": 2, "a": 1})
+    assert FacetCache.make_etag(["Coding"]) != FacetCache.make_etag(["Coding", "Food"])
@@ -0,0 +1,126 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.database import SavedContent, UserFacet
+from app.models.schemas import CreateSavedContentSchema
+from app.routes import content
+from app.services.content_service import ContentService
+from app.services.facet_service import FacetService
+from app.utils.facet_cache import facet_cache
+
+
+def _create(db, user_id, n, platform="blog", category="Coding"):
+    return ContentService.create_content(db, CreateSavedContentSchema(
+        user_id=user_id, platform=platform, original_url=f"https://dev.to/{n}", category=category
+    ))
+
+
+def _counts(db, user_id):
+    db.expire_all()
+    return {
+        (f.facet_type, f.value): f.count
+        for f in db.query(UserFacet).filter(UserFacet.user_id == user_id)
+    }
+
+
+def test_counts_follow_create_recategorise_archive_and_restore(db, user_id):
+    first = _create(db, user_id, 1)
+    _create(db, user_id, 2, platform="youtube")
+    assert _counts(db, user_id) == {
+        ("category", "Coding"): 2, ("platform", "blog"): 1, ("platform", "youtube"): 1
+    }
+
+    ContentService.update_content(db, first.id, user_id, {"category": "Design"})
+    assert _counts(db, user_id) == {
+        ("category", "Coding"): 1, ("category", "Design"): 1,
+        ("platform", "blog"): 1, ("platform", "youtube"): 1
+    }
+
+    ContentService.delete_content(db, first.id, user_id)
+    assert _counts(db, user_id) == {("category", "Coding"): 1, ("platform", "youtube"): 1}
+
+    ContentService.update_content(db, first.id, user_id, {"is_archived": False})
+    assert _counts(db, user_id)[("category", "Design")] == 1
+    assert _counts(db, user_id)[("platform", "blog")] == 1
+
+
+def test_null_category_counts_only_the_platform(db, user_id):
+    row = _create(db, user_id, 1, category=None)
+    assert _counts(db, user_id) == {("platform", "blog"): 1}
+
+    ContentService.update_content(db, row.id, user_id, {"category": "Food"})
+    ContentService.update_content(db, row.id, user_id, {"category": None})
+    assert _counts(db, user_id) == {("platform", "blog"): 1}
+
+
+def test_bulk_inserts_are_counted_through_apply(db, user_id):
+    rows = [
+        {"user_id": user_id, "platform": "reddit", "category": "Food", "is_archived": False},
+        {"user_id": user_id, "platform": "reddit", "category": "Food", "is_archived": True},
+    ]
+    FacetService.apply(db.connection(), *FacetService.count_rows(rows))
+    db.commit()
+    assert _counts(db, user_id) == {("category", "Food"): 1, ("platform", "reddit"): 1}
+
+
+def test_rebuild_recomputes_drifted_counts_for_one_user(db, user_id):
+    other = f"{user_id}-other"
+    _create(db, user_id, 1)
+    _create(db, user_id, 2, category="Food")
+    _create(db, other, 1)
+    db.query(UserFacet).update({UserFacet.count: 99})
+    db.add(UserFacet(user_id=user_id, facet_type="category", value="Stale", count=3))
+    db.commit()
+
+    assert FacetService.rebuild(db, user_id) == 3
+    db.commit()
+
+    assert _counts(db, user_id) == {
+        ("category", "Coding"): 1, ("category", "Food"): 1, ("platform", "blog"): 2
+    }
+    assert _counts(db, other)[("platform", "blog")] == 99
+
+
+@pytest.fixture
+def client():
+    facet_cache.clear()
+    app = FastAPI()
+    app.include_router(content.router)
+    return TestClient(app)
+
+
+def test_facets_route_serves_counts_with_an_etag(client, db, user_id):
+    _create(db, user_id, 1)
+    _create(db, user_id, 2)
+
+    response = client.get(f"/api/content/{user_id}/facets")
+    assert response.status_code == 200
+    assert [(f["value"], f["count"]) for f in response.json()["category"]] == [("Coding", 2)]
+    etag = response.headers["ETag"]
+
+    unchanged = client.get(f"/api/content/{user_id}/facets", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304 and unchanged.content == b""
+
+    _create(db, user_id, 3, category="Food")
+    changed = client.get(f"/api/content/{user_id}/facets", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+    platforms = client.get(f"/api/content/{user_id}/facets", params={"type": "platform"}).json()
+    assert list(platforms) == ["platform"]
+    assert [(f["value"], f["count"]) for f in platforms["platform"]] == [("blog", 3)]
+
+
+def test_rebuild_route_runs_a_job_that_fixes_counts(client, db, user_id):
+    _create(db, user_id, 1)
+    db.query(UserFacet).delete()
+    db.commit()
+
+    job = client.post(f"/api/content/{user_id}/facets/rebuild")
+    assert job.status_code == 202
+
+    status = client.get(f"/api/content/{user_id}/jobs/{job.json()['id']}").json()
+    assert status["status"] == "completed"
+    assert _counts(db, user_id) == {("category", "Coding"): 1, ("platform", "blog"): 1}
+    categories = client.get(f"/api/content/{user_id}/facets").json()["category"]
+    assert [(f["value"], f["count"]) for f in categories] == [("Coding", 1)]
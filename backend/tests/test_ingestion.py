@@ -0,0 +1,98 @@
+import asyncio
+
+from app.models.database import SavedContent
+from app.services.content_service import ContentService
+from app.services.ingestion_service import IngestionJob, IngestionQueue
+
+
+def test_restart_requeues_every_pending_row_however_small_the_queue(db, user_id, monkeypatch):
+    rows = [
+        SavedContent(user_id=user_id, platform="blog", original_url=f"https://dev.to/p{n}", status="pending")
+        for n in range(7)
+    ]
+    db.add_all(rows)
+    db.add(SavedContent(user_id=user_id, platform="blog", original_url="https://dev.to/done"))
+    db.commit()
+
+    processed = []
+
+    async def process(job):
+        await asyncio.sleep(0)
+        processed.extend(content_id for content_id, _ in job.items)
+
+    queue = IngestionQueue(handler=None, workers=1, maxsize=2)
+    monkeypatch.setattr(queue, "_process", process)
+
+    async def run():
+        await queue.start()
+        feeder = queue._tasks[-1]
+        await asyncio.wait_for(feeder, timeout=5)
+        await queue.drain()
+        await queue.stop()
+
+    asyncio.run(run())
+    assert processed == [row.id for row in rows]
+
+
+def _near_duplicate_saved(db, user_id, monkeypatch):
+    """Run a pending link through ingestion with a near-duplicate match."""
+    from app.services.whatsapp_service import whatsapp_handler
+
+    original = SavedContent(
+        user_id=user_id, platform="blog", original_url="https://dev.to/original",
+        canonical_url="https://dev.to/original", title="Meal prep for the week"
+    )
+    copy = SavedContent(
+        user_id=user_id, platform="blog", original_url="https://medium.com/copy",
+        canonical_url="https://medium.com/copy", status="pending"
+    )
+    db.add_all([original, copy])
+    db.commit()
+
+    service = whatsapp_handler.whatsapp_service
+    monkeypatch.setattr(service, "send_message", lambda to, body: True)
+
+    class Handler:
+        whatsapp_service = service
+
+        async def enrich_urls(self, urls, concurrency, screen):
+            return [await screen(url, {"platform": "blog", "title": "Meal prep"}) for url in urls]
+
+    monkeypatch.setattr(
+        IngestionQueue, "_find_near_duplicate",
+        staticmethod(lambda user_id, data: (original.id, original.title, original.original_url))
+    )
+    queue = IngestionQueue(Handler())
+    asyncio.run(queue._process(IngestionJob(user_id, [(copy.id, copy.original_url)])))
+    db.expire_all()
+    return original, copy
+
+
+def test_near_duplicate_row_records_the_original(db, user_id, monkeypatch):
+    original, copy = _near_duplicate_saved(db, user_id, monkeypatch)
+
+    assert (copy.status, copy.is_archived, copy.duplicate_of) == ("duplicate", True, original.id)
+
+
+def test_resending_a_near_duplicate_answers_with_the_original(db, user_id, monkeypatch):
+    from app.routes.whatsapp import _save_links
+
+    original, copy = _near_duplicate_saved(db, user_id, monkeypatch)
+
+    saved, replies = _save_links(db, user_id, [("blog", "https://medium.com/copy?utm_source=x")])
+
+    assert saved.queued == [] and saved.existing == [original]
+    assert len(replies) == 1
+    assert "Meal prep for the week" in replies[0] and "https://dev.to/original" in replies[0]
+    assert "medium.com" not in replies[0]
+
+
+def test_resending_a_near_duplicate_of_a_removed_post_scrapes_it_again(db, user_id, monkeypatch):
+    original, copy = _near_duplicate_saved(db, user_id, monkeypatch)
+    copy.duplicate_of = None
+    db.commit()
+
+    saved = ContentService.save_links(db, user_id, [("blog", "https://medium.com/copy")])
+
+    assert saved.queued == [(copy.id, copy.original_url)]
+    assert (copy.status, copy.is_archived) == ("pending", False)
@@ -0,0 +1,105 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from app.utils import ai_processor as ai_processor_module
+from app.utils.ai_processor import AIProcessor
+from app.utils.classification_cache import classification_cache
+from app.utils.local_classifier import LocalClassifier, NaiveBayesModel, classifier_text
+
+CATEGORIES = ["Fitness", "Food", "Coding"]
+DOCUMENTS = [
+    ("leg day squats and lunges #gym", "Fitness"),
+    ("deadlift workout at the gym #fitness", "Fitness"),
+    ("morning cardio workout squats #gym", "Fitness"),
+    ("homemade pasta recipe with garlic #food", "Food"),
+    ("easy vegan pasta dinner recipe", "Food"),
+    ("chocolate cake recipe for dinner #food", "Food"),
+    ("python decorators explained #coding", "Coding"),
+    ("debugging python code in vscode", "Coding"),
+    ("javascript and python code tips #coding", "Coding"),
+]
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    path = str(tmp_path / "local_classifier.npz")
+    NaiveBayesModel.train(DOCUMENTS, CATEGORIES, min_count=1).save(path)
+    return path
+
+
+def test_train_save_load_round_trip(model_path):
+    trained = NaiveBayesModel.train(DOCUMENTS, CATEGORIES, min_count=1)
+    loaded = NaiveBayesModel.load(model_path)
+
+    assert loaded.categories == CATEGORIES
+    assert loaded.vocabulary == trained.vocabulary
+    assert loaded.info["samples_per_category"] == {"Fitness": 3, "Food": 3, "Coding": 3}
+    np.testing.assert_allclose(loaded.log_likelihood, trained.log_likelihood, rtol=1e-6)
+    for text in ("squats at the gym", "pasta recipe", "python code"):
+        assert loaded.predict(text).category == trained.predict(text).category
+    assert loaded.predict("squats at the gym").category == "Fitness"
+
+
+def test_unknown_text_has_no_prediction(model_path):
+    assert NaiveBayesModel.load(model_path).predict("zebra quantum") is None
+
+
+def test_threshold_separates_confident_predictions(model_path):
+    classifier = LocalClassifier(model_path, threshold=0.9)
+    asyncio.run(classifier.refresh())
+
+    confident = classifier.predict("squats lunges deadlift workout gym")
+    mixed = classifier.predict("python pasta")
+    assert classifier.is_confident(confident) and confident.category == "Fitness"
+    assert mixed is not None and not classifier.is_confident(mixed)
+    assert not classifier.is_confident(None)
+
+
+def test_retrained_file_is_picked_up_and_a_missing_one_unloads(model_path):
+    classifier = LocalClassifier(model_path, reload_interval=0)
+    asyncio.run(classifier.refresh())
+    assert classifier.stats()["model"]["samples"] == 9
+
+    NaiveBayesModel.train(DOCUMENTS[:6], CATEGORIES, min_count=1).save(model_path)
+    os.utime(model_path, (1, 1))
+    asyncio.run(classifier.refresh())
+    assert classifier.stats()["model"]["samples"] == 6
+
+    os.remove(model_path)
+    asyncio.run(classifier.refresh())
+    assert classifier.model is None and classifier.predict("squats gym") is None
+
+
+def test_classify_batch_only_sends_unconfident_items_to_the_llm(model_path, monkeypatch, db):
+    classification_cache._memory.clear()
+    monkeypatch.setattr(ai_processor_module, "local_classifier", LocalClassifier(model_path, threshold=0.9))
+    processor = AIProcessor()
+    processor.api_token = "test-token"
+    processor.local_audit_rate = 0
+    prompts = []
+
+    async def chat(system, prompt, max_tokens):
+        prompts.append(prompt)
+        return "Category: Travel\nSummary: A trip", "", processor.model
+
+    monkeypatch.setattr(processor, "_chat", chat)
+    items = [
+        ("squats lunges deadlift workout #gym", "Leg day"),
+        ("beach trip to lisbon", None),
+    ]
+
+    results = asyncio.run(processor.classify_batch(items))
+
+    assert [(r.category, r.summary, r.source) for r in results] == [
+        ("Fitness", "Leg day", "local"),
+        ("Travel", "A trip", "llm"),
+    ]
+    assert len(prompts) == 1 and "lisbon" in prompts[0] and "squats" not in prompts[0]
+
+
+def test_classifier_text_is_shared_with_training():
+    assert classifier_text("caption", "Title") == "Title\ncaption"
+    assert classifier_text(None, "") == "Social media content."
@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.database import ProcessedMessage
+from app.utils.message_idempotency import MessageIdempotency, MessageInProgress
+
+
+def _worker(**options):
+    """One uvicorn worker's view: its own memory, the shared database."""
+    return MessageIdempotency(poll_interval=0.01, **options)
+
+
+def _handler(calls, reply="<Response>ok</Response>", remember=True, gate=None):
+    async def handle():
+        calls.append(reply)
+        if gate is not None:
+            await gate.wait()
+        return reply, remember
+    return handle
+
+
+def test_a_retry_on_another_worker_replays_the_first_reply(db):
+    first, second = _worker(), _worker()
+    calls = []
+
+    async def run():
+        gate = asyncio.Event()
+        original = asyncio.create_task(first.run("SM1", "u1", _handler(calls, "<Response>first</Response>", gate=gate)))
+        await asyncio.sleep(0.05)
+        retry = asyncio.create_task(second.run("SM1", "u1", _handler(calls, "<Response>second</Response>")))
+        await asyncio.sleep(0.05)
+        gate.set()
+        return await original, await retry
+
+    assert asyncio.run(run()) == ("<Response>first</Response>", "<Response>first</Response>")
+    assert calls == ["<Response>first</Response>"]
+    row = db.get(ProcessedMessage, "SM1")
+    assert (row.status, row.response) == ("done", "<Response>first</Response>")
+
+
+def test_a_retry_waits_no_longer_than_wait_seconds(db):
+    first, second = _worker(), _worker(wait_seconds=0.05)
+    calls = []
+
+    async def run():
+        gate = asyncio.Event()
+        original = asyncio.create_task(first.run("SM2", "u1", _handler(calls, gate=gate)))
+        await asyncio.sleep(0.02)
+        with pytest.raises(MessageInProgress):
+            await second.run("SM2", "u1", _handler(calls))
+        gate.set()
+        await original
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("remember", [False, True])
+def test_only_remembered_replies_are_replayed(db, remember):
+    worker = _worker()
+    calls = []
+
+    asyncio.run(worker.run("SM3", "u1", _handler(calls, remember=remember)))
+    asyncio.run(_worker().run("SM3", "u1", _handler(calls, remember=remember)))
+
+    assert len(calls) == (1 if remember else 2)
+
+
+def test_a_failed_attempt_releases_its_claim(db):
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_worker().run("SM4", "u1", fail))
+    assert db.get(ProcessedMessage, "SM4") is None
+
+    calls = []
+    assert asyncio.run(_worker().run("SM4", "u1", _handler(calls))) == "<Response>ok</Response>"
+
+
+def test_an_abandoned_claim_is_taken_over(db):
+    db.add(ProcessedMessage(
+        message_sid="SM5", user_id="u1", status="processing", response="",
+        created_at=datetime.utcnow() - timedelta(minutes=5)
+    ))
+    db.commit()
+    calls = []
+
+    reply = asyncio.run(_worker(claim_timeout=60).run("SM5", "u1", _handler(calls)))
+
+    assert reply == "<Response>ok</Response>" and len(calls) == 1
+
+
+def test_messages_without_a_sid_are_always_handled(db):
+    worker = _worker()
+    calls = []
+    asyncio.run(worker.run(None, "u1", _handler(calls)))
+    asyncio.run(worker.run(None, "u1", _handler(calls)))
+    assert len(calls) == 2
@@ -0,0 +1,84 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.metrics import Histogram, RequestTimer, Registry, http_request_seconds
+
+OBSERVATIONS = (0.5, 1.0, 1.5, 1.5, 3.0, 10.0)
+
+
+@pytest.fixture
+def histogram():
+    histogram = Histogram("latency_seconds", "Latency", buckets=(4.0, 1.0, 2.0))
+    for value in OBSERVATIONS:
+        histogram.observe(value, route="/a")
+    return histogram
+
+
+def test_quantiles_interpolate_inside_the_bucket(histogram):
+    # Buckets <=1: 2, <=2: 2, <=4: 1, +Inf: 1.
+    assert histogram.quantile(0.5, route="/a") == pytest.approx(1.5)
+    assert histogram.quantile(0.8, route="/a") == pytest.approx(3.6)
+    assert histogram.quantile(0.25, route="/a") == pytest.approx(0.75)
+    # Ranks in the +Inf bucket are reported as the largest finite bound.
+    assert histogram.quantile(0.99, route="/a") == 4.0
+    assert histogram.quantile(0.5, route="/other") is None
+    assert histogram.total(route="/a") == (17.5, 6)
+
+
+def test_registry_renders_cumulative_buckets_with_escaped_labels():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(1.0, 2.0))
+    counter = registry.counter("saves_total", "Saves")
+    for value in (0.5, 1.0, 1.5, 7.0):
+        histogram.observe(value, route='/a"b\\c\n')
+    counter.inc(2, outcome="saved")
+    registry.add_collector(lambda: [("queue_depth", "gauge", "Queued jobs", [({"queue": "x"}, 3)])])
+
+    lines = registry.render().splitlines()
+
+    labels = 'route="/a\\"b\\\\c\\n"'
+    assert lines[:8] == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        f'latency_seconds_bucket{{{labels},le="1.0"}} 2',
+        f'latency_seconds_bucket{{{labels},le="2.0"}} 3',
+        f'latency_seconds_bucket{{{labels},le="+Inf"}} 4',
+        f"latency_seconds_sum{{{labels}}} 10.0",
+        f"latency_seconds_count{{{labels}}} 4",
+        "# HELP latency_seconds_quantile Estimated p50/p95/p99 of latency_seconds",
+    ]
+    assert f'latency_seconds_quantile{{{labels},quantile="0.5"}} 1.0' in lines
+    assert 'saves_total{outcome="saved"} 2' in lines
+    assert lines[-3:] == ["# HELP queue_depth Queued jobs", "# TYPE queue_depth gauge", 'queue_depth{queue="x"} 3']
+
+
+def test_request_timer_labels_requests_by_route_template():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(RequestTimer(app))
+    before = http_request_seconds.total(method="GET", route="/items/{item_id}", status=200)[1]
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nowhere")
+
+    assert http_request_seconds.total(method="GET", route="/items/{item_id}", status=200)[1] == before + 2
+    assert http_request_seconds.total(method="GET", route="unmatched", status=404)[1] >= 1
+
+
+def test_metrics_route_uses_the_prometheus_content_type():
+    from app.routes import health
+
+    app = FastAPI()
+    app.include_router(health.router)
+
+    response = TestClient(app).get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE socialsaver_stage_duration_seconds histogram" in response.text
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.database import AppliedMigration
+from database import engine
+from database.migrations import run_once
+
+
+def test_backfills_run_once_per_database(db):
+    calls = []
+
+    def backfill_example(bind):
+        calls.append(bind)
+
+    assert run_once(engine, backfill_example) is True
+    assert run_once(engine, backfill_example) is False
+    assert calls == [engine]
+    assert db.execute(select(AppliedMigration.name)).scalars().all() == ["backfill_example"]
+
+
+def test_a_failed_backfill_is_retried(db):
+    attempts = []
+
+    def backfill_flaky(bind):
+        attempts.append(bind)
+        if len(attempts) == 1:
+            raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        run_once(engine, backfill_flaky)
+    assert run_once(engine, backfill_flaky) is True
+    assert len(attempts) == 2
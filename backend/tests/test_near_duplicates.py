@@ -0,0 +1,41 @@
+from app.models.database import SavedContent
+from app.services.content_service import ContentService
+from app.services.near_duplicate_index import near_duplicate_index
+from app.utils import minhash
+
+POST = (
+    "Ten lessons from a year of running a small software consultancy: price by value, "
+    "write everything down, say no to scope creep and keep a cash buffer of six months."
+)
+
+
+def test_signatures_estimate_jaccard_similarity():
+    a = minhash.signature(POST)
+    assert minhash.similarity(a, minhash.signature(POST)) == 1.0
+    assert minhash.similarity(a, minhash.signature(POST + " Thanks for reading!")) >= 0.8
+    assert minhash.similarity(a, minhash.signature("A recipe for a quick weeknight lentil curry with rice and naan")) < 0.2
+
+
+def test_short_texts_are_not_signed():
+    assert minhash.signature("too short to compare") is None
+
+
+def test_lsh_bands_make_near_copies_candidates():
+    copy = set(minhash.bands(minhash.signature(POST + " Thanks for reading!")))
+    assert copy & set(minhash.bands(minhash.signature(POST)))
+
+
+def test_find_returns_a_live_near_duplicate_of_the_same_user(db, user_id):
+    saved = SavedContent(user_id=user_id, platform="blog", original_url="https://dev.to/a", title="Lessons", caption=POST)
+    other_user = SavedContent(user_id="someone-else", platform="blog", original_url="https://dev.to/a", title="Lessons", caption=POST)
+    db.add_all([saved, other_user])
+    db.flush()
+    near_duplicate_index.index_contents(db, [saved, other_user])
+    db.commit()
+
+    match = near_duplicate_index.find(db, user_id, "Lessons", POST + " Thanks for reading!")
+    assert match is not None and match[0] == saved.id and match[1] >= near_duplicate_index.threshold
+    assert near_duplicate_index.find(db, user_id, "Curry", "A recipe for a quick weeknight lentil curry with rice") is None
+
+    ContentService.delete_content(db, saved.id, user_id)
+    assert near_duplicate_index.find(db, user_id, "Lessons", POST) is None
@@ -0,0 +1,61 @@
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.database import SavedContent
+from app.services.content_service import ContentService
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_datetimes_and_ids():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    token = encode_cursor(created_at, 42)
+
+    assert "=" not in token
+    assert decode_cursor(token) == [created_at, 42]
+    assert decode_cursor(encode_cursor(0.75, 7)) == [0.75, 7]
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "garbage!",
+    base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+    encode_cursor(datetime(2024, 1, 1)),
+    encode_cursor(datetime(2024, 1, 1), "42"),
+    encode_cursor(datetime(2024, 1, 1), 1, 2),
+])
+def test_malformed_cursors_raise_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_feed_pages_are_contiguous_and_newest_first(db, user_id):
+    start = datetime(2024, 1, 1)
+    db.add_all([
+        SavedContent(
+            user_id=user_id,
+            platform="blog",
+            original_url=f"https://dev.to/{n}",
+            # Pairs share a timestamp, so the id breaks ties.
+            created_at=start + timedelta(minutes=n // 2)
+        )
+        for n in range(7)
+    ])
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        items, cursor = ContentService.get_user_content_page(db, user_id, limit=3, cursor=cursor)
+        seen.extend(items)
+        if cursor is None:
+            break
+
+    assert len(seen) == 7 and len({item.id for item in seen}) == 7
+    keys = [(item.created_at, item.id) for item in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_feed_rejects_a_cursor_without_a_timestamp(db, user_id):
+    with pytest.raises(ValueError):
+        ContentService.get_user_content_page(db, user_id, cursor=encode_cursor(1.5, 3))
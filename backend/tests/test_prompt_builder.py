@@ -0,0 +1,53 @@
+from app.utils.prompt_builder import (
+    EMPTY_CONTENT,
+    content_for_prompt,
+    estimate_tokens,
+    truncate_tokens,
+)
+
+
+def test_estimate_tokens_counts_word_pieces_digits_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("cat") == 1
+    assert estimate_tokens("pasta") == 2
+    assert estimate_tokens("12345, ok!") == 5
+
+
+def test_truncate_tokens_cuts_at_a_word_boundary():
+    text = "Homemade pasta with garlic and chilli oil"
+    assert truncate_tokens(text, 100) == text
+    assert truncate_tokens(text, 0) == ""
+
+    cut = truncate_tokens(text, 4)
+    assert cut == "Homemade pasta…"
+    assert estimate_tokens(cut.rstrip("…")) <= 4
+
+
+def test_urls_mentions_emoji_and_repeated_lines_are_dropped():
+    caption = (
+        "Leg day 🔥🔥 with @coach_mike\n"
+        "leg day 🔥🔥 with @coach_mike\n"
+        ".\n"
+        "Full plan: https://example.com/plan?utm_source=ig www.example.com\n"
+    )
+    assert content_for_prompt(caption, None, 100) == "Leg day with\nFull plan:"
+
+
+def test_first_distinct_hashtags_become_a_tags_line():
+    caption = "Squats #Fitness #gym #fitness #legs #strength #workout #health"
+    assert content_for_prompt(caption, "Leg day", 100) == (
+        "Leg day\nSquats\nTags: fitness gym legs strength workout"
+    )
+
+
+def test_budget_covers_the_tags_line():
+    caption = " ".join(["squats"] * 200) + " #fitness"
+    prompt = content_for_prompt(caption, None, 20)
+    assert prompt.endswith("\nTags: fitness")
+    assert estimate_tokens(prompt) <= 21  # the ellipsis is one more
+
+
+def test_empty_content_has_a_placeholder():
+    assert content_for_prompt(None, None, 50) == EMPTY_CONTENT
+    assert content_for_prompt("https://t.co/x 🎉", "", 50) == EMPTY_CONTENT
+    assert content_for_prompt("#food", None, 50) == "Tags: food"
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.utils import scrape_scheduler as scheduler_module
+from app.utils.scrape_scheduler import HostThrottled, ScrapeScheduler, TokenBucket, parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(scheduler_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_allows_a_burst_then_spaces_requests(clock):
+    bucket = TokenBucket(rate=2.0, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock[0] += 10
+    assert bucket.reserve() == 0.0
+
+
+def test_mobile_and_www_hosts_share_one_bucket(clock):
+    scheduler = ScrapeScheduler()
+    for url in (
+        "https://www.youtube.com/watch?v=a",
+        "https://m.youtube.com/watch?v=b",
+        "https://youtube.com/watch?v=c",
+    ):
+        scheduler.backoff(url, retry_after=5)
+    assert scheduler.stats() == {"hosts": 1, "backing_off": {"youtube.com": 5.0}}
+    assert scheduler.remaining("https://mobile.youtube.com/") == 5.0
+
+
+def test_backoff_honours_retry_after_up_to_the_maximum(clock):
+    scheduler = ScrapeScheduler(backoff_max=60)
+    assert scheduler.backoff("https://x.com/a", retry_after=20) == 20
+    assert scheduler.backoff("https://x.com/a", retry_after=600) == 60
+    assert scheduler.remaining("https://x.com/b") == 60
+
+    clock[0] += 61
+    assert scheduler.stats()["backing_off"] == {}
+
+
+def test_long_backoff_fails_fast(clock):
+    scheduler = ScrapeScheduler(max_delay=30)
+    scheduler.backoff("https://instagram.com/p/1", retry_after=120)
+
+    async def fetch():
+        async with scheduler.slot("https://www.instagram.com/p/2"):
+            pass
+
+    with pytest.raises(HostThrottled) as info:
+        asyncio.run(fetch())
+    assert info.value.host == "instagram.com"
+
+
+def test_host_rates_match_by_suffix():
+    scheduler = ScrapeScheduler(rate=1.0, host_rates={"instagram.com": 0.2})
+    assert scheduler._rate_for("instagram.com") == 0.2
+    assert scheduler._rate_for("cdn.instagram.com") == 0.2
+    assert scheduler._rate_for("notinstagram.com") == 1.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_backoff_is_exposed_in_stats_and_metrics(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.routes import health
+
+    scheduler = ScrapeScheduler()
+    monkeypatch.setattr(health, "scrape_scheduler", scheduler)
+    scheduler.backoff("https://www.reddit.com/r/a", retry_after=90)
+    app = FastAPI()
+    app.include_router(health.router)
+    client = TestClient(app)
+
+    stats = client.get("/api/stats/scrape").json()
+    assert stats["hosts"] == 1 and 89 <= stats["backing_off"]["reddit.com"] <= 90
+    assert 'socialsaver_scrape_backoff_seconds{host="reddit.com"}' in client.get("/api/metrics").text
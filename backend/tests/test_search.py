@@ -0,0 +1,38 @@
+import uuid
+
+from app.models.database import SavedContent
+from app.services.content_service import ContentService
+from app.utils.search_query import to_fts5_query, to_tsquery
+
+
+def _save(db, user_id, **fields):
+    row = SavedContent(user_id=user_id, platform="blog", original_url=f"https://dev.to/{uuid.uuid4()}", **fields)
+    db.add(row)
+    db.commit()
+    return row
+
+
+def test_query_syntax_is_never_passed_through():
+    assert to_fts5_query('fit* OR "meal prep" NEAR(') == '"fit"* "or"* "meal prep" "near"*'
+    assert to_tsquery('"meal prep" keto') == "(meal <-> prep) & keto:*"
+    assert to_fts5_query("***") == ""
+
+
+def test_title_matches_rank_above_caption_matches(db, user_id):
+    in_caption = _save(db, user_id, title="Weekly notes", caption="some python tips")
+    in_title = _save(db, user_id, title="Python decorators", caption="notes")
+
+    items, next_cursor, total = ContentService.search_content_page(db, user_id, "pyth")
+
+    assert [item.id for item in items] == [in_title.id, in_caption.id]
+    assert next_cursor is None
+    assert total == 2
+
+
+def test_search_excludes_archived_and_other_users(db, user_id):
+    _save(db, user_id, title="Python archived", is_archived=True)
+    _save(db, "someone-else", title="Python elsewhere")
+
+    items, _, total = ContentService.search_content_page(db, user_id, "python")
+
+    assert items == [] and total == 0
@@ -0,0 +1,87 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.database import SavedContent
+from app.routes import content
+from app.services import content_service
+from app.services.content_service import ContentService
+from app.utils.embeddings import Embedder
+
+
+def _save(db, user_id, title, caption=None, **fields):
+    row = SavedContent(
+        user_id=user_id, platform="blog", original_url=f"https://dev.to/{title}",
+        title=title, caption=caption, **fields
+    )
+    db.add(row)
+    db.commit()
+    return row
+
+
+def test_embedder_subclasses_must_implement_embed():
+    class Incomplete(Embedder):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_semantic_search_ranks_related_vocabulary(db, user_id):
+    squats = _save(db, user_id, "Leg day squats and lunges")
+    _save(db, user_id, "Homemade pasta recipe")
+
+    results = ContentService.semantic_search(db, user_id, "squat workout", limit=1)
+
+    assert [row.id for row in results] == [squats.id]
+
+
+def test_hybrid_search_puts_items_ranked_by_both_lists_first(db, user_id, monkeypatch):
+    title_match = _save(db, user_id, "Python tips")
+    caption_match = _save(db, user_id, "Weekly notes", caption="python tips inside")
+    vector_only = _save(db, user_id, "Snake care")
+
+    def vector_search(db, user_id, query, k):
+        return [(caption_match.id, 0.9), (vector_only.id, 0.8)]
+
+    monkeypatch.setattr(content_service.vector_index, "search", vector_search)
+
+    results = ContentService.hybrid_search(db, user_id, "python tips")
+
+    # keyword: [title_match, caption_match]; vector: [caption_match, vector_only]
+    assert [row.id for row in results] == [caption_match.id, title_match.id, vector_only.id]
+
+
+def test_hybrid_search_applies_filters_after_fusion(db, user_id, monkeypatch):
+    kept = _save(db, user_id, "Python tips", category="Coding")
+    _save(db, user_id, "Python snakes", category="Travel")
+    archived = _save(db, user_id, "Python archive", category="Coding", is_archived=True)
+
+    def vector_search(db, user_id, query, k):
+        return [(archived.id, 0.9)]
+
+    monkeypatch.setattr(content_service.vector_index, "search", vector_search)
+
+    results = ContentService.hybrid_search(db, user_id, "python", category="Coding")
+
+    assert [row.id for row in results] == [kept.id]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(content.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("mode", ["semantic", "hybrid"])
+def test_search_modes_only_return_the_users_own_items(client, db, user_id, mode):
+    mine = _save(db, user_id, "Kettlebell swings workout")
+    other_user = f"{user_id}-other"
+    _save(db, other_user, "Kettlebell swings workout")
+
+    response = client.get(f"/api/content/{user_id}/search", params={"q": "kettlebell", "mode": mode})
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [mine.id]
+    assert all(item["user_id"] == user_id for item in response.json())
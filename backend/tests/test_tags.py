@@ -0,0 +1,101 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.database import ContentTag
+from app.models.schemas import CreateSavedContentSchema
+from app.routes import content
+from app.services import tag_service
+from app.services.content_service import ContentService
+from app.services.tag_service import TagService
+from app.utils.facet_cache import facet_cache
+from app.utils.tags import parse_hashtags, prefix_upper_bound
+
+
+def _create(db, user_id, n, hashtags, title=None):
+    return ContentService.create_content(db, CreateSavedContentSchema(
+        user_id=user_id, platform="blog", original_url=f"https://dev.to/{n}",
+        hashtags=hashtags, title=title or f"Post {n}"
+    ))
+
+
+def _tags(db, content_id):
+    return sorted(t for (t,) in db.query(ContentTag.tag).filter(ContentTag.content_id == content_id))
+
+
+@pytest.fixture
+def client():
+    facet_cache.clear()
+    app = FastAPI()
+    app.include_router(content.router)
+    return TestClient(app)
+
+
+def _ids(response):
+    assert response.status_code == 200
+    return sorted(item["id"] for item in response.json())
+
+
+def test_hashtags_are_normalised_and_deduplicated():
+    assert parse_hashtags(" #Fit, fit ,#Meal Prep,, ") == ["fit", "meal prep"]
+    assert prefix_upper_bound("fit") == "fiu"
+
+
+def test_exact_tag_does_not_match_longer_tags(client, db, user_id):
+    fit = _create(db, user_id, 1, "#fit")
+    _create(db, user_id, 2, "fitness")
+
+    assert _ids(client.get(f"/api/content/{user_id}/all", params={"tag": "#Fit"})) == [fit.id]
+
+
+def test_prefix_tag_is_a_range_up_to_the_upper_bound(client, db, user_id, monkeypatch):
+    bounds = []
+
+    def spy(prefix):
+        bounds.append(prefix)
+        return prefix_upper_bound(prefix)
+
+    monkeypatch.setattr(tag_service, "prefix_upper_bound", spy)
+    fit = _create(db, user_id, 1, "fit")
+    fitness = _create(db, user_id, 2, "fitness,gym")
+    _create(db, user_id, 3, "fiu")
+    _create(db, user_id, 4, "fish")
+
+    assert _ids(client.get(f"/api/content/{user_id}/all", params={"tag": "fit*"})) == [fit.id, fitness.id]
+    assert bounds == ["fit"]
+
+
+def test_tag_filter_applies_to_search(client, db, user_id):
+    tagged = _create(db, user_id, 1, "python", title="Python tips")
+    _create(db, user_id, 2, "snakes", title="Python care")
+
+    response = client.get(f"/api/content/{user_id}/search", params={"q": "python", "tag": "python"})
+    assert _ids(response) == [tagged.id]
+
+
+def test_tag_filter_is_per_user(db, user_id):
+    _create(db, f"{user_id}-other", 1, "fit")
+    assert ContentService.get_user_content_page(db, user_id, tag="fit")[0] == []
+
+
+def test_top_tags_orders_by_count_then_name_and_skips_archived(db, user_id):
+    _create(db, user_id, 1, "gym,food")
+    _create(db, user_id, 2, "gym,travel")
+    archived = _create(db, user_id, 3, "travel,food,art")
+    ContentService.delete_content(db, archived.id, user_id)
+
+    assert TagService.top_tags(db, user_id) == [
+        {"tag": "gym", "count": 2}, {"tag": "food", "count": 1}, {"tag": "travel", "count": 1}
+    ]
+    assert [t["tag"] for t in TagService.top_tags(db, user_id, limit=2)] == ["gym", "food"]
+
+
+def test_update_content_rewrites_content_tags(db, user_id):
+    row = _create(db, user_id, 1, "fit,gym")
+    assert _tags(db, row.id) == ["fit", "gym"]
+
+    ContentService.update_content(db, row.id, user_id, {"hashtags": "gym,#Legs"})
+    assert _tags(db, row.id) == ["gym", "legs"]
+
+    ContentService.update_content(db, row.id, user_id, {"hashtags": None})
+    assert _tags(db, row.id) == []
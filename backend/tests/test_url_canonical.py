@@ -0,0 +1,44 @@
+import pytest
+
+from app.utils.url_canonical import canonicalize_url, host_of
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.instagram.com/reel/Cx1_-a/?igsh=abc", "https://instagram.com/p/Cx1_-a"),
+    ("https://instagram.com/someone/p/Cx1_-a/", "https://instagram.com/p/Cx1_-a"),
+    ("https://x.com/user/status/123?s=20&t=xyz", "https://twitter.com/i/status/123"),
+    ("https://youtu.be/dQw4w9WgXcQ?si=share", "https://youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("https://m.youtube.com/shorts/dQw4w9WgXcQ", "https://youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("HTTP://Dev.To//post/?utm_source=x&b=2&a=1#intro", "https://dev.to/post?a=1&b=2"),
+    ("https://example.com:443/a?fbclid=1&gclid=2", "https://example.com/a"),
+    ("https://example.com:8080/a/", "https://example.com:8080/a"),
+    ("https://medium.com/@me/post?source=rss", "https://medium.com/@me/post"),
+])
+def test_canonical_forms(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://example.com/search?s=python", "https://example.com/search?s=python"),
+    ("https://blog.example.com/page?t=2&ref=home&source=feed&share=1",
+     "https://blog.example.com/page?ref=home&share=1&source=feed&t=2"),
+])
+def test_generic_parameters_are_kept_off_the_tracking_hosts(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_youtube_timestamps_stay_distinct_on_channel_pages():
+    assert canonicalize_url("https://youtube.com/@chan/videos?t=10") != canonicalize_url("https://youtube.com/@chan/videos")
+
+
+@pytest.mark.parametrize("url", ["https://example.com:99999/a", "http://[::1/a", "  https://example.com:port/x "])
+def test_malformed_urls_fall_back_to_the_raw_url(url):
+    assert canonicalize_url(url) == url.strip()
+
+
+def test_host_of_drops_www_and_mobile_prefixes():
+    assert host_of("https://www.Instagram.com/p/abc/") == "instagram.com"
+    assert host_of("https://m.youtube.com/watch?v=x") == "youtube.com"
+    assert host_of("https://mobile.twitter.com/a") == "twitter.com"
+    assert host_of("https://old.reddit.com/r/a") == "old.reddit.com"
+    assert host_of("not a url") == ""
@@ -0,0 +1,68 @@
+from app.models.database import ContentEmbedding, SavedContent
+from app.services.vector_index import VectorIndex, vector_index
+from app.utils.embeddings import HashingEmbedder
+
+
+def _ready(user_id, title):
+    return SavedContent(user_id=user_id, platform="blog", original_url=f"https://dev.to/{title}", title=title)
+
+
+def _ids(db, user_id, query="kettlebell"):
+    return {content_id for content_id, _ in vector_index.search(db, user_id, query, 10)}
+
+
+def test_index_changes_reach_memory_only_on_commit(db, user_id):
+    first = _ready(user_id, "kettlebell swings")
+    db.add(first)
+    db.commit()
+    assert _ids(db, user_id) == {first.id}
+
+    phantom = _ready(user_id, "kettlebell snatch")
+    db.add(phantom)
+    db.flush()
+    vector_index.index_contents(db, [phantom])
+    db.rollback()
+    assert _ids(db, user_id) == {first.id}
+
+    second = _ready(user_id, "kettlebell press")
+    db.add(second)
+    db.flush()
+    vector_index.index_contents(db, [second])
+    assert _ids(db, user_id) == {first.id}
+    db.commit()
+    assert _ids(db, user_id) == {first.id, second.id}
+
+    vector_index.remove(db, user_id, [first.id])
+    db.commit()
+    assert _ids(db, user_id) == {second.id}
+
+
+def test_search_does_not_commit_the_callers_session(db, user_id):
+    db.add(_ready(user_id, "kettlebell swings"))
+    db.commit()
+    db.add(_ready(user_id, "uncommitted"))
+
+    vector_index.search(db, user_id, "kettlebell", 5)
+    db.rollback()
+
+    assert db.query(SavedContent).filter_by(user_id=user_id).count() == 1
+    assert db.query(ContentEmbedding).filter_by(user_id=user_id).count() == 1
+
+
+def test_changes_committed_during_a_load_are_not_lost(db, user_id):
+    stored = _ready(user_id, "kettlebell swings")
+    db.add(stored)
+    db.commit()
+    index = VectorIndex(HashingEmbedder(64))
+    late = index.embedder.embed(["kettlebell press"])[0]
+    load = index._load
+
+    def racing_load(session, user):
+        vectors = load(session, user)
+        index.apply([(user_id, 12345, late), (user_id, stored.id, None)])
+        return vectors
+
+    index._load = racing_load
+    hits = index.search(db, user_id, "kettlebell", 10)
+
+    assert [content_id for content_id, _ in hits] == [12345]
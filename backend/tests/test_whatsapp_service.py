@@ -0,0 +1,40 @@
+import asyncio
+
+from app.services.whatsapp_service import WhatsAppHandler
+from app.utils.ai_processor import Classification
+
+
+def test_validate_message_keeps_supported_links_in_order():
+    handler = WhatsAppHandler()
+    body = "look https://box.com/x and https://x.com/a/status/1 https://dev.to/p https://x.com/a/status/1"
+
+    urls, error = handler.validate_message(body)
+
+    assert urls == ["https://x.com/a/status/1", "https://dev.to/p"]
+    assert error is None
+    assert handler.validate_message("https://box.com/x") == ([], WhatsAppHandler.UNSUPPORTED_REPLY)
+
+
+def test_enrich_urls_runs_links_concurrently_and_keeps_input_order(monkeypatch):
+    handler = WhatsAppHandler()
+    in_flight = peak = 0
+
+    async def extract(url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05 if url.endswith("slow") else 0.01)
+        in_flight -= 1
+        return {"platform": "blog", "title": url.rsplit("/", 1)[1], "caption": "text", "hashtags": []}
+
+    async def classify(caption, title):
+        return Classification("Coding", f"About {title}", "llm")
+
+    monkeypatch.setattr(handler.url_extractor, "extract", extract)
+    monkeypatch.setattr(handler.ai_processor, "classify", classify)
+    urls = ["https://dev.to/slow", "https://dev.to/a", "https://dev.to/b", "https://dev.to/c"]
+
+    results = asyncio.run(handler.enrich_urls(urls, concurrency=2))
+
+    assert [data["summary"] for _, _, data in results] == ["About slow", "About a", "About b", "About c"]
+    assert peak == 2
@@ -0,0 +1,55 @@
+"""Retrain the local first-tier classifier from the saves in the database.
+
+Run from ``backend/``::
+
+    python train_classifier.py [--min-samples 200] [--holdout 0.1]
+
+Writes the model to ``LOCAL_CLASSIFIER_PATH``, where a running server picks
+it up within a minute, and prints held-out accuracy and the share of saves
+it would answer without the LLM at ``LOCAL_CLASSIFIER_THRESHOLD``.
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BASE_DIR = Path(__file__).resolve().parent
+load_dotenv(BASE_DIR / ".env", override=True)
+
+from database import SessionLocal
+from app.services.classifier_training import train
+from app.utils.local_classifier import local_classifier
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-samples", type=int, default=200)
+    parser.add_argument("--holdout", type=float, default=0.1)
+    parser.add_argument("--output", default=local_classifier.path)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        model, report = train(db, local_classifier.threshold, args.holdout)
+    finally:
+        db.close()
+
+    print(json.dumps(report, indent=2))
+    if model.info["samples"] < args.min_samples:
+        logger.error(
+            f"Only {model.info['samples']} labelled saves (need {args.min_samples}); model not written"
+        )
+        return 1
+    model.save(args.output)
+    logger.info(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
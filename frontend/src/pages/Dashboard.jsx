@@ -2,9 +2,11 @@ import React, { useState, useEffect, useCallback } from 'react'
 import { SearchBar, FilterBar, EmptyState } from '../components/SearchBar'
 import { ContentGrid as ContentGridComponent } from '../components/ContentCard'
 import { SetupGuide } from '../components/SetupGuide'
-import { contentAPI } from '../utils/api'
+import { contentAPI, getNextCursor } from '../utils/api'
 import { getUserIdFromStorage, setUserIdInStorage } from '../utils/helpers'
 
+const PAGE_SIZE = 50
+
 export function DashboardPage() {
   const [userId, setUserId] = useState(getUserIdFromStorage())
   const [contents, setContents] = useState([])
@@ -15,6 +17,11 @@ export function DashboardPage() {
   const [categories, setCategories] = useState([])
   const [platforms, setPlatforms] = useState([])
   const [isLoading, setIsLoading] = useState(false)
+  const [feedCursor, setFeedCursor] = useState(null)
+  // The search whose results are shown (null for the feed) and its next page
+  const [activeSearch, setActiveSearch] = useState(null)
+  const [searchCursor, setSearchCursor] = useState(null)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
   const [showSetup, setShowSetup] = useState(true)
 
   // Fetch content
@@ -22,7 +29,7 @@ export function DashboardPage() {
     setIsLoading(true)
     try {
       let activeUserId = userId
-      let response = await contentAPI.getUserContent(activeUserId, 0, 100)
+      let response = await contentAPI.getUserContent(activeUserId, PAGE_SIZE)
       let data = response.data || []
 
       // If this browser has a random user_id with no data, auto-switch to a real one.
@@ -33,13 +40,15 @@ export function DashboardPage() {
           activeUserId = users[0]
           setUserId(activeUserId)
           setUserIdInStorage(activeUserId)
-          response = await contentAPI.getUserContent(activeUserId, 0, 100)
+          response = await contentAPI.getUserContent(activeUserId, PAGE_SIZE)
           data = response.data || []
         }
       }
 
       setContents(data)
       setFilteredContents(data)
+      setFeedCursor(getNextCursor(response))
+      setActiveSearch(null)
 
       // Fetch filters
       if (data.length > 0) {
@@ -64,18 +73,23 @@ export function DashboardPage() {
   // Handle search
   const handleSearch = useCallback(async () => {
     if (!searchQuery.trim()) {
+      setActiveSearch(null)
       setFilteredContents(contents)
       return
     }
 
     setIsLoading(true)
     try {
+      const search = { query: searchQuery, category: selectedCategory, platform: selectedPlatform }
       const response = await contentAPI.searchContent(
         userId,
-        searchQuery,
-        selectedCategory,
-        selectedPlatform
+        search.query,
+        search.category,
+        search.platform,
+        PAGE_SIZE
       )
+      setActiveSearch(search)
+      setSearchCursor(getNextCursor(response))
       setFilteredContents(response.data || [])
     } catch (error) {
       console.error('Error searching:', error)
@@ -89,9 +103,42 @@ export function DashboardPage() {
     setSearchQuery('')
     setSelectedCategory(null)
     setSelectedPlatform(null)
+    setActiveSearch(null)
     setFilteredContents(contents)
   }
 
+  // Handle load more: fetch the page after the last one shown, of the
+  // search results or of the feed
+  const handleLoadMore = async () => {
+    setIsLoadingMore(true)
+    try {
+      if (activeSearch) {
+        const response = await contentAPI.searchContent(
+          userId,
+          activeSearch.query,
+          activeSearch.category,
+          activeSearch.platform,
+          PAGE_SIZE,
+          searchCursor
+        )
+        setFilteredContents((prev) => [...prev, ...(response.data || [])])
+        setSearchCursor(getNextCursor(response))
+        return
+      }
+      const response = await contentAPI.getUserContent(userId, PAGE_SIZE, feedCursor)
+      const page = response.data || []
+      setContents((prev) => [...prev, ...page])
+      setFilteredContents((prev) => [...prev, ...page])
+      setFeedCursor(getNextCursor(response))
+    } catch (error) {
+      console.error('Error loading more content:', error)
+    } finally {
+      setIsLoadingMore(false)
+    }
+  }
+
+  const hasMore = (activeSearch ? searchCursor : feedCursor) !== null
+
   // Handle archive
   const handleArchive = async (id) => {
     try {
@@ -158,7 +205,20 @@ export function DashboardPage() {
             isLoading={isLoading}
           />
         ) : (
-          <EmptyState message="Forward links from Instagram, Twitter, or blogs to your WhatsApp bot to get started!" />
+          <EmptyState message="Forward links from Instagram, X, YouTube, Reddit, TikTok or blogs to your WhatsApp bot to get started!" />
+        )}
+
+        {/* Load more */}
+        {hasMore && filteredContents.length > 0 && (
+          <div className="mt-8 text-center">
+            <button
+              onClick={handleLoadMore}
+              disabled={isLoadingMore}
+              className="px-6 py-3 text-gray-600 rounded-lg border-2 border-gray-300 hover:bg-gray-100 disabled:text-gray-400 transition"
+            >
+              {isLoadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
         )}
       </main>
     </div>
@@ -10,18 +10,23 @@ const api = axios.create({
   },
 })
 
+// Cursor for the page after `response`, or null on the last page.
+export const getNextCursor = (response) => response.headers['x-next-cursor'] || null
+
 export const contentAPI = {
   // Get all user IDs with saved content
   getUsers: () => api.get('/api/content/users'),
 
-  // Get all content for a user
-  getUserContent: (userId, skip = 0, limit = 20) =>
-    api.get(`/api/content/${userId}/all`, { params: { skip, limit } }),
+  // Get a page of content for a user, newest first; pass getNextCursor()
+  // of the previous response as `cursor` to fetch the next page.
+  getUserContent: (userId, limit = 50, cursor = null) =>
+    api.get(`/api/content/${userId}/all`, { params: { limit, cursor } }),
 
-  // Search content
-  searchContent: (userId, query, category = null, platform = null) =>
+  // Search content: one page of matches, best first; pass getNextCursor()
+  // of the previous response as `cursor` to fetch the next page.
+  searchContent: (userId, query, category = null, platform = null, limit = 50, cursor = null) =>
     api.get(`/api/content/${userId}/search`, {
-      params: { q: query, category, platform },
+      params: { q: query, category, platform, limit, cursor },
     }),
 
   // Get single content
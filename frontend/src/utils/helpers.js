@@ -14,6 +14,9 @@ export const getPlatformIcon = (platform) => {
   const icons = {
     instagram: '📸',
     twitter: '𝕏',
+    youtube: '▶️',
+    reddit: '👽',
+    tiktok: '🎵',
     blog: '📝',
     other: '🔗',
   }